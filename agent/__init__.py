@@ -1,8 +1,26 @@
 """Agent module for email classification, drafting, and scheduling."""
 
-from agent.approval import ApprovalChecker
-from agent.classifier import EmailClassifier
-from agent.drafter import ReplyDrafter
-from agent.scheduler import MeetingScheduler
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from agent.approval import ApprovalChecker
+    from agent.classifier import EmailClassifier
+    from agent.drafter import ReplyDrafter
+    from agent.scheduler import MeetingScheduler
+
+_EXPORTS = {
+    "ApprovalChecker": "agent.approval",
+    "EmailClassifier": "agent.classifier",
+    "ReplyDrafter": "agent.drafter",
+    "MeetingScheduler": "agent.scheduler",
+}
 
 __all__ = ["EmailClassifier", "ReplyDrafter", "MeetingScheduler", "ApprovalChecker"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import agent modules on first access so lightweight helpers like agent.cache load without them."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
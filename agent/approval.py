@@ -3,6 +3,9 @@
 import logging
 import re
 from dataclasses import dataclass, field
+from enum import IntEnum
+
+import ahocorasick
 
 import config
 from agent.classifier import ClassificationResult
@@ -11,8 +14,53 @@ from services.gmail_service import EmailMessage
 
 logger = logging.getLogger(__name__)
 
+_COMMITMENT_RE = re.compile(
+    "|".join(
+        [
+            r"\bi will\b",
+            r"\bi'll\b",
+            r"\bi commit\b",
+            r"\bi promise\b",
+            r"\bi agree\b",
+            r"\bwe will\b",
+            r"\bwe'll\b",
+            r"\bguarantee\b",
+            r"\bconfirm(?:ed|ing)?\b.*\b(?:payment|delivery|date|deadline)\b",
+        ]
+    ),
+    re.IGNORECASE,
+)
+
 
-@dataclass
+class Risk(IntEnum):
+    """Ordered risk levels; a check's risk is the highest level any rule raises."""
+
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+    @property
+    def label(self) -> str:
+        """Get the lowercase label stored on ApprovalCheck.risk_level."""
+        return self.name.lower()
+
+
+_RISK_EMOJI = {"low": "", "medium": "", "high": ""}
+
+_REASON_DESCRIPTIONS = {
+    config.ApprovalFlag.UNKNOWN_SENDER: "Unknown sender",
+    config.ApprovalFlag.SENSITIVE_CONTENT: "Sensitive content detected",
+    config.ApprovalFlag.LOW_CONFIDENCE: "Low classification confidence",
+    "draft_contains_sensitive_keywords": "Draft contains sensitive keywords",
+    "contains_commitments": "Draft contains commitments",
+    "replying_to_unknown_sender": "Replying to unknown sender",
+    "external_attendees": "Meeting includes external attendees",
+    "unknown_attendees": "Meeting includes unknown attendees",
+    "sensitive_meeting_topic": "Sensitive meeting topic",
+}
+
+
+@dataclass(slots=True)
 class ApprovalCheck:
     """Result of approval check."""
 
@@ -21,6 +69,23 @@ class ApprovalCheck:
     risk_level: str = "low"
 
 
+def _build_keyword_automaton(keywords: list[str]) -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton mapping lowercased keywords to their list indices."""
+    automaton = ahocorasick.Automaton()
+    for index, keyword in enumerate(keywords):
+        key = keyword.lower()
+        if key:
+            automaton.add_word(key, automaton.get(key, ()) + (index,))
+    if len(automaton):
+        automaton.make_automaton()
+    return automaton
+
+
+def _email_text_lower(email: EmailMessage) -> str:
+    """Get an email's subject and body as one lowercased string for keyword scanning."""
+    return f"{email.subject} {email.body or email.snippet}".lower()
+
+
 class ApprovalChecker:
     """Checks if emails/actions require human approval."""
 
@@ -39,9 +104,21 @@ class ApprovalChecker:
             sensitive_keywords: Keywords that trigger approval requirement.
         """
         self._db = db
+        self._known_senders: dict[str, bool] = {}
         self.confidence_threshold = confidence_threshold or config.CONFIDENCE_THRESHOLD
         self.sensitive_keywords = sensitive_keywords or config.SENSITIVE_KEYWORDS
 
+    @property
+    def sensitive_keywords(self) -> list[str]:
+        """Get the sensitive keywords."""
+        return self._sensitive_keywords
+
+    @sensitive_keywords.setter
+    def sensitive_keywords(self, keywords: list[str]) -> None:
+        """Set the sensitive keywords and rebuild the keyword automaton."""
+        self._sensitive_keywords = keywords
+        self._sensitive_automaton = _build_keyword_automaton(keywords)
+
     @property
     def db(self) -> Database:
         """Get or create database instance."""
@@ -53,6 +130,7 @@ class ApprovalChecker:
         self,
         email: EmailMessage,
         classification: ClassificationResult | None = None,
+        fast: bool = False,
     ) -> ApprovalCheck:
         """
         Check if an email requires human approval.
@@ -60,38 +138,57 @@ class ApprovalChecker:
         Args:
             email: EmailMessage to check.
             classification: Optional classification result.
+            fast: Stop at the first high-risk finding; later reasons are omitted.
 
         Returns:
             ApprovalCheck with approval requirements.
         """
         reasons = []
-        risk_level = "low"
+        risk = Risk.LOW
 
         if not self._is_known_sender(email.sender_email):
             reasons.append(config.ApprovalFlag.UNKNOWN_SENDER)
-            risk_level = "medium"
+            risk = max(risk, Risk.MEDIUM)
 
         sensitive_found = self._check_sensitive_content(email)
         if sensitive_found:
             reasons.append(config.ApprovalFlag.SENSITIVE_CONTENT)
             reasons.extend([f"keyword:{kw}" for kw in sensitive_found])
-            risk_level = "high"
+            risk = max(risk, Risk.HIGH)
+            if fast:
+                return ApprovalCheck(requires_approval=True, reasons=reasons, risk_level=risk.label)
 
         if classification and classification.confidence < self.confidence_threshold:
             reasons.append(config.ApprovalFlag.LOW_CONFIDENCE)
-            if risk_level == "low":
-                risk_level = "medium"
+            risk = max(risk, Risk.MEDIUM)
 
         return ApprovalCheck(
             requires_approval=len(reasons) > 0,
             reasons=reasons,
-            risk_level=risk_level,
+            risk_level=risk.label,
         )
 
+    def check_emails(
+        self,
+        pairs: list[tuple[EmailMessage, ClassificationResult | None]],
+    ) -> list[ApprovalCheck]:
+        """
+        Check several emails, looking up all of their senders with one query.
+
+        Args:
+            pairs: Emails with their optional classification results.
+
+        Returns:
+            ApprovalCheck for each pair, in input order.
+        """
+        self._prefetch_known_senders([email.sender_email for email, _ in pairs])
+        return [self.check_email(email, classification) for email, classification in pairs]
+
     def check_draft(
         self,
         draft_body: str,
         original_email: EmailMessage,
+        fast: bool = False,
     ) -> ApprovalCheck:
         """
         Check if a draft reply requires approval.
@@ -99,32 +196,34 @@ class ApprovalChecker:
         Args:
             draft_body: Draft reply text.
             original_email: Original email being replied to.
+            fast: Stop at the first high-risk finding; later reasons are omitted.
 
         Returns:
             ApprovalCheck with approval requirements.
         """
         reasons = []
-        risk_level = "low"
+        risk = Risk.LOW
 
         sensitive_in_draft = self._find_sensitive_keywords(draft_body)
         if sensitive_in_draft:
             reasons.append("draft_contains_sensitive_keywords")
             reasons.extend([f"keyword:{kw}" for kw in sensitive_in_draft])
-            risk_level = "medium"
+            risk = max(risk, Risk.MEDIUM)
 
         if self._contains_commitments(draft_body):
             reasons.append("contains_commitments")
-            risk_level = "high"
+            risk = max(risk, Risk.HIGH)
+            if fast:
+                return ApprovalCheck(requires_approval=True, reasons=reasons, risk_level=risk.label)
 
         if not self._is_known_sender(original_email.sender_email):
             reasons.append("replying_to_unknown_sender")
-            if risk_level == "low":
-                risk_level = "medium"
+            risk = max(risk, Risk.MEDIUM)
 
         return ApprovalCheck(
             requires_approval=len(reasons) > 0,
             reasons=reasons,
-            risk_level=risk_level,
+            risk_level=risk.label,
         )
 
     def check_calendar_action(
@@ -145,27 +244,28 @@ class ApprovalChecker:
             ApprovalCheck with approval requirements.
         """
         reasons = []
-        risk_level = "low"
+        risk = Risk.LOW
 
         if is_external:
             reasons.append("external_attendees")
-            risk_level = "medium"
+            risk = max(risk, Risk.MEDIUM)
 
+        self._prefetch_known_senders(attendees)
         unknown_attendees = [email for email in attendees if not self._is_known_sender(email)]
         if unknown_attendees:
             reasons.append("unknown_attendees")
             reasons.extend([f"attendee:{email}" for email in unknown_attendees[:3]])
-            risk_level = "medium"
+            risk = max(risk, Risk.MEDIUM)
 
         sensitive = self._find_sensitive_keywords(summary)
         if sensitive:
             reasons.append("sensitive_meeting_topic")
-            risk_level = "high"
+            risk = max(risk, Risk.HIGH)
 
         return ApprovalCheck(
             requires_approval=len(reasons) > 0,
             reasons=reasons,
-            risk_level=risk_level,
+            risk_level=risk.label,
         )
 
     def should_auto_approve(
@@ -183,8 +283,7 @@ class ApprovalChecker:
         Returns:
             True if can be auto-approved, False otherwise.
         """
-        check = self.check_email(email, classification)
-        if check.requires_approval:
+        if self._requires_approval_fast(email, classification):
             return False
 
         if classification.category == "FYI_ONLY":
@@ -192,80 +291,92 @@ class ApprovalChecker:
 
         return classification.confidence >= 0.9 and self._is_known_sender(email.sender_email)
 
+    def _requires_approval_fast(self, email: EmailMessage, classification: ClassificationResult) -> bool:
+        """Check whether check_email would require approval, stopping at the first trigger."""
+        if classification.confidence < self.confidence_threshold:
+            return True
+        if not self._is_known_sender(email.sender_email):
+            return True
+        return self._has_sensitive_keyword(_email_text_lower(email))
+
     def _is_known_sender(self, email: str) -> bool:
-        """Check if sender is known/trusted."""
+        """Check if sender is known/trusted, memoizing lookups per address."""
         if not email:
             return False
+        key = email.lower()
+        if key in self._known_senders:
+            return self._known_senders[key]
         try:
-            return self.db.is_known_sender(email)
+            known = self.db.is_known_sender(key)
         except Exception:
             logger.exception("Failed to check known sender")
             return False
+        self._known_senders[key] = known
+        return known
+
+    def _prefetch_known_senders(self, emails: list[str]) -> None:
+        """Seed the known-sender cache for several addresses with one query."""
+        missing = [email for email in {e.lower() for e in emails if e} if email not in self._known_senders]
+        if not missing:
+            return
+        try:
+            self._known_senders.update(self.db.are_known_senders(missing))
+        except Exception:
+            logger.exception("Failed to check known senders")
+
+    def invalidate_known_sender(self, email: str | None = None) -> None:
+        """Forget the cached known-sender lookup for an address, or all lookups if None."""
+        if email is None:
+            self._known_senders.clear()
+        else:
+            self._known_senders.pop(email.lower(), None)
 
     def _check_sensitive_content(self, email: EmailMessage) -> list[str]:
         """Check email for sensitive content."""
-        combined = f"{email.subject} {email.body or email.snippet}".lower()
-        return self._find_sensitive_keywords(combined)
+        return self._match_sensitive_keywords(_email_text_lower(email))
 
     def _find_sensitive_keywords(self, text: str) -> list[str]:
         """Find sensitive keywords in text."""
-        text_lower = text.lower()
-        found = []
-        for keyword in self.sensitive_keywords:
-            if keyword.lower() in text_lower:
-                found.append(keyword)
-        return found
+        return self._match_sensitive_keywords(text.lower())
+
+    def _match_sensitive_keywords(self, text_lower: str) -> list[str]:
+        """Find sensitive keywords in text that is already lowercased."""
+        if self._sensitive_automaton.kind != ahocorasick.AHOCORASICK:
+            return []
+        matched: set[int] = set()
+        for _, indices in self._sensitive_automaton.iter(text_lower):
+            matched.update(indices)
+        return [self._sensitive_keywords[i] for i in sorted(matched)]
+
+    def _has_sensitive_keyword(self, text_lower: str) -> bool:
+        """Check for any sensitive keyword in text that is already lowercased."""
+        if self._sensitive_automaton.kind != ahocorasick.AHOCORASICK:
+            return False
+        return next(self._sensitive_automaton.iter(text_lower), None) is not None
 
     def _contains_commitments(self, text: str) -> bool:
         """Check if text contains commitment language."""
-        commitment_patterns = [
-            r"\bi will\b",
-            r"\bi'll\b",
-            r"\bi commit\b",
-            r"\bi promise\b",
-            r"\bi agree\b",
-            r"\bwe will\b",
-            r"\bwe'll\b",
-            r"\bguarantee\b",
-            r"\bconfirm(ed|ing)?\b.*\b(payment|delivery|date|deadline)\b",
-        ]
-        text_lower = text.lower()
-        return any(re.search(pattern, text_lower) for pattern in commitment_patterns)
+        return _COMMITMENT_RE.search(text) is not None
 
     def add_known_sender(self, email: str, name: str = "") -> bool:
         """Add a sender to the known senders list."""
         try:
             self.db.add_known_sender(email, name)
-            return True
         except Exception:
             logger.exception("Failed to add known sender")
             return False
+        self.invalidate_known_sender(email)
+        return True
 
     def get_risk_summary(self, check: ApprovalCheck) -> str:
         """Get a human-readable summary of the approval check."""
         if not check.requires_approval:
             return "No approval required"
 
-        risk_emoji = {"low": "", "medium": "", "high": ""}
-        emoji = risk_emoji.get(check.risk_level, "")
-
-        reason_descriptions = {
-            config.ApprovalFlag.UNKNOWN_SENDER: "Unknown sender",
-            config.ApprovalFlag.SENSITIVE_CONTENT: "Sensitive content detected",
-            config.ApprovalFlag.LOW_CONFIDENCE: "Low classification confidence",
-            "draft_contains_sensitive_keywords": "Draft contains sensitive keywords",
-            "contains_commitments": "Draft contains commitments",
-            "replying_to_unknown_sender": "Replying to unknown sender",
-            "external_attendees": "Meeting includes external attendees",
-            "unknown_attendees": "Meeting includes unknown attendees",
-            "sensitive_meeting_topic": "Sensitive meeting topic",
-        }
-
-        summaries = []
-        for reason in check.reasons:
-            if reason.startswith("keyword:") or reason.startswith("attendee:"):
-                continue
-            desc = reason_descriptions.get(reason, reason)
-            summaries.append(desc)
-
-        return f"{emoji} {check.risk_level.upper()} risk: {', '.join(summaries)}"
+        emoji = _RISK_EMOJI.get(check.risk_level, "")
+        summaries = ", ".join(
+            _REASON_DESCRIPTIONS.get(reason, reason)
+            for reason in check.reasons
+            if not reason.startswith(("keyword:", "attendee:"))
+        )
+        return f"{emoji} {check.risk_level.upper()} risk: {summaries}"
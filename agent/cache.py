@@ -0,0 +1,122 @@
+"""Caches for LLM results."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+import config
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Thread-safe bounded least-recently-used cache."""
+
+    def __init__(self, maxsize: int) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept before evicting the oldest.
+        """
+        self.maxsize = maxsize
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Get a cached value, marking it as recently used."""
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Persistent cache of JSON-serializable results in a SQLite file."""
+
+    def __init__(self, path: Path | str) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            path: SQLite database file; created on first use.
+        """
+        self.path = Path(path)
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Get or create the SQLite connection."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS llm_cache (key BLOB PRIMARY KEY, value TEXT NOT NULL)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: bytes) -> Any | None:
+        """Get a cached value, or None on a miss or read failure."""
+        try:
+            with self._lock:
+                row = self.conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            logger.exception("Failed to read LLM cache")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: bytes, value: Any) -> None:
+        """Store a value, replacing any existing entry for the key."""
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value)),
+                )
+                self.conn.commit()
+        except sqlite3.Error:
+            logger.exception("Failed to write LLM cache")
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self.conn.execute("DELETE FROM llm_cache")
+            self.conn.commit()
+
+
+def content_key(*parts: str) -> bytes:
+    """Hash text parts into a compact cache key."""
+    digest = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.digest()
+
+
+# Shared by the classifier and the meeting scheduler so one connection serves the cache file.
+response_cache = SQLiteCache(config.LLM_CACHE_PATH)
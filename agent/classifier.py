@@ -1,19 +1,23 @@
 """Email classification agent using LangChain."""
 
 import logging
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 
-from langchain_core.output_parsers import JsonOutputParser
+import ahocorasick
+import anyio
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+from langchain_huggingface import ChatHuggingFace
 
 import config
+from agent.cache import LRUCache, content_key, response_cache
+from agent.llm import FastJsonOutputParser, get_chat_model
+from agent.text import prompt_body
 from services.gmail_service import EmailMessage
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ClassificationResult:
     """Result of email classification."""
 
@@ -42,6 +46,49 @@ Respond with a JSON object containing:
 
 JSON response:"""
 
+_VALID_CATEGORIES = frozenset(
+    {
+        config.EmailCategory.NEEDS_REPLY,
+        config.EmailCategory.FYI_ONLY,
+        config.EmailCategory.MEETING_REQUEST,
+        config.EmailCategory.TASK_ACTION,
+    }
+)
+
+# Keyword rules for the heuristic fallback, highest priority first.
+_FALLBACK_RULES = [
+    (
+        "MEETING_REQUEST",
+        ["meeting", "call", "schedule", "calendar", "invite"],
+        "Contains meeting-related keywords",
+    ),
+    (
+        "NEEDS_REPLY",
+        ["?", "please", "could you", "can you", "would you"],
+        "Contains question or request patterns",
+    ),
+    (
+        "TASK_ACTION",
+        ["todo", "task", "action", "deadline", "due"],
+        "Contains task-related keywords",
+    ),
+]
+
+
+def _build_fallback_automaton() -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton mapping fallback keywords to their rule priority."""
+    automaton = ahocorasick.Automaton()
+    for priority, (_, words, _) in enumerate(_FALLBACK_RULES):
+        for word in words:
+            automaton.add_word(word, min(priority, automaton.get(word, priority)))
+    automaton.make_automaton()
+    return automaton
+
+
+_FALLBACK_AUTOMATON = _build_fallback_automaton()
+
+_classification_cache: LRUCache[bytes, ClassificationResult] = LRUCache(maxsize=4096)
+
 
 class EmailClassifier:
     """Classifies emails using LangChain and HuggingFace."""
@@ -67,13 +114,7 @@ class EmailClassifier:
     def llm(self) -> ChatHuggingFace:
         """Get or create LLM instance."""
         if self._llm is None:
-            endpoint = HuggingFaceEndpoint(
-                repo_id=self.model_id,
-                huggingfacehub_api_token=self.api_key,
-                max_new_tokens=256,
-                temperature=0.1,
-            )
-            self._llm = ChatHuggingFace(llm=endpoint)
+            self._llm = get_chat_model(self.model_id, self.api_key, max_new_tokens=256, temperature=0.1)
         return self._llm
 
     @property
@@ -81,7 +122,7 @@ class EmailClassifier:
         """Get or create classification chain."""
         if self._chain is None:
             prompt = ChatPromptTemplate.from_template(CLASSIFICATION_PROMPT)
-            parser = JsonOutputParser()
+            parser = FastJsonOutputParser()
             self._chain = prompt | self.llm | parser
         return self._chain
 
@@ -95,20 +136,66 @@ class EmailClassifier:
         Returns:
             ClassificationResult with category, confidence, and reasoning.
         """
-        body = email.body[:2000] if email.body else email.snippet
+        inputs = self._build_inputs(email)
+        key = self._cache_key(inputs)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
 
         try:
-            result = self.chain.invoke(
-                {
-                    "sender": email.sender,
-                    "subject": email.subject,
-                    "body": body,
-                }
-            )
-            return self._parse_result(result)
+            result = self._parse_result(self.chain.invoke(inputs))
         except Exception:
             logger.exception("Classification chain failed")
             return self._fallback_classification(email)
+        self._store_cached(key, result)
+        return result
+
+    async def aclassify(self, email: EmailMessage) -> ClassificationResult:
+        """
+        Classify an email message asynchronously.
+
+        Args:
+            email: EmailMessage to classify.
+
+        Returns:
+            ClassificationResult with category, confidence, and reasoning.
+        """
+        inputs = self._build_inputs(email)
+        key = self._cache_key(inputs)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        try:
+            result = self._parse_result(await self.chain.ainvoke(inputs))
+        except Exception:
+            logger.exception("Classification chain failed")
+            return self._fallback_classification(email)
+        self._store_cached(key, result)
+        return result
+
+    async def aclassify_batch(self, emails: list[EmailMessage]) -> list[ClassificationResult]:
+        """
+        Classify multiple emails concurrently.
+
+        Args:
+            emails: List of EmailMessage objects.
+
+        Returns:
+            List of ClassificationResult objects, in input order.
+        """
+        results: dict[int, ClassificationResult] = {}
+        limiter = anyio.CapacityLimiter(config.LLM_MAX_CONCURRENCY)
+
+        async def classify_one(index: int, email: EmailMessage) -> None:
+            async with limiter:
+                results[index] = await self.aclassify(email)
+
+        async with anyio.create_task_group() as task_group:
+            for index, email in enumerate(emails):
+                task_group.start_soon(classify_one, index, email)
+
+        return [results[index] for index in range(len(emails))]
 
     def classify_batch(self, emails: list[EmailMessage]) -> list[ClassificationResult]:
         """
@@ -120,13 +207,80 @@ class EmailClassifier:
         Returns:
             List of ClassificationResult objects.
         """
-        return [self.classify(email) for email in emails]
+        classifications: list[ClassificationResult | None] = []
+        pending: list[tuple[int, bytes, dict[str, str]]] = []
+        for index, email in enumerate(emails):
+            inputs = self._build_inputs(email)
+            key = self._cache_key(inputs)
+            cached = self._get_cached(key)
+            classifications.append(cached)
+            if cached is None:
+                pending.append((index, key, inputs))
+
+        if not pending:
+            return classifications
+
+        try:
+            results = self.chain.batch(
+                [inputs for _, _, inputs in pending],
+                config={"max_concurrency": config.LLM_MAX_CONCURRENCY},
+                return_exceptions=True,
+            )
+        except Exception:
+            logger.exception("Batch classification chain failed")
+            for index, _, _ in pending:
+                classifications[index] = self._fallback_classification(emails[index])
+            return classifications
+
+        for (index, key, _), result in zip(pending, results, strict=True):
+            email = emails[index]
+            if isinstance(result, Exception):
+                logger.error("Classification chain failed", exc_info=result)
+                classifications[index] = self._fallback_classification(email)
+                continue
+            try:
+                parsed = self._parse_result(result)
+            except Exception:
+                logger.exception("Failed to parse classification result")
+                classifications[index] = self._fallback_classification(email)
+                continue
+            self._store_cached(key, parsed)
+            classifications[index] = parsed
+        return classifications
+
+    def _build_inputs(self, email: EmailMessage) -> dict[str, str]:
+        """Build classification chain inputs for an email."""
+        return {
+            "sender": email.sender,
+            "subject": email.subject,
+            "body": prompt_body(email),
+        }
+
+    def _cache_key(self, inputs: dict[str, str]) -> bytes:
+        """Build the classification cache key for chain inputs."""
+        return content_key(self.model_id, inputs["sender"], inputs["subject"], inputs["body"])
+
+    def _get_cached(self, key: bytes) -> ClassificationResult | None:
+        """Look up a classification in memory, then in the persistent cache."""
+        cached = _classification_cache.get(key)
+        if cached is not None:
+            return cached
+        stored = response_cache.get(key)
+        if stored is None:
+            return None
+        cached = ClassificationResult(**stored)
+        _classification_cache.put(key, cached)
+        return cached
+
+    def _store_cached(self, key: bytes, result: ClassificationResult) -> None:
+        """Store a classification in memory and in the persistent cache."""
+        _classification_cache.put(key, result)
+        response_cache.put(key, asdict(result))
 
     def _parse_result(self, result: dict) -> ClassificationResult:
         """Parse chain output into ClassificationResult."""
         category = result.get("category", "FYI_ONLY").upper()
-        valid_categories = ["NEEDS_REPLY", "FYI_ONLY", "MEETING_REQUEST", "TASK_ACTION"]
-        if category not in valid_categories:
+        if category not in _VALID_CATEGORIES:
             category = "FYI_ONLY"
 
         confidence = float(result.get("confidence", 0.5))
@@ -140,30 +294,18 @@ class EmailClassifier:
 
     def _fallback_classification(self, email: EmailMessage) -> ClassificationResult:
         """Provide fallback classification using heuristics."""
-        subject_lower = email.subject.lower()
-        body_lower = (email.body or email.snippet).lower()
-        combined = f"{subject_lower} {body_lower}"
-
-        if any(word in combined for word in ["meeting", "call", "schedule", "calendar", "invite"]):
-            return ClassificationResult(
-                category="MEETING_REQUEST",
-                confidence=0.6,
-                reasoning="Contains meeting-related keywords",
-            )
-
-        if any(word in combined for word in ["?", "please", "could you", "can you", "would you"]):
-            return ClassificationResult(
-                category="NEEDS_REPLY",
-                confidence=0.6,
-                reasoning="Contains question or request patterns",
-            )
-
-        if any(word in combined for word in ["todo", "task", "action", "deadline", "due"]):
-            return ClassificationResult(
-                category="TASK_ACTION",
-                confidence=0.6,
-                reasoning="Contains task-related keywords",
-            )
+        combined = f"{email.subject} {email.body or email.snippet}".lower()
+
+        best = len(_FALLBACK_RULES)
+        for _, priority in _FALLBACK_AUTOMATON.iter(combined):
+            if priority < best:
+                best = priority
+                if best == 0:
+                    break
+
+        if best < len(_FALLBACK_RULES):
+            category, _, reasoning = _FALLBACK_RULES[best]
+            return ClassificationResult(category=category, confidence=0.6, reasoning=reasoning)
 
         return ClassificationResult(
             category="FYI_ONLY",
@@ -1,11 +1,16 @@
 """Reply drafting agent using LangChain."""
 
 import logging
+import re
 
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+from langchain_core.runnables import Runnable
+from langchain_huggingface import ChatHuggingFace
 
 import config
+from agent.cache import LRUCache
+from agent.llm import get_chat_model
+from agent.text import prompt_body
 from services.gmail_service import EmailMessage
 
 logger = logging.getLogger(__name__)
@@ -34,6 +39,23 @@ Tone: {tone}
 
 Draft reply:"""
 
+IMPROVE_PROMPT = """Improve the following email draft based on the feedback provided.
+
+Current draft:
+{draft}
+
+Feedback:
+{feedback}
+
+Improved draft:"""
+
+_IMPROVE_TEMPLATE = ChatPromptTemplate.from_template(IMPROVE_PROMPT)
+
+_PREAMBLE_LINE_RE = re.compile(
+    r"^[^\S\n]*(?:subject:|re:|draft reply:|improved draft:).*\n?",
+    re.IGNORECASE | re.MULTILINE,
+)
+
 
 class ReplyDrafter:
     """Generates email reply drafts using LangChain."""
@@ -54,18 +76,14 @@ class ReplyDrafter:
         self.api_key = api_key or config.HUGGINGFACE_API_KEY
         self._llm: ChatHuggingFace | None = None
         self._chain = None
+        self._improve_chain = None
+        self._template_chains: LRUCache[str, Runnable] = LRUCache(maxsize=32)
 
     @property
     def llm(self) -> ChatHuggingFace:
         """Get or create LLM instance."""
         if self._llm is None:
-            endpoint = HuggingFaceEndpoint(
-                repo_id=self.model_id,
-                huggingfacehub_api_token=self.api_key,
-                max_new_tokens=512,
-                temperature=0.7,
-            )
-            self._llm = ChatHuggingFace(llm=endpoint)
+            self._llm = get_chat_model(self.model_id, self.api_key, max_new_tokens=512, temperature=0.7)
         return self._llm
 
     @property
@@ -76,6 +94,13 @@ class ReplyDrafter:
             self._chain = prompt | self.llm
         return self._chain
 
+    @property
+    def improve_chain(self):
+        """Get or create draft improvement chain."""
+        if self._improve_chain is None:
+            self._improve_chain = _IMPROVE_TEMPLATE | self.llm
+        return self._improve_chain
+
     def draft_reply(
         self,
         email: EmailMessage,
@@ -95,8 +120,47 @@ class ReplyDrafter:
         Returns:
             Draft reply text.
         """
-        body = email.body[:2000] if email.body else email.snippet
+        try:
+            result = self.chain.invoke(self._build_inputs(email, context, tone, thread_history))
+            return self._clean_draft(result.content)
+        except Exception:
+            logger.exception("Drafting chain failed")
+            return self._fallback_draft(email)
+
+    async def adraft_reply(
+        self,
+        email: EmailMessage,
+        context: str = "",
+        tone: str = "professional",
+        thread_history: list[EmailMessage] | None = None,
+    ) -> str:
+        """
+        Generate a draft reply for an email asynchronously.
+
+        Args:
+            email: EmailMessage to reply to.
+            context: Additional context for the reply.
+            tone: Desired tone (professional, friendly, formal).
+            thread_history: Previous messages in the thread for context.
 
+        Returns:
+            Draft reply text.
+        """
+        try:
+            result = await self.chain.ainvoke(self._build_inputs(email, context, tone, thread_history))
+            return self._clean_draft(result.content)
+        except Exception:
+            logger.exception("Drafting chain failed")
+            return self._fallback_draft(email)
+
+    def _build_inputs(
+        self,
+        email: EmailMessage,
+        context: str,
+        tone: str,
+        thread_history: list[EmailMessage] | None,
+    ) -> dict[str, str]:
+        """Build drafting chain inputs for an email."""
         context_section = ""
         if context:
             context_section = f"Additional context: {context}\n"
@@ -104,20 +168,13 @@ class ReplyDrafter:
             history_text = self._format_thread_history(thread_history)
             context_section += f"\nThread history:\n{history_text}\n"
 
-        try:
-            result = self.chain.invoke(
-                {
-                    "sender": email.sender,
-                    "subject": email.subject,
-                    "body": body,
-                    "context_section": context_section,
-                    "tone": tone,
-                }
-            )
-            return self._clean_draft(result.content)
-        except Exception:
-            logger.exception("Drafting chain failed")
-            return self._fallback_draft(email)
+        return {
+            "sender": email.sender,
+            "subject": email.subject,
+            "body": prompt_body(email),
+            "context_section": context_section,
+            "tone": tone,
+        }
 
     def draft_with_template(
         self,
@@ -136,7 +193,7 @@ class ReplyDrafter:
         Returns:
             Draft reply text.
         """
-        body = email.body[:2000] if email.body else email.snippet
+        body = prompt_body(email)
 
         base_vars = {
             "sender": email.sender,
@@ -147,8 +204,10 @@ class ReplyDrafter:
             base_vars.update(variables)
 
         try:
-            prompt = ChatPromptTemplate.from_template(template)
-            chain = prompt | self.llm
+            chain = self._template_chains.get(template)
+            if chain is None:
+                chain = ChatPromptTemplate.from_template(template) | self.llm
+                self._template_chains.put(template, chain)
             result = chain.invoke(base_vars)
             return self._clean_draft(result.content)
         except Exception:
@@ -166,20 +225,8 @@ class ReplyDrafter:
         Returns:
             Improved draft text.
         """
-        prompt_template = """Improve the following email draft based on the feedback provided.
-
-Current draft:
-{draft}
-
-Feedback:
-{feedback}
-
-Improved draft:"""
-
         try:
-            prompt = ChatPromptTemplate.from_template(prompt_template)
-            chain = prompt | self.llm
-            result = chain.invoke({"draft": draft, "feedback": feedback})
+            result = self.improve_chain.invoke({"draft": draft, "feedback": feedback})
             return self._clean_draft(result.content)
         except Exception:
             logger.exception("Draft improvement failed")
@@ -187,36 +234,15 @@ Improved draft:"""
 
     def _format_thread_history(self, thread: list[EmailMessage]) -> str:
         """Format thread history for context."""
-        history_parts = []
-        for msg in thread[-3:]:
-            history_parts.append(f"---\nFrom: {msg.sender}\nDate: {msg.date.strftime('%Y-%m-%d %H:%M')}\n{msg.snippet}")
-        return "\n".join(history_parts)
+        return "\n".join(
+            f"---\nFrom: {msg.sender}\nDate: {msg.date:%Y-%m-%d %H:%M}\n{msg.snippet}" for msg in thread[-3:]
+        )
 
     def _clean_draft(self, draft: str) -> str:
         """Clean up generated draft text."""
         if not draft:
             return ""
-
-        lines = draft.strip().split("\n")
-        cleaned_lines = []
-        skip_next = False
-
-        for line in lines:
-            if skip_next:
-                skip_next = False
-                continue
-
-            lower = line.lower().strip()
-            if lower.startswith("subject:") or lower.startswith("re:"):
-                continue
-            if lower.startswith("draft reply:"):
-                continue
-            if lower.startswith("improved draft:"):
-                continue
-
-            cleaned_lines.append(line)
-
-        return "\n".join(cleaned_lines).strip()
+        return _PREAMBLE_LINE_RE.sub("", draft).strip()
 
     def _fallback_draft(self, email: EmailMessage) -> str:
         """Generate a simple fallback draft."""
@@ -234,3 +260,5 @@ Best regards"""
         self.model_id = model_id
         self._llm = None
         self._chain = None
+        self._improve_chain = None
+        self._template_chains.clear()
@@ -0,0 +1,62 @@
+"""Shared LLM construction for the agents."""
+
+import math
+from functools import lru_cache
+from typing import Any
+
+import orjson
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.outputs import Generation
+from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+
+import config
+
+
+@lru_cache(maxsize=8)
+def get_chat_model(model_id: str, api_key: str, max_new_tokens: int, temperature: float) -> ChatHuggingFace:
+    """
+    Get a chat model, reusing the instance built for identical settings.
+
+    Agents with the same model and generation settings share one endpoint.
+    The endpoint's InferenceClient sends requests over huggingface_hub's shared
+    keep-alive httpx pool, so connections are reused across calls.
+
+    Args:
+        model_id: HuggingFace model ID.
+        api_key: HuggingFace API key.
+        max_new_tokens: Maximum tokens to generate.
+        temperature: Sampling temperature.
+
+    Returns:
+        ChatHuggingFace wrapping the shared endpoint.
+    """
+    endpoint = HuggingFaceEndpoint(
+        repo_id=model_id,
+        huggingfacehub_api_token=api_key,
+        max_new_tokens=max_new_tokens,
+        temperature=temperature,
+        timeout=math.ceil(config.LLM_TIMEOUT_SECONDS),
+    )
+    return ChatHuggingFace(llm=endpoint)
+
+
+class FastJsonOutputParser(JsonOutputParser):
+    """JSON output parser that tries orjson on bare JSON before LangChain's tolerant parsing."""
+
+    def parse_result(self, result: list[Generation], *, partial: bool = False) -> Any:
+        """
+        Parse the text of an LLM result as JSON.
+
+        Args:
+            result: The result of the LLM call.
+            partial: Whether to parse partial JSON objects.
+
+        Returns:
+            The parsed JSON value.
+        """
+        if not partial:
+            try:
+                return orjson.loads(result[0].text)
+            except orjson.JSONDecodeError:
+                pass
+        return super().parse_result(result, partial=partial)
@@ -1,23 +1,30 @@
 """Meeting scheduling agent using LangChain."""
 
+import json
 import logging
 import re
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-from langchain_core.output_parsers import JsonOutputParser
+import ahocorasick
+import anyio
+from dateutil import parser as date_parser
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
+from langchain_huggingface import ChatHuggingFace
 
 import config
+from agent.cache import LRUCache, content_key, response_cache
+from agent.llm import FastJsonOutputParser, get_chat_model
+from agent.text import prompt_body
 from services.calendar_service import CalendarService, MeetingDetails, TimeSlot
 from services.gmail_service import EmailMessage
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class MeetingExtraction:
     """Extracted meeting details from email."""
 
@@ -30,7 +37,7 @@ class MeetingExtraction:
     notes: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SchedulingProposal:
     """Proposed meeting schedule."""
 
@@ -60,6 +67,110 @@ Respond with a JSON object:
 
 JSON:"""
 
+BATCH_EXTRACTION_PROMPT = """Extract meeting details from each of these emails. For each email, identify if a meeting is being requested.
+
+Emails (JSON array):
+{emails_json}
+
+Respond with a JSON array containing one object per email, in the same order, each with:
+{{
+    "id": "the email id",
+    "has_meeting_request": true/false,
+    "title": "meeting title or subject",
+    "proposed_times": ["any mentioned times/dates"],
+    "duration_minutes": estimated duration (default 60),
+    "attendees": ["email addresses if mentioned"],
+    "location": "location if mentioned",
+    "notes": "relevant details"
+}}
+
+JSON:"""
+
+# Number of free slots offered in a scheduling proposal.
+_PROPOSAL_MAX_SLOTS = 10
+
+# Output token budget for a batched extraction call; roughly 150 tokens per email.
+_BATCH_MAX_NEW_TOKENS = 2048
+
+
+_MEETING_KEYWORDS = [
+    "meeting",
+    "call",
+    "schedule",
+    "calendar",
+    "invite",
+    "available",
+    "discuss",
+    "catch up",
+    "sync",
+]
+
+# Duration hints for the heuristic fallback, highest priority first.
+_DURATION_HINTS = [
+    ("30 min", 30),
+    ("half hour", 30),
+    ("2 hour", 120),
+    ("15 min", 15),
+]
+
+
+def _build_fallback_automaton() -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton over meeting keywords and duration hints."""
+    automaton = ahocorasick.Automaton()
+    for rank, (hint, _) in enumerate(_DURATION_HINTS):
+        automaton.add_word(hint, (False, rank))
+    for word in _MEETING_KEYWORDS:
+        automaton.add_word(word, (True, 0))
+    automaton.make_automaton()
+    return automaton
+
+
+_FALLBACK_AUTOMATON = _build_fallback_automaton()
+
+# Clock times such as "3pm", "10:30" or "9 AM"; any of these sends an email to the LLM.
+_TIME_TOKEN_RE = re.compile(r"\b\d{1,2}(?::\d{2}\s*(?:am|pm)?|\s*(?:am|pm))\b", re.IGNORECASE)
+
+# Explicit calendar dates: ISO or slash dates, ordinal days such as "20th" and month names.
+_EXPLICIT_DATE_RE = re.compile(
+    r"\b(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?|\d{1,2}(?:st|nd|rd|th)"
+    r"|jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b",
+    re.IGNORECASE,
+)
+# A written year: four digits on their own or the last part of a slash date.
+_YEAR_RE = re.compile(r"\b\d{4}\b|\b\d{1,2}/\d{1,2}/\d{2,4}\b")
+_WEEKDAY_RE = re.compile(r"\b(mon|tue|wed|thu|fri|sat|sun)(?:s|nes|rs?|ur)?(?:day)?\b", re.IGNORECASE)
+_WEEKDAY_INDEX = {name: index for index, name in enumerate(["mon", "tue", "wed", "thu", "fri", "sat", "sun"])}
+
+_SCHEDULING_REPLY = """Thank you for reaching out about scheduling a meeting.
+
+{body}
+
+Best regards"""
+
+_CONFLICTS_BODY = """Unfortunately, some of the proposed times have conflicts:
+{conflicts}
+
+Here are some alternative times that work for me:
+{slots}
+
+Please let me know which of these works best for you."""
+
+_AVAILABLE_BODY = """I'm available at the following times:
+{slots}
+
+Please let me know which works best for you, and I'll send a calendar invite."""
+
+_NO_SLOTS_BODY = "I'll check my calendar and get back to you with some available times."
+
+
+def _copy_extraction(extraction: MeetingExtraction) -> MeetingExtraction:
+    """Copy an extraction so callers can change its lists without touching the cached one."""
+    return replace(extraction, proposed_times=list(extraction.proposed_times), attendees=list(extraction.attendees))
+
+
+_extraction_cache: LRUCache[bytes, MeetingExtraction] = LRUCache(maxsize=2048)
+
 
 class MeetingScheduler:
     """Handles meeting extraction and scheduling."""
@@ -86,18 +197,24 @@ class MeetingScheduler:
         self._calendar = calendar_service
         self._llm: ChatHuggingFace | None = None
         self._extraction_chain = None
+        self._batch_extraction_chain = None
+
+    @property
+    def timezone(self) -> str:
+        """Get the scheduling timezone name."""
+        return self._timezone
+
+    @timezone.setter
+    def timezone(self, timezone: str) -> None:
+        """Set the scheduling timezone and cache its ZoneInfo."""
+        self._timezone = timezone
+        self._tz = ZoneInfo(timezone)
 
     @property
     def llm(self) -> ChatHuggingFace:
         """Get or create LLM instance."""
         if self._llm is None:
-            endpoint = HuggingFaceEndpoint(
-                repo_id=self.model_id,
-                huggingfacehub_api_token=self.api_key,
-                max_new_tokens=256,
-                temperature=0.1,
-            )
-            self._llm = ChatHuggingFace(llm=endpoint)
+            self._llm = get_chat_model(self.model_id, self.api_key, max_new_tokens=256, temperature=0.1)
         return self._llm
 
     @property
@@ -112,10 +229,19 @@ class MeetingScheduler:
         """Get or create extraction chain."""
         if self._extraction_chain is None:
             prompt = ChatPromptTemplate.from_template(EXTRACTION_PROMPT)
-            parser = JsonOutputParser()
+            parser = FastJsonOutputParser()
             self._extraction_chain = prompt | self.llm | parser
         return self._extraction_chain
 
+    @property
+    def batch_extraction_chain(self):
+        """Get or create batched extraction chain."""
+        if self._batch_extraction_chain is None:
+            prompt = ChatPromptTemplate.from_template(BATCH_EXTRACTION_PROMPT)
+            llm = get_chat_model(self.model_id, self.api_key, max_new_tokens=_BATCH_MAX_NEW_TOKENS, temperature=0.1)
+            self._batch_extraction_chain = prompt | llm | FastJsonOutputParser()
+        return self._batch_extraction_chain
+
     def extract_meeting_details(self, email: EmailMessage) -> MeetingExtraction:
         """
         Extract meeting details from an email.
@@ -126,20 +252,183 @@ class MeetingScheduler:
         Returns:
             MeetingExtraction with parsed details.
         """
-        body = email.body[:2000] if email.body else email.snippet
+        skipped = self._skip_llm_extraction(email)
+        if skipped is not None:
+            return skipped
+
+        inputs = self._build_inputs(email)
+        key = self._cache_key(inputs)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
 
         try:
-            result = self.extraction_chain.invoke(
-                {
-                    "sender": email.sender,
-                    "subject": email.subject,
-                    "body": body,
-                }
-            )
-            return self._parse_extraction(result, email)
+            extraction = self._parse_extraction(self.extraction_chain.invoke(inputs), email)
+        except Exception:
+            logger.exception("Meeting extraction failed")
+            return self._fallback_extraction(email)
+        self._store_cached(key, extraction)
+        return extraction
+
+    async def aextract_meeting_details(self, email: EmailMessage) -> MeetingExtraction:
+        """
+        Extract meeting details from an email asynchronously.
+
+        Args:
+            email: EmailMessage to analyze.
+
+        Returns:
+            MeetingExtraction with parsed details.
+        """
+        skipped = self._skip_llm_extraction(email)
+        if skipped is not None:
+            return skipped
+
+        inputs = self._build_inputs(email)
+        key = self._cache_key(inputs)
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        try:
+            with anyio.fail_after(config.LLM_TIMEOUT_SECONDS):
+                result = await self.extraction_chain.ainvoke(inputs)
+            extraction = self._parse_extraction(result, email)
         except Exception:
             logger.exception("Meeting extraction failed")
             return self._fallback_extraction(email)
+        self._store_cached(key, extraction)
+        return extraction
+
+    async def aextract_many(
+        self,
+        emails: list[EmailMessage],
+        max_concurrent: int | None = None,
+    ) -> list[MeetingExtraction]:
+        """
+        Extract meeting details from multiple emails concurrently.
+
+        Args:
+            emails: EmailMessages to analyze.
+            max_concurrent: Maximum in-flight requests (defaults to LLM_MAX_CONCURRENCY).
+
+        Returns:
+            MeetingExtraction for each email, in input order.
+        """
+        results: dict[int, MeetingExtraction] = {}
+        limiter = anyio.CapacityLimiter(max_concurrent or config.LLM_MAX_CONCURRENCY)
+
+        async def extract_one(index: int, email: EmailMessage) -> None:
+            async with limiter:
+                results[index] = await self.aextract_meeting_details(email)
+
+        async with anyio.create_task_group() as task_group:
+            for index, email in enumerate(emails):
+                task_group.start_soon(extract_one, index, email)
+
+        return [results[index] for index in range(len(emails))]
+
+    def _build_inputs(self, email: EmailMessage) -> dict[str, str]:
+        """Build extraction chain inputs for an email."""
+        return {
+            "sender": email.sender,
+            "subject": email.subject,
+            "body": prompt_body(email),
+        }
+
+    def _skip_llm_extraction(self, email: EmailMessage) -> MeetingExtraction | None:
+        """Return the heuristic extraction when an email has no meeting keyword or clock time, else None."""
+        extraction = self._fallback_extraction(email)
+        if extraction.has_meeting_request:
+            return None
+        if _TIME_TOKEN_RE.search(email.subject) or _TIME_TOKEN_RE.search(email.body or email.snippet):
+            return None
+        logger.debug("Skipping LLM meeting extraction for %s: no meeting signal", email.id)
+        return extraction
+
+    def _cache_key(self, inputs: dict[str, str]) -> bytes:
+        """Build the extraction cache key for chain inputs."""
+        return content_key("extraction", self.model_id, inputs["sender"], inputs["subject"], inputs["body"])
+
+    def _get_cached(self, key: bytes) -> MeetingExtraction | None:
+        """Look up an extraction in memory, then in the persistent cache."""
+        cached = _extraction_cache.get(key)
+        if cached is not None:
+            return _copy_extraction(cached)
+        stored = response_cache.get(key)
+        if stored is None:
+            return None
+        cached = MeetingExtraction(**stored)
+        _extraction_cache.put(key, cached)
+        return _copy_extraction(cached)
+
+    def _store_cached(self, key: bytes, extraction: MeetingExtraction) -> None:
+        """Store an extraction in memory and in the persistent cache."""
+        _extraction_cache.put(key, _copy_extraction(extraction))
+        response_cache.put(key, asdict(extraction))
+
+    def extract_meeting_details_batch(
+        self,
+        emails: list[EmailMessage],
+        batch_size: int = 10,
+    ) -> list[MeetingExtraction]:
+        """
+        Extract meeting details from several emails with one LLM call per batch.
+
+        Args:
+            emails: EmailMessages to analyze.
+            batch_size: Maximum number of emails packed into a single prompt.
+
+        Returns:
+            MeetingExtraction for each email, in input order.
+        """
+        extractions: list[MeetingExtraction] = []
+        for start in range(0, len(emails), batch_size):
+            extractions.extend(self._extract_batch(emails[start : start + batch_size]))
+        return extractions
+
+    def _extract_batch(self, emails: list[EmailMessage]) -> list[MeetingExtraction]:
+        """Extract meeting details for one batch, falling back per email on missing results."""
+        inputs = [self._build_inputs(email) for email in emails]
+        keys = [self._cache_key(email_inputs) for email_inputs in inputs]
+        resolved = [
+            self._skip_llm_extraction(email) or self._get_cached(key) for email, key in zip(emails, keys, strict=True)
+        ]
+
+        payload = [
+            {"id": email.id, **email_inputs}
+            for email, email_inputs, known in zip(emails, inputs, resolved, strict=True)
+            if known is None
+        ]
+        results = []
+        if payload:
+            try:
+                results = self.batch_extraction_chain.invoke({"emails_json": json.dumps(payload)})
+            except Exception:
+                logger.exception("Batch meeting extraction failed")
+
+        by_id = {}
+        if isinstance(results, list):
+            by_id = {str(r.get("id")): r for r in results if isinstance(r, dict)}
+
+        extractions = []
+        for email, key, known in zip(emails, keys, resolved, strict=True):
+            if known is not None:
+                extractions.append(known)
+                continue
+            result = by_id.get(email.id)
+            if result is None:
+                extractions.append(self._fallback_extraction(email))
+                continue
+            try:
+                extraction = self._parse_extraction(result, email)
+            except (TypeError, ValueError):
+                logger.exception("Failed to parse meeting extraction")
+                extractions.append(self._fallback_extraction(email))
+                continue
+            self._store_cached(key, extraction)
+            extractions.append(extraction)
+        return extractions
 
     def create_scheduling_proposal(
         self,
@@ -154,20 +443,10 @@ class MeetingScheduler:
             email: Original email for context.
 
         Returns:
-            SchedulingProposal with available slots and suggested reply.
+            SchedulingProposal with available slots and suggested reply; emails without
+            a meeting request get no slots and an empty reply.
         """
-        now = datetime.now(ZoneInfo(self.timezone))
-        end_range = now + timedelta(days=14)
-
-        available_slots = self.calendar.find_free_slots(
-            start_date=now,
-            end_date=end_range,
-            duration_minutes=extraction.duration_minutes,
-        )
-
-        conflicts = self._check_proposed_times(extraction.proposed_times)
-
-        attendees = extraction.attendees or []
+        attendees = list(extraction.attendees)
         if email.sender_email and email.sender_email not in attendees:
             attendees.append(email.sender_email)
 
@@ -180,11 +459,26 @@ class MeetingScheduler:
             timezone=self.timezone,
         )
 
-        suggested_reply = self._generate_scheduling_reply(extraction, available_slots[:5], conflicts)
+        if not extraction.has_meeting_request:
+            return SchedulingProposal(meeting=meeting, available_slots=[], conflicts=[], suggested_reply="")
+
+        now = datetime.now(self._tz)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            slots_future = executor.submit(
+                self.calendar.find_free_slots,
+                start_date=now,
+                end_date=now + timedelta(days=14),
+                duration_minutes=extraction.duration_minutes,
+                max_results=_PROPOSAL_MAX_SLOTS,
+            )
+            conflicts_future = executor.submit(self._check_proposed_times, extraction.proposed_times)
+            available_slots = slots_future.result()
+            conflicts = conflicts_future.result()
+        suggested_reply = self._generate_scheduling_reply(extraction, available_slots, conflicts)
 
         return SchedulingProposal(
             meeting=meeting,
-            available_slots=available_slots[:10],
+            available_slots=available_slots,
             conflicts=conflicts,
             suggested_reply=suggested_reply,
         )
@@ -248,28 +542,19 @@ class MeetingScheduler:
         """Fallback meeting extraction using heuristics."""
         combined = f"{email.subject} {email.body or email.snippet}".lower()
 
-        has_meeting = any(
-            word in combined
-            for word in [
-                "meeting",
-                "call",
-                "schedule",
-                "calendar",
-                "invite",
-                "available",
-                "discuss",
-                "catch up",
-                "sync",
-            ]
-        )
+        has_meeting = False
+        duration_rank = len(_DURATION_HINTS)
+        for _, (is_meeting_word, rank) in _FALLBACK_AUTOMATON.iter(combined):
+            if is_meeting_word:
+                has_meeting = True
+            else:
+                duration_rank = min(duration_rank, rank)
+            if has_meeting and duration_rank == 0:
+                break
 
         duration = 60
-        if "30 min" in combined or "half hour" in combined:
-            duration = 30
-        elif "2 hour" in combined:
-            duration = 120
-        elif "15 min" in combined:
-            duration = 15
+        if duration_rank < len(_DURATION_HINTS):
+            duration = _DURATION_HINTS[duration_rank][1]
 
         return MeetingExtraction(
             has_meeting_request=has_meeting,
@@ -283,48 +568,58 @@ class MeetingScheduler:
 
     def _check_proposed_times(self, proposed_times: list[str]) -> list[str]:
         """Check for conflicts with proposed times."""
-        conflicts = []
+        now = datetime.now(self._tz)
+        parsed_times = []
         for time_str in proposed_times:
-            parsed = self._parse_time_string(time_str)
+            parsed = self._parse_time_string(time_str, now=now)
             if parsed:
-                start, end = parsed
-                if not self.calendar.check_availability(start, end):
-                    conflicts.append(f"{time_str} - conflict detected")
-        return conflicts
-
-    def _parse_time_string(self, time_str: str) -> tuple[datetime, datetime] | None:
-        """Attempt to parse a natural language time string."""
-        tz = ZoneInfo(self.timezone)
-        now = datetime.now(tz)
-
-        patterns = [
-            r"(\d{1,2}):(\d{2})\s*(am|pm)?",
-            r"(\d{1,2})\s*(am|pm)",
+                parsed_times.append((time_str, parsed))
+        if not parsed_times:
+            return []
+
+        available = self.calendar.check_availability_batch([interval for _, interval in parsed_times])
+        return [
+            f"{time_str} - conflict detected"
+            for (time_str, _), is_free in zip(parsed_times, available, strict=True)
+            if not is_free
         ]
 
-        for pattern in patterns:
-            match = re.search(pattern, time_str.lower())
-            if match:
-                try:
-                    groups = match.groups()
-                    hour = int(groups[0])
-                    minute = int(groups[1]) if len(groups) > 1 and groups[1] and groups[1].isdigit() else 0
-                    period = groups[-1] if groups[-1] in ("am", "pm") else None
-
-                    if period == "pm" and hour < 12:
-                        hour += 12
-                    elif period == "am" and hour == 12:
-                        hour = 0
-
-                    start = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-                    if start < now:
-                        start += timedelta(days=1)
-                    end = start + timedelta(hours=1)
-                    return (start, end)
-                except (ValueError, IndexError):
-                    continue
-
-        return None
+    def _parse_time_string(
+        self,
+        time_str: str,
+        *,
+        now: datetime | None = None,
+    ) -> tuple[datetime, datetime] | None:
+        """Attempt to parse a natural language time string relative to now (defaults to the current time)."""
+        tz = self._tz
+        if now is None:
+            now = datetime.now(tz)
+        default = now.replace(hour=9, minute=0, second=0, microsecond=0)
+        if "tomorrow" in time_str.lower():
+            default += timedelta(days=1)
+
+        try:
+            start = date_parser.parse(time_str, default=default, fuzzy=True)
+        except (ValueError, OverflowError):
+            return None
+
+        has_date = _EXPLICIT_DATE_RE.search(time_str) is not None
+        weekday = None if has_date else _WEEKDAY_RE.search(time_str)
+        if has_date and _YEAR_RE.search(time_str) is None:
+            # Without a written year a stray number such as "room 3" can be read as the year
+            start = start.replace(year=default.year)
+        if not has_date:
+            expected = default
+            if weekday is not None:
+                expected += timedelta(days=(_WEEKDAY_INDEX[weekday.group(1).lower()] - default.weekday()) % 7)
+            # A fuzzy parse reads a lone number such as "room 12" as the day of the month
+            start = start.replace(year=expected.year, month=expected.month, day=expected.day)
+
+        start = start.astimezone(tz) if start.tzinfo else start.replace(tzinfo=tz)
+        if start < now and not has_date:
+            # An explicit date is kept as written; a bare weekday or time means the next occurrence
+            start += timedelta(days=7 if weekday is not None else 1)
+        return (start, start + timedelta(hours=1))
 
     def _generate_scheduling_reply(
         self,
@@ -335,47 +630,20 @@ class MeetingScheduler:
         """Generate a suggested reply for scheduling."""
         if conflicts:
             conflict_text = "\n".join(f"- {c}" for c in conflicts)
-            slot_text = self._format_slots(available_slots[:3])
-            return f"""Thank you for reaching out about scheduling a meeting.
-
-Unfortunately, some of the proposed times have conflicts:
-{conflict_text}
-
-Here are some alternative times that work for me:
-{slot_text}
-
-Please let me know which of these works best for you.
-
-Best regards"""
-
-        if available_slots:
-            slot_text = self._format_slots(available_slots[:3])
-            return f"""Thank you for reaching out about scheduling a meeting.
-
-I'm available at the following times:
-{slot_text}
-
-Please let me know which works best for you, and I'll send a calendar invite.
-
-Best regards"""
-
-        return """Thank you for reaching out about scheduling a meeting.
-
-I'll check my calendar and get back to you with some available times.
-
-Best regards"""
+            body = _CONFLICTS_BODY.format(conflicts=conflict_text, slots=self._format_slots(available_slots[:3]))
+        elif available_slots:
+            body = _AVAILABLE_BODY.format(slots=self._format_slots(available_slots[:3]))
+        else:
+            body = _NO_SLOTS_BODY
+        return _SCHEDULING_REPLY.format(body=body)
 
     def _format_slots(self, slots: list[TimeSlot]) -> str:
         """Format time slots for display."""
-        lines = []
-        for slot in slots:
-            date_str = slot.start.strftime("%A, %B %d")
-            time_str = slot.start.strftime("%I:%M %p")
-            lines.append(f"- {date_str} at {time_str}")
-        return "\n".join(lines)
+        return "\n".join(slot.start.strftime("- %A, %B %d at %I:%M %p") for slot in slots)
 
     def set_model(self, model_id: str) -> None:
         """Change the scheduler model."""
         self.model_id = model_id
         self._llm = None
         self._extraction_chain = None
+        self._batch_extraction_chain = None
@@ -0,0 +1,52 @@
+"""Text helpers shared by the LLM agents."""
+
+import re
+
+import config
+from services.gmail_service import EmailMessage
+
+# Quoted reply lines ("> ...") and the "On <date>, <name> wrote:" headers above them.
+_QUOTED_LINE_RE = re.compile(r"^(?:[^\S\n]*>.*|On .* wrote:[^\S\n]*)(?:\n|$)", re.MULTILINE)
+_INLINE_SPACE_RE = re.compile(r"[^\S\n]{2,}")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def clean_body(body: str) -> str:
+    """
+    Remove quoted replies and redundant whitespace from an email body.
+
+    Args:
+        body: Plain-text email body.
+
+    Returns:
+        The body without quoted lines, with runs of spaces collapsed and at most
+        one blank line between paragraphs. Clean bodies are returned as-is.
+    """
+    body = _QUOTED_LINE_RE.sub("", body)
+    body = _INLINE_SPACE_RE.sub(" ", body)
+    body = _BLANK_LINES_RE.sub("\n\n", body)
+    return body.strip()
+
+
+def prompt_body(email: EmailMessage, max_chars: int = config.LLM_BODY_MAX_CHARS) -> str:
+    """
+    Get the email text to send to the LLM.
+
+    Args:
+        email: EmailMessage to read.
+        max_chars: Maximum number of body characters to keep after cleaning.
+
+    Returns:
+        The cleaned body truncated to max_chars, or the snippet when there is no body.
+        Clean bodies that already fit are returned as-is without copying.
+    """
+    body = email.body
+    if not body:
+        return email.snippet
+    # Bound the cleaning work on very long bodies; quoted text rarely survives the cut anyway.
+    if len(body) > 4 * max_chars:
+        body = body[: 4 * max_chars]
+    body = clean_body(body) or email.snippet
+    if len(body) <= max_chars:
+        return body
+    return body[:max_chars]
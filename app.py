@@ -4,8 +4,10 @@ A Streamlit application that uses LangChain and LLMs to manage Gmail inbox
 and Google Calendar with AI-powered classification, drafting, and scheduling.
 """
 
+import importlib
 import logging
 import sys
+from collections.abc import Callable
 from pathlib import Path
 
 import streamlit as st
@@ -13,10 +15,6 @@ import streamlit as st
 sys.path.insert(0, str(Path(__file__).parent))
 
 from auth.google_auth import is_authenticated
-from ui.calendar_view import render_calendar
-from ui.draft_view import render_drafts
-from ui.inbox_view import render_inbox
-from ui.settings_view import render_settings
 
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +29,21 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+# Page label -> (module, render function). Views are imported on first visit so a
+# rerun only loads the LangChain/Google client stack that the current page needs.
+PAGES = {
+    " Inbox": ("ui.inbox_view", "render_inbox"),
+    " Drafts": ("ui.draft_view", "render_drafts"),
+    " Calendar": ("ui.calendar_view", "render_calendar"),
+    " Settings": ("ui.settings_view", "render_settings"),
+}
+
+
+def get_page_renderer(page: str) -> Callable[[], None]:
+    """Import the view module for a page and return its render function."""
+    module_name, function_name = PAGES[page]
+    return getattr(importlib.import_module(module_name), function_name)
+
 
 def main() -> None:
     """Main application entry point."""
@@ -48,7 +61,7 @@ def main() -> None:
 
     page = st.sidebar.radio(
         "Navigation",
-        [" Inbox", " Drafts", " Calendar", " Settings"],
+        list(PAGES),
         label_visibility="collapsed",
     )
 
@@ -64,17 +77,10 @@ def main() -> None:
 
     if not is_authenticated() and page != " Settings":
         st.warning(" Please connect your Google account in Settings to use the Gmail Agent.")
-        render_settings()
+        get_page_renderer(" Settings")()
         return
 
-    if page == " Inbox":
-        render_inbox()
-    elif page == " Drafts":
-        render_drafts()
-    elif page == " Calendar":
-        render_calendar()
-    elif page == " Settings":
-        render_settings()
+    get_page_renderer(page)()
 
 
 if __name__ == "__main__":
@@ -2,17 +2,44 @@
 
 import json
 import logging
+import threading
+from functools import lru_cache
 from typing import Any
 
+import httplib2
+import orjson
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import Resource, build
+from googleapiclient.http import HttpRequest
+from googleapiclient.model import JsonModel
 
 import config
 
 logger = logging.getLogger(__name__)
 
+# (token.json mtime_ns, parsed credentials) from the last read of the token file.
+_token_cache: tuple[int, Credentials] | None = None
+
+# Per-thread authorized connections; httplib2.Http must not be shared between threads.
+_thread_http = threading.local()
+
+
+class _OrjsonModel(JsonModel):
+    """JSON request/response model that parses API responses with orjson."""
+
+    def deserialize(self, content: bytes | str) -> Any:
+        """Parse a response body, returning it as text if it is not JSON."""
+        try:
+            body = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            return content.decode("utf-8") if isinstance(content, bytes) else content
+        if self._data_wrapper and "data" in body:
+            body = body["data"]
+        return body
+
 
 def get_credentials() -> Credentials:
     """
@@ -27,10 +54,7 @@ def get_credentials() -> Credentials:
     Raises:
         FileNotFoundError: If credentials.json is not found and no token exists.
     """
-    creds: Credentials | None = None
-
-    if config.TOKEN_PATH.exists():
-        creds = Credentials.from_authorized_user_file(str(config.TOKEN_PATH), config.GOOGLE_SCOPES)
+    creds = _load_token_credentials()
 
     if not creds or not creds.valid:
         if creds and creds.expired and creds.refresh_token:
@@ -85,9 +109,24 @@ def _create_credentials_from_env() -> dict[str, Any] | None:
 
 def _save_credentials(creds: Credentials) -> None:
     """Save credentials to token.json."""
+    global _token_cache
     config.TOKEN_PATH.parent.mkdir(parents=True, exist_ok=True)
     with open(config.TOKEN_PATH, "w") as token:
         token.write(creds.to_json())
+    _token_cache = None
+
+
+def _load_token_credentials() -> Credentials | None:
+    """Load credentials from token.json, reparsing only when the file has changed."""
+    global _token_cache
+    mtime_ns = _token_mtime_ns()
+    if not mtime_ns:
+        _token_cache = None
+        return None
+    if _token_cache is None or _token_cache[0] != mtime_ns:
+        creds = Credentials.from_authorized_user_file(str(config.TOKEN_PATH), config.GOOGLE_SCOPES)
+        _token_cache = (mtime_ns, creds)
+    return _token_cache[1]
 
 
 def get_gmail_service() -> Resource:
@@ -97,8 +136,7 @@ def get_gmail_service() -> Resource:
     Returns:
         Gmail API service resource.
     """
-    creds = get_credentials()
-    return build("gmail", "v1", credentials=creds)
+    return _build_service("gmail", "v1", _token_mtime_ns())
 
 
 def get_calendar_service() -> Resource:
@@ -108,8 +146,37 @@ def get_calendar_service() -> Resource:
     Returns:
         Calendar API service resource.
     """
-    creds = get_credentials()
-    return build("calendar", "v3", credentials=creds)
+    return _build_service("calendar", "v3", _token_mtime_ns())
+
+
+@lru_cache(maxsize=4)
+def _build_service(name: str, version: str, token_mtime_ns: int) -> Resource:
+    """Build an API service, reused until token.json changes."""
+    return build(
+        name,
+        version,
+        credentials=get_credentials(),
+        static_discovery=True,
+        requestBuilder=_build_request,
+        model=_OrjsonModel(),
+    )
+
+
+def _build_request(http: AuthorizedHttp, *args: Any, **kwargs: Any) -> HttpRequest:
+    """Build an API request on the calling thread's own connection so shared services are thread-safe."""
+    thread_http = getattr(_thread_http, "http", None)
+    if thread_http is None or thread_http.credentials is not http.credentials:
+        thread_http = AuthorizedHttp(http.credentials, http=httplib2.Http())
+        _thread_http.http = thread_http
+    return HttpRequest(thread_http, *args, **kwargs)
+
+
+def _token_mtime_ns() -> int:
+    """Get token.json's modification time, or 0 if it does not exist."""
+    try:
+        return config.TOKEN_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
 
 
 def revoke_credentials() -> bool:
@@ -119,10 +186,11 @@ def revoke_credentials() -> bool:
     Returns:
         True if successfully revoked, False otherwise.
     """
+    global _token_cache
     if config.TOKEN_PATH.exists():
         try:
-            creds = Credentials.from_authorized_user_file(str(config.TOKEN_PATH), config.GOOGLE_SCOPES)
-            if creds.token:
+            creds = _load_token_credentials()
+            if creds and creds.token:
                 import requests
 
                 requests.post(
@@ -131,6 +199,8 @@ def revoke_credentials() -> bool:
                     headers={"content-type": "application/x-www-form-urlencoded"},
                 )
             config.TOKEN_PATH.unlink()
+            _token_cache = None
+            _build_service.cache_clear()
             return True
         except Exception:
             logger.exception("Failed to revoke credentials")
@@ -140,10 +210,10 @@ def revoke_credentials() -> bool:
 
 def is_authenticated() -> bool:
     """Check if valid credentials exist."""
-    if not config.TOKEN_PATH.exists():
-        return False
     try:
-        creds = Credentials.from_authorized_user_file(str(config.TOKEN_PATH), config.GOOGLE_SCOPES)
+        creds = _load_token_credentials()
+        if creds is None:
+            return False
         return creds.valid or (creds.expired and creds.refresh_token is not None)
     except Exception:
         return False
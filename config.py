@@ -27,6 +27,10 @@ CREDENTIALS_PATH = DATA_DIR / "credentials.json"
 # HuggingFace settings
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
 LLM_MODEL_ID = os.getenv("LLM_MODEL_ID", "meta-llama/Llama-3.1-8B-Instruct")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_BODY_MAX_CHARS = 2000
+LLM_CACHE_PATH = Path(os.getenv("LLM_CACHE_PATH", str(DATA_DIR / "llm_cache.db")))
 
 # Agent settings
 CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.7"))
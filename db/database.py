@@ -1,13 +1,15 @@
 """Database operations for the Gmail Agent."""
 
-import json
 import logging
 from collections.abc import Generator
 from contextlib import contextmanager
-from datetime import datetime
+from datetime import UTC, datetime
+from typing import Any
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, joinedload, sessionmaker
+import orjson
+from sqlalchemy import Engine, Row, create_engine, delete, event, exists, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload, sessionmaker
 
 import config
 from db.models import Base, CalendarAction, Classification, Draft, Email, Feedback, KnownSender
@@ -15,19 +17,65 @@ from services.gmail_service import EmailMessage
 
 logger = logging.getLogger(__name__)
 
+# Rows per upsert statement; 500 rows of email columns stays well under SQLite's bound-parameter limit.
+_UPSERT_CHUNK_SIZE = 500
+
+# Applied to every new SQLite connection: WAL lets reads run alongside a write and,
+# with synchronous=NORMAL, commits no longer fsync the main database file.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
 _engine = None
 _SessionLocal = None
 
 
+def _json_dumps(value: Any) -> str:
+    """Serialize a JSON column value with orjson."""
+    return orjson.dumps(value).decode()
+
+
+def _set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+    """Configure a new SQLite connection for concurrent, low-latency use."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
 def get_engine():
     """Get or create database engine."""
     global _engine
     if _engine is None:
-        _engine = create_engine(config.DATABASE_URL, echo=False)
+        _engine = create_engine(
+            config.DATABASE_URL,
+            echo=False,
+            pool_size=5,
+            max_overflow=10,
+            pool_pre_ping=True,
+            connect_args={"check_same_thread": False, "timeout": 30},
+            json_serializer=_json_dumps,
+            json_deserializer=orjson.loads,
+        )
+        event.listen(_engine, "connect", _set_sqlite_pragmas)
         Base.metadata.create_all(_engine)
+        _create_missing_indexes(_engine)
     return _engine
 
 
+def _create_missing_indexes(engine: Engine) -> None:
+    """Create indexes added to existing tables, which create_all skips."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+
 def get_session_factory():
     """Get or create session factory."""
     global _SessionLocal
@@ -66,30 +114,80 @@ class Database:
             with get_db() as session:
                 yield session
 
+    @contextmanager
+    def transaction(self) -> Generator["Database", None, None]:
+        """
+        Group several operations into one transaction.
+
+        Yields:
+            A Database bound to a single session that commits when the block exits,
+            or this instance if it is already bound to a session.
+        """
+        if self._session:
+            yield self
+        else:
+            with get_db() as session:
+                yield Database(session=session)
+
+    def _update_by_id(self, model: type[Base], pk: int, **values: Any) -> bool:
+        """Set columns on one row with a single UPDATE, reporting whether the row exists."""
+        with self._get_session() as session:
+            result = session.execute(update(model).where(model.id == pk).values(**values))
+            return result.rowcount > 0
+
     def save_email(self, email: EmailMessage) -> Email:
         """Save or update an email in the database."""
+        return self.save_emails([email])[0]
+
+    def save_emails(self, emails: list[EmailMessage]) -> list[Email]:
+        """
+        Save or update several emails with batched upserts in one transaction.
+
+        Args:
+            emails: EmailMessages to store, keyed on their Gmail ID.
+
+        Returns:
+            The stored Email rows, detached from the session, in input order.
+        """
+        if not emails:
+            return []
+
+        now = datetime.now(UTC)
+        # Keyed on Gmail ID so a repeated message becomes one row; an upsert cannot touch a row twice.
+        rows_by_id = {
+            email.id: {
+                "gmail_id": email.id,
+                "thread_id": email.thread_id,
+                "subject": email.subject,
+                "sender": email.sender,
+                "sender_email": email.sender_email,
+                "recipients": email.recipients,
+                "date": email.date,
+                "snippet": email.snippet,
+                "body": email.body,
+                "labels": email.labels,
+                "is_unread": email.is_unread,
+                "has_attachments": email.has_attachments,
+                "updated_at": now,
+            }
+            for email in emails
+        }
+        rows = list(rows_by_id.values())
+
+        saved: dict[str, Email] = {}
         with self._get_session() as session:
-            db_email = session.query(Email).filter(Email.gmail_id == email.id).first()
-            if db_email is None:
-                db_email = Email(gmail_id=email.id)
-                session.add(db_email)
-
-            db_email.thread_id = email.thread_id
-            db_email.subject = email.subject
-            db_email.sender = email.sender
-            db_email.sender_email = email.sender_email
-            db_email.recipients = json.dumps(email.recipients)
-            db_email.date = email.date
-            db_email.snippet = email.snippet
-            db_email.body = email.body
-            db_email.labels = json.dumps(email.labels)
-            db_email.is_unread = email.is_unread
-            db_email.has_attachments = email.has_attachments
-            db_email.updated_at = datetime.utcnow()
-
-            session.flush()
-            session.expunge(db_email)
-            return db_email
+            for start in range(0, len(rows), _UPSERT_CHUNK_SIZE):
+                stmt = sqlite_insert(Email).values(rows[start : start + _UPSERT_CHUNK_SIZE])
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[Email.gmail_id],
+                    set_={name: stmt.excluded[name] for name in rows[0] if name != "gmail_id"},
+                )
+                result = session.scalars(stmt.returning(Email), execution_options={"populate_existing": True})
+                for db_email in result:
+                    saved[db_email.gmail_id] = db_email
+            for db_email in saved.values():
+                session.expunge(db_email)
+        return [saved[email.id] for email in emails]
 
     def get_email(self, gmail_id: str) -> Email | None:
         """Get an email by Gmail ID."""
@@ -109,6 +207,31 @@ class Database:
                 query = query.filter(Email.is_unread.is_(True))
             return query.order_by(Email.date.desc()).limit(limit).all()
 
+    def get_email_headers(self, unread_only: bool = False, limit: int = 50) -> list[Row]:
+        """
+        Get header columns of recent emails without loading bodies.
+
+        Args:
+            unread_only: Only include unread emails.
+            limit: Maximum number of rows to return.
+
+        Returns:
+            Rows with id, gmail_id, subject, sender, sender_email, date and is_unread, newest first.
+        """
+        with self._get_session() as session:
+            query = session.query(
+                Email.id,
+                Email.gmail_id,
+                Email.subject,
+                Email.sender,
+                Email.sender_email,
+                Email.date,
+                Email.is_unread,
+            )
+            if unread_only:
+                query = query.filter(Email.is_unread.is_(True))
+            return query.order_by(Email.date.desc()).limit(limit).all()
+
     def save_classification(
         self,
         email_id: int,
@@ -126,7 +249,7 @@ class Database:
                 confidence=confidence,
                 reasoning=reasoning,
                 requires_approval=requires_approval,
-                approval_reasons=json.dumps(approval_reasons or []),
+                approval_reasons=approval_reasons or [],
             )
             session.add(classification)
             session.flush()
@@ -138,16 +261,33 @@ class Database:
         with self._get_session() as session:
             return (
                 session.query(Classification)
+                .options(selectinload(Classification.email))
                 .filter(Classification.email_id == email_id)
                 .order_by(Classification.created_at.desc())
                 .first()
             )
 
+    def get_latest_classifications(self, gmail_ids: list[str]) -> dict[str, Classification]:
+        """Get the most recent classification for each Gmail message ID in a single query."""
+        if not gmail_ids:
+            return {}
+        with self._get_session() as session:
+            rows = (
+                session.query(Email.gmail_id, Classification)
+                .join(Classification, Classification.email_id == Email.id)
+                .filter(Email.gmail_id.in_(set(gmail_ids)))
+                .order_by(Classification.created_at, Classification.id)
+                .all()
+            )
+        # Rows are ordered oldest first, so later rows overwrite earlier ones
+        return {gmail_id: classification for gmail_id, classification in rows}
+
     def get_pending_approvals(self) -> list[Classification]:
-        """Get classifications requiring approval."""
+        """Get classifications requiring approval, with their emails loaded."""
         with self._get_session() as session:
             return (
                 session.query(Classification)
+                .options(selectinload(Classification.email))
                 .filter(
                     Classification.requires_approval.is_(True),
                     Classification.is_approved.is_(False),
@@ -158,13 +298,7 @@ class Database:
 
     def approve_classification(self, classification_id: int) -> bool:
         """Mark a classification as approved."""
-        with self._get_session() as session:
-            classification = session.query(Classification).filter(Classification.id == classification_id).first()
-            if classification:
-                classification.is_approved = True
-                classification.approved_at = datetime.utcnow()
-                return True
-            return False
+        return self._update_by_id(Classification, classification_id, is_approved=True, approved_at=datetime.now(UTC))
 
     def save_draft(self, email_id: int, subject: str, body: str) -> Draft:
         """Save a draft reply."""
@@ -185,60 +319,47 @@ class Database:
         with self._get_session() as session:
             return session.query(Draft).filter(Draft.id == draft_id).first()
 
-    def get_pending_drafts(self) -> list[Draft]:
-        """Get drafts awaiting approval."""
+    def get_pending_drafts(self) -> list[Row]:
+        """
+        Get drafts awaiting approval as plain rows joined with their email headers.
+
+        Returns:
+            Rows with id, subject, body and created_at of the draft, plus thread_id, email_subject,
+            sender and sender_email of the original email, newest first.
+        """
         with self._get_session() as session:
-            drafts = (
-                session.query(Draft)
-                .options(joinedload(Draft.email))
+            return (
+                session.query(
+                    Draft.id,
+                    Draft.subject,
+                    Draft.body,
+                    Draft.created_at,
+                    Email.thread_id,
+                    Email.subject.label("email_subject"),
+                    Email.sender,
+                    Email.sender_email,
+                )
+                .join(Email, Draft.email_id == Email.id)
                 .filter(Draft.status == "pending", Draft.is_approved.is_(False))
                 .order_by(Draft.created_at.desc())
                 .all()
             )
-            for draft in drafts:
-                session.expunge(draft)
-            return drafts
 
     def update_draft(self, draft_id: int, body: str) -> bool:
         """Update a draft's body."""
-        with self._get_session() as session:
-            draft = session.query(Draft).filter(Draft.id == draft_id).first()
-            if draft:
-                draft.body = body
-                draft.updated_at = datetime.utcnow()
-                return True
-            return False
+        return self._update_by_id(Draft, draft_id, body=body, updated_at=datetime.now(UTC))
 
     def approve_draft(self, draft_id: int) -> bool:
         """Mark a draft as approved."""
-        with self._get_session() as session:
-            draft = session.query(Draft).filter(Draft.id == draft_id).first()
-            if draft:
-                draft.is_approved = True
-                draft.approved_at = datetime.utcnow()
-                draft.status = "approved"
-                return True
-            return False
+        return self._update_by_id(Draft, draft_id, is_approved=True, approved_at=datetime.now(UTC), status="approved")
 
     def mark_draft_sent(self, draft_id: int, message_id: str) -> bool:
         """Mark a draft as sent."""
-        with self._get_session() as session:
-            draft = session.query(Draft).filter(Draft.id == draft_id).first()
-            if draft:
-                draft.sent_at = datetime.utcnow()
-                draft.sent_message_id = message_id
-                draft.status = "sent"
-                return True
-            return False
+        return self._update_by_id(Draft, draft_id, sent_at=datetime.now(UTC), sent_message_id=message_id, status="sent")
 
     def reject_draft(self, draft_id: int) -> bool:
         """Reject a draft."""
-        with self._get_session() as session:
-            draft = session.query(Draft).filter(Draft.id == draft_id).first()
-            if draft:
-                draft.status = "rejected"
-                return True
-            return False
+        return self._update_by_id(Draft, draft_id, status="rejected")
 
     def save_feedback(
         self,
@@ -281,7 +402,7 @@ class Database:
                 summary=summary,
                 start_time=start_time,
                 end_time=end_time,
-                attendees=json.dumps(attendees or []),
+                attendees=attendees or [],
                 status="pending",
             )
             session.add(action)
@@ -290,10 +411,11 @@ class Database:
             return action
 
     def get_pending_calendar_actions(self) -> list[CalendarAction]:
-        """Get calendar actions awaiting approval."""
+        """Get calendar actions awaiting approval, with their emails loaded."""
         with self._get_session() as session:
             return (
                 session.query(CalendarAction)
+                .options(selectinload(CalendarAction.email))
                 .filter(
                     CalendarAction.status == "pending",
                     CalendarAction.is_approved.is_(False),
@@ -304,50 +426,52 @@ class Database:
 
     def approve_calendar_action(self, action_id: int, event_id: str | None = None) -> bool:
         """Approve a calendar action."""
-        with self._get_session() as session:
-            action = session.query(CalendarAction).filter(CalendarAction.id == action_id).first()
-            if action:
-                action.is_approved = True
-                action.approved_at = datetime.utcnow()
-                action.status = "approved"
-                if event_id:
-                    action.event_id = event_id
-                return True
-            return False
+        values: dict[str, Any] = {"is_approved": True, "approved_at": datetime.now(UTC), "status": "approved"}
+        if event_id:
+            values["event_id"] = event_id
+        return self._update_by_id(CalendarAction, action_id, **values)
 
     def reject_calendar_action(self, action_id: int) -> bool:
         """Reject a calendar action."""
-        with self._get_session() as session:
-            action = session.query(CalendarAction).filter(CalendarAction.id == action_id).first()
-            if action:
-                action.status = "rejected"
-                return True
-            return False
+        return self._update_by_id(CalendarAction, action_id, status="rejected")
 
     def is_known_sender(self, email: str) -> bool:
         """Check if an email is from a known sender."""
         with self._get_session() as session:
-            return session.query(KnownSender).filter(KnownSender.email == email.lower()).first() is not None
+            return session.query(exists().where(KnownSender.email == email.lower())).scalar()
+
+    def are_known_senders(self, emails: list[str]) -> dict[str, bool]:
+        """Check several addresses against known senders in a single query."""
+        lowered = {email.lower() for email in emails if email}
+        if not lowered:
+            return {}
+        with self._get_session() as session:
+            rows = session.query(KnownSender.email).filter(KnownSender.email.in_(lowered)).all()
+        known = {row.email for row in rows}
+        return {email: email in known for email in lowered}
 
     def add_known_sender(self, email: str, name: str = "", trust_level: str = "normal") -> KnownSender:
-        """Add a known sender."""
+        """Add a known sender, returning the existing one if the address is already known."""
         with self._get_session() as session:
-            # Check if sender already exists
-            existing = session.query(KnownSender).filter(KnownSender.email == email.lower()).first()
-            if existing:
-                return existing
-
-            sender = KnownSender(
-                email=email.lower(),
-                name=name,
-                trust_level=trust_level,
+            stmt = (
+                sqlite_insert(KnownSender)
+                .values(email=email.lower(), name=name, trust_level=trust_level)
+                .on_conflict_do_nothing(index_elements=[KnownSender.email])
+                .returning(KnownSender)
             )
-            session.add(sender)
-            session.flush()
+            sender = session.scalars(stmt).one_or_none()
+            if sender is None:
+                sender = session.query(KnownSender).filter(KnownSender.email == email.lower()).one()
             session.expunge(sender)
             return sender
 
-    def get_known_senders(self) -> list[KnownSender]:
-        """Get all known senders."""
+    def get_known_senders(self) -> list[Row]:
+        """Get all known senders as rows with id, email and name, ordered by name."""
+        with self._get_session() as session:
+            return session.query(KnownSender.id, KnownSender.email, KnownSender.name).order_by(KnownSender.name).all()
+
+    def remove_known_sender(self, sender_id: int) -> bool:
+        """Delete a known sender with a single DELETE, reporting whether the row existed."""
         with self._get_session() as session:
-            return session.query(KnownSender).order_by(KnownSender.name).all()
+            result = session.execute(delete(KnownSender).where(KnownSender.id == sender_id))
+            return result.rowcount > 0
@@ -1,11 +1,16 @@
 """SQLAlchemy models for the Gmail Agent database."""
 
-from datetime import datetime
+from datetime import UTC, datetime
 
-from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import DeclarativeBase, relationship
 
 
+def _utcnow() -> datetime:
+    """Get the current time in UTC."""
+    return datetime.now(UTC)
+
+
 class Base(DeclarativeBase):
     """Base class for all models."""
 
@@ -23,15 +28,15 @@ class Email(Base):
     subject = Column(String(500))
     sender = Column(String(255))
     sender_email = Column(String(255), index=True)
-    recipients = Column(Text)
+    recipients = Column(JSON)
     date = Column(DateTime)
     snippet = Column(Text)
     body = Column(Text)
-    labels = Column(Text)
+    labels = Column(JSON)
     is_unread = Column(Boolean, default=True)
     has_attachments = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=_utcnow)
+    updated_at = Column(DateTime, default=_utcnow, onupdate=_utcnow)
 
     classifications = relationship("Classification", back_populates="email", cascade="all, delete-orphan")
     drafts = relationship("Draft", back_populates="email", cascade="all, delete-orphan")
@@ -41,6 +46,14 @@ class Classification(Base):
     """Email classification history."""
 
     __tablename__ = "classifications"
+    __table_args__ = (
+        Index("ix_classifications_email_created", "email_id", "created_at"),
+        Index(
+            "ix_classifications_pending",
+            "created_at",
+            sqlite_where=text("requires_approval IS 1 AND is_approved IS 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     email_id = Column(Integer, ForeignKey("emails.id"), nullable=False)
@@ -48,10 +61,10 @@ class Classification(Base):
     confidence = Column(Float, nullable=False)
     reasoning = Column(Text)
     requires_approval = Column(Boolean, default=False)
-    approval_reasons = Column(Text)
+    approval_reasons = Column(JSON)
     is_approved = Column(Boolean, default=False)
     approved_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=_utcnow)
 
     email = relationship("Email", back_populates="classifications")
 
@@ -60,6 +73,9 @@ class Draft(Base):
     """Draft email replies."""
 
     __tablename__ = "drafts"
+    __table_args__ = (
+        Index("ix_drafts_pending", "created_at", sqlite_where=text("status = 'pending' AND is_approved IS 0")),
+    )
 
     id = Column(Integer, primary_key=True)
     email_id = Column(Integer, ForeignKey("emails.id"), nullable=False)
@@ -70,8 +86,8 @@ class Draft(Base):
     approved_at = Column(DateTime)
     sent_at = Column(DateTime)
     sent_message_id = Column(String(255))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=_utcnow)
+    updated_at = Column(DateTime, default=_utcnow, onupdate=_utcnow)
 
     email = relationship("Email", back_populates="drafts")
     feedback = relationship("Feedback", back_populates="draft", cascade="all, delete-orphan")
@@ -88,7 +104,7 @@ class Feedback(Base):
     original_body = Column(Text)
     edited_body = Column(Text)
     comments = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=_utcnow)
 
     draft = relationship("Draft", back_populates="feedback")
 
@@ -97,6 +113,13 @@ class CalendarAction(Base):
     """Log of calendar actions taken."""
 
     __tablename__ = "calendar_actions"
+    __table_args__ = (
+        Index(
+            "ix_calendar_actions_pending",
+            "created_at",
+            sqlite_where=text("status = 'pending' AND is_approved IS 0"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     email_id = Column(Integer, ForeignKey("emails.id"), nullable=True)
@@ -105,11 +128,13 @@ class CalendarAction(Base):
     summary = Column(String(500))
     start_time = Column(DateTime)
     end_time = Column(DateTime)
-    attendees = Column(Text)
+    attendees = Column(JSON)
     status = Column(String(50), default="pending")
     is_approved = Column(Boolean, default=False)
     approved_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=_utcnow)
+
+    email = relationship("Email")
 
 
 class KnownSender(Base):
@@ -122,4 +147,4 @@ class KnownSender(Base):
     name = Column(String(255))
     trust_level = Column(String(50), default="normal")
     notes = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=_utcnow)
@@ -1,8 +1,10 @@
 """Google Calendar API service wrapper."""
 
 import logging
+import time
+from bisect import bisect_right
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Any
 from zoneinfo import ZoneInfo
 
@@ -12,8 +14,20 @@ from auth.google_auth import get_calendar_service
 
 logger = logging.getLogger(__name__)
 
+# Partial-response field mask covering everything _parse_event reads.
+_EVENT_FIELDS = "id,summary,description,start,end,location,attendees/email,status,htmlLink"
 
-@dataclass
+# Google caps a batch request at 50 calls.
+_BATCH_MAX_REQUESTS = 50
+
+# How long a fetched window of busy times is reused by find_free_slots.
+_BUSY_SNAPSHOT_TTL_SECONDS = 60.0
+
+# (calendar_id, timezone, first day, last day) -> (monotonic expiry, sorted busy intervals)
+_busy_snapshots: dict[tuple[str, str, date, date], tuple[float, list[tuple[datetime, datetime]]]] = {}
+
+
+@dataclass(slots=True)
 class CalendarEvent:
     """Represents a calendar event."""
 
@@ -29,7 +43,7 @@ class CalendarEvent:
     html_link: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TimeSlot:
     """Represents an available time slot."""
 
@@ -38,7 +52,7 @@ class TimeSlot:
     duration_minutes: int
 
 
-@dataclass
+@dataclass(slots=True)
 class MeetingDetails:
     """Details for creating a meeting."""
 
@@ -52,6 +66,17 @@ class MeetingDetails:
     timezone: str = "UTC"
 
 
+def _merge_intervals(intervals: list[tuple[datetime, datetime]]) -> list[tuple[datetime, datetime]]:
+    """Merge sorted (start, end) intervals that overlap or touch."""
+    merged: list[tuple[datetime, datetime]] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
 class CalendarService:
     """Service for interacting with Google Calendar API."""
 
@@ -60,6 +85,17 @@ class CalendarService:
         self._service = service
         self.timezone = timezone
 
+    @property
+    def timezone(self) -> str:
+        """Get the calendar timezone name."""
+        return self._timezone
+
+    @timezone.setter
+    def timezone(self, timezone: str) -> None:
+        """Set the calendar timezone and cache its ZoneInfo."""
+        self._timezone = timezone
+        self._tz = ZoneInfo(timezone)
+
     @property
     def service(self) -> Resource:
         """Get or create Calendar service."""
@@ -87,7 +123,7 @@ class CalendarService:
             List of CalendarEvent objects.
         """
         if start_date is None:
-            start_date = datetime.now(ZoneInfo(self.timezone))
+            start_date = datetime.now(self._tz)
         if end_date is None:
             end_date = start_date + timedelta(days=7)
 
@@ -104,6 +140,7 @@ class CalendarService:
                     maxResults=max_results,
                     singleEvents=True,
                     orderBy="startTime",
+                    fields=f"items({_EVENT_FIELDS}),nextPageToken",
                 )
                 .execute()
             )
@@ -116,7 +153,7 @@ class CalendarService:
     def get_event(self, event_id: str, calendar_id: str = "primary") -> CalendarEvent | None:
         """Get a single event by ID."""
         try:
-            event = self.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
+            event = self.service.events().get(calendarId=calendar_id, eventId=event_id, fields=_EVENT_FIELDS).execute()
             return self._parse_event(event)
         except Exception:
             logger.exception("Failed to get event")
@@ -143,25 +180,7 @@ class CalendarService:
             logger.error("Event start time is required")
             return None
 
-        if details.end is None:
-            details.end = details.start + timedelta(minutes=details.duration_minutes)
-
-        event_body: dict[str, Any] = {
-            "summary": details.summary,
-            "description": details.description,
-            "location": details.location,
-            "start": {
-                "dateTime": details.start.isoformat(),
-                "timeZone": details.timezone,
-            },
-            "end": {
-                "dateTime": details.end.isoformat(),
-                "timeZone": details.timezone,
-            },
-        }
-
-        if details.attendees:
-            event_body["attendees"] = [{"email": email} for email in details.attendees]
+        event_body = self._event_body(details, details.start)
 
         try:
             event = (
@@ -170,14 +189,50 @@ class CalendarService:
                     calendarId=calendar_id,
                     body=event_body,
                     sendNotifications=send_notifications,
+                    fields=_EVENT_FIELDS,
                 )
                 .execute()
             )
+            _busy_snapshots.clear()
             return self._parse_event(event)
         except Exception:
             logger.exception("Failed to create event")
             return None
 
+    def create_events(
+        self,
+        meetings: list[MeetingDetails],
+        calendar_id: str = "primary",
+        send_notifications: bool = True,
+    ) -> list[CalendarEvent | None]:
+        """
+        Create several calendar events with batched API requests.
+
+        Args:
+            meetings: MeetingDetails for each event to create.
+            calendar_id: Calendar ID (defaults to primary).
+            send_notifications: Whether to send invite notifications.
+
+        Returns:
+            Created CalendarEvent, or None where creation failed, in input order.
+        """
+        requests: dict[int, Any] = {}
+        for index, details in enumerate(meetings):
+            if details.start is None:
+                logger.error("Event start time is required")
+                continue
+            requests[index] = self.service.events().insert(
+                calendarId=calendar_id,
+                body=self._event_body(details, details.start),
+                sendNotifications=send_notifications,
+                fields=_EVENT_FIELDS,
+            )
+
+        responses = self._execute_batch(requests)
+        if responses:
+            _busy_snapshots.clear()
+        return [self._parse_event(responses[i]) if i in responses else None for i in range(len(meetings))]
+
     def update_event(
         self,
         event_id: str,
@@ -197,25 +252,26 @@ class CalendarService:
         Returns:
             Updated CalendarEvent or None if failed.
         """
-        try:
-            event = self.service.events().get(calendarId=calendar_id, eventId=event_id).execute()
-
-            for key, value in updates.items():
-                if key in ("start", "end") and isinstance(value, datetime):
-                    event[key] = {"dateTime": value.isoformat(), "timeZone": self.timezone}
-                else:
-                    event[key] = value
+        patch_body: dict[str, Any] = {}
+        for key, value in updates.items():
+            if key in ("start", "end") and isinstance(value, datetime):
+                patch_body[key] = {"dateTime": value.isoformat(), "timeZone": self.timezone}
+            else:
+                patch_body[key] = value
 
+        try:
             updated = (
                 self.service.events()
-                .update(
+                .patch(
                     calendarId=calendar_id,
                     eventId=event_id,
-                    body=event,
+                    body=patch_body,
                     sendNotifications=send_notifications,
+                    fields=_EVENT_FIELDS,
                 )
                 .execute()
             )
+            _busy_snapshots.clear()
             return self._parse_event(updated)
         except Exception:
             logger.exception("Failed to update event")
@@ -234,11 +290,63 @@ class CalendarService:
                 eventId=event_id,
                 sendNotifications=send_notifications,
             ).execute()
+            _busy_snapshots.clear()
             return True
         except Exception:
             logger.exception("Failed to delete event")
             return False
 
+    def delete_events(
+        self,
+        event_ids: list[str],
+        calendar_id: str = "primary",
+        send_notifications: bool = True,
+    ) -> list[bool]:
+        """
+        Delete several calendar events with batched API requests.
+
+        Args:
+            event_ids: IDs of the events to delete.
+            calendar_id: Calendar ID.
+            send_notifications: Whether to send cancellation notifications.
+
+        Returns:
+            True for each event that was deleted, in input order.
+        """
+        requests = {
+            index: self.service.events().delete(
+                calendarId=calendar_id,
+                eventId=event_id,
+                sendNotifications=send_notifications,
+            )
+            for index, event_id in enumerate(event_ids)
+        }
+        responses = self._execute_batch(requests)
+        if responses:
+            _busy_snapshots.clear()
+        return [index in responses for index in range(len(event_ids))]
+
+    def _execute_batch(self, requests: dict[int, Any]) -> dict[int, Any]:
+        """Execute API requests in batches, returning the responses of those that succeeded by key."""
+        responses: dict[int, Any] = {}
+
+        def collect(request_id: str, response: Any, exception: Exception | None) -> None:
+            if exception is not None:
+                logger.error("Batched calendar request %s failed: %s", request_id, exception)
+                return
+            responses[int(request_id)] = response
+
+        items = list(requests.items())
+        for start in range(0, len(items), _BATCH_MAX_REQUESTS):
+            batch = self.service.new_batch_http_request(callback=collect)
+            for key, request in items[start : start + _BATCH_MAX_REQUESTS]:
+                batch.add(request, request_id=str(key))
+            try:
+                batch.execute()
+            except Exception:
+                logger.exception("Failed to execute calendar batch")
+        return responses
+
     def find_free_slots(
         self,
         start_date: datetime | None = None,
@@ -246,6 +354,7 @@ class CalendarService:
         duration_minutes: int = 60,
         working_hours: tuple[int, int] = (9, 17),
         calendar_id: str = "primary",
+        max_results: int | None = None,
     ) -> list[TimeSlot]:
         """
         Find available time slots in the calendar.
@@ -256,58 +365,69 @@ class CalendarService:
             duration_minutes: Required duration for the slot.
             working_hours: Tuple of (start_hour, end_hour) for working hours.
             calendar_id: Calendar ID.
+            max_results: Stop once this many slots are found (no limit if None).
 
         Returns:
-            List of available TimeSlot objects.
+            List of available TimeSlot objects, empty if busy times could not be fetched.
         """
-        tz = ZoneInfo(self.timezone)
         if start_date is None:
-            start_date = datetime.now(tz)
+            start_date = datetime.now(self._tz)
         if end_date is None:
             end_date = start_date + timedelta(days=7)
 
-        events = self.list_events(start_date, end_date, calendar_id=calendar_id)
-        busy_times = [(e.start, e.end) for e in events if not e.is_all_day]
-        busy_times.sort(key=lambda x: x[0])
+        busy_times = self._get_busy_times(start_date, end_date, calendar_id)
+        if busy_times is None:
+            # Without busy times every slot would look free, so offer none
+            return []
+        busy = _merge_intervals(busy_times)
+        duration = timedelta(minutes=duration_minutes)
+        step = timedelta(minutes=30)
 
         free_slots = []
-        current = start_date
-
-        while current < end_date:
-            if current.hour < working_hours[0]:
-                current = current.replace(hour=working_hours[0], minute=0, second=0, microsecond=0)
-            elif current.hour >= working_hours[1]:
-                current = (current + timedelta(days=1)).replace(
-                    hour=working_hours[0], minute=0, second=0, microsecond=0
-                )
-                continue
-
-            day_end = current.replace(hour=working_hours[1], minute=0, second=0, microsecond=0)
-            slot_end = min(current + timedelta(minutes=duration_minutes), day_end)
-
-            if slot_end > end_date:
-                break
-
-            is_free = True
-            for busy_start, busy_end in busy_times:
-                if current < busy_end and slot_end > busy_start:
-                    is_free = False
-                    current = busy_end
-                    break
-
-            if is_free:
-                if (slot_end - current).total_seconds() >= duration_minutes * 60:
-                    free_slots.append(
-                        TimeSlot(
-                            start=current,
-                            end=slot_end,
-                            duration_minutes=duration_minutes,
-                        )
-                    )
-                current = current + timedelta(minutes=30)
+        next_busy = 0
+        day = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        while day < end_date:
+            cursor = max(start_date, day.replace(hour=working_hours[0]))
+            window_end = min(end_date, day.replace(hour=working_hours[1]))
+            day += timedelta(days=1)
+
+            while cursor + duration <= window_end:
+                while next_busy < len(busy) and busy[next_busy][1] <= cursor:
+                    next_busy += 1
+                if next_busy < len(busy) and busy[next_busy][0] < cursor + duration:
+                    cursor = busy[next_busy][1]
+                    continue
+
+                free_slots.append(TimeSlot(start=cursor, end=cursor + duration, duration_minutes=duration_minutes))
+                if max_results is not None and len(free_slots) >= max_results:
+                    return free_slots
+                cursor += step
 
         return free_slots
 
+    def _get_busy_times(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        calendar_id: str,
+    ) -> list[tuple[datetime, datetime]] | None:
+        """
+        Get sorted busy intervals covering whole days from start_date to end_date, reusing a recent fetch.
+
+        Returns None if the free/busy query failed; failures are not cached.
+        """
+        key = (calendar_id, self.timezone, start_date.date(), end_date.date())
+        cached = _busy_snapshots.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        window_start = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        window_end = end_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        busy_times = self._query_busy(window_start, window_end, calendar_id)
+        if busy_times is not None:
+            _busy_snapshots[key] = (time.monotonic() + _BUSY_SNAPSHOT_TTL_SECONDS, busy_times)
+        return busy_times
+
     def check_availability(
         self,
         start: datetime,
@@ -325,13 +445,84 @@ class CalendarService:
         Returns:
             True if the slot is available, False otherwise.
         """
-        events = self.list_events(start, end, calendar_id=calendar_id)
-        for event in events:
-            if event.is_all_day:
-                continue
-            if start < event.end and end > event.start:
-                return False
-        return True
+        return self.check_availability_batch([(start, end)], calendar_id=calendar_id)[0]
+
+    def check_availability_batch(
+        self,
+        intervals: list[tuple[datetime, datetime]],
+        calendar_id: str = "primary",
+    ) -> list[bool]:
+        """
+        Check several time slots for availability with one free/busy query.
+
+        Args:
+            intervals: (start, end) pairs to check.
+            calendar_id: Calendar ID.
+
+        Returns:
+            True for each interval that is available, in input order; all False if the query failed.
+        """
+        if not intervals:
+            return []
+
+        busy = self._query_busy(
+            min(start for start, _ in intervals),
+            max(end for _, end in intervals),
+            calendar_id,
+        )
+        if busy is None:
+            return [False] * len(intervals)
+        busy_starts = [busy_start for busy_start, _ in busy]
+        busy_ends = [busy_end for _, busy_end in busy]
+
+        available = []
+        for start, end in intervals:
+            index = bisect_right(busy_ends, start)
+            available.append(index == len(busy_starts) or busy_starts[index] >= end)
+        return available
+
+    def _query_busy(self, start: datetime, end: datetime, calendar_id: str) -> list[tuple[datetime, datetime]] | None:
+        """Get busy intervals from the free/busy API, merged and sorted, or None if the query failed."""
+        body = {
+            "timeMin": start.isoformat(),
+            "timeMax": end.isoformat(),
+            "timeZone": self.timezone,
+            "items": [{"id": calendar_id}],
+        }
+        try:
+            result = self.service.freebusy().query(body=body).execute()
+            calendar = result["calendars"][calendar_id]
+        except Exception:
+            logger.exception("Failed to query free/busy")
+            return None
+        if calendar.get("errors"):
+            logger.error("Free/busy query for %s failed: %s", calendar_id, calendar["errors"])
+            return None
+        periods = calendar.get("busy", [])
+        return [(datetime.fromisoformat(period["start"]), datetime.fromisoformat(period["end"])) for period in periods]
+
+    def _event_body(self, details: MeetingDetails, start: datetime) -> dict[str, Any]:
+        """Build an events.insert body from details and their checked start time, filling in the end if needed."""
+        if details.end is None:
+            details.end = start + timedelta(minutes=details.duration_minutes)
+
+        event_body: dict[str, Any] = {
+            "summary": details.summary,
+            "description": details.description,
+            "location": details.location,
+            "start": {
+                "dateTime": start.isoformat(),
+                "timeZone": details.timezone,
+            },
+            "end": {
+                "dateTime": details.end.isoformat(),
+                "timeZone": details.timezone,
+            },
+        }
+
+        if details.attendees:
+            event_body["attendees"] = [{"email": email} for email in details.attendees]
+        return event_body
 
     def _parse_event(self, event: dict[str, Any]) -> CalendarEvent:
         """Parse a Calendar API event into a CalendarEvent object."""
@@ -1,11 +1,20 @@
 """Gmail API service wrapper for email operations."""
 
 import base64
+import binascii
+import html
+import io
 import logging
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from email import policy
+from email.generator import BytesGenerator
+from email.message import Message
 from email.mime.text import MIMEText
+from email.utils import parsedate_to_datetime
 from html.parser import HTMLParser
 from typing import Any
 
@@ -15,6 +24,58 @@ from auth.google_auth import get_gmail_service
 
 logger = logging.getLogger(__name__)
 
+# Partial-response mask covering the message fields _parse_message reads.
+_MESSAGE_FIELDS = (
+    "id,threadId,labelIds,snippet,payload(headers,mimeType,body/data,parts(mimeType,filename,body/data,parts))"
+)
+
+# Gmail advises against batches larger than 50 requests, which risk rate limiting.
+_BATCH_MAX_REQUESTS = 50
+
+# messages.batchModify accepts at most 1000 message IDs per call.
+_BATCH_MODIFY_MAX_IDS = 1000
+
+# Threads used to fetch messages one by one when a batch request cannot be executed.
+_FALLBACK_MAX_WORKERS = 10
+
+
+# Headers read from each message; the Received, DKIM and other routing headers are skipped.
+_PARSED_HEADERS = frozenset({"from", "to", "subject", "date"})
+
+# Maps the URL-safe base64 alphabet used by Gmail body data onto the standard one.
+_URLSAFE_TRANS = bytes.maketrans(b"-_", b"+/")
+
+# HTML-to-text patterns: skipped elements with their content, comments, line-breaking tags and any other tag.
+# A tag must start with a name, "/", "!" or "?" so a bare "<" in text is kept, and quoted attribute
+# values may contain ">".
+_TAG_BODY = r"""(?:"[^"]*"|'[^']*'|[^'">])*"""
+_SKIPPED_ELEMENT_RE = re.compile(rf"<(script|style|head)\b{_TAG_BODY}>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.DOTALL)
+_LINE_BREAK_TAG_RE = re.compile(r"</(?:p|div|li|tr)\s*>|<br\s*/?>", re.IGNORECASE)
+_TAG_RE = re.compile(rf"<[A-Za-z/!?]{_TAG_BODY}>")
+_NEWLINES_RE = re.compile(r"\n{3,}")
+
+
+def _html_to_text(html_text: str) -> str:
+    """Strip tags from HTML with precompiled patterns, breaking lines after block elements."""
+    text = _COMMENT_RE.sub("", html_text)
+    text = _SKIPPED_ELEMENT_RE.sub("", text)
+    text = _LINE_BREAK_TAG_RE.sub("\n", text)
+    text = html.unescape(_TAG_RE.sub("", text))
+    return _NEWLINES_RE.sub("\n\n", text).strip()
+
+
+def _decode_base64url(data: str) -> bytes:
+    """Decode URL-safe base64 in a single C call, accepting data with or without padding."""
+    return binascii.a2b_base64(data.encode("ascii").translate(_URLSAFE_TRANS) + b"==")
+
+
+def _encode_raw_message(message: Message) -> str:
+    """Serialize a MIME message into the URL-safe base64 string the Gmail send API expects."""
+    buffer = io.BytesIO()
+    BytesGenerator(buffer, policy=policy.default).flatten(message)
+    return base64.urlsafe_b64encode(buffer.getbuffer()).decode("ascii")
+
 
 class HTMLTextExtractor(HTMLParser):
     """Extract plain text from HTML content."""
@@ -40,11 +101,11 @@ class HTMLTextExtractor(HTMLParser):
 
     def get_text(self) -> str:
         text = "".join(self.text_parts)
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _NEWLINES_RE.sub("\n\n", text)
         return text.strip()
 
 
-@dataclass
+@dataclass(slots=True)
 class EmailMessage:
     """Represents an email message."""
 
@@ -104,14 +165,7 @@ class GmailService:
             return []
 
         messages = results.get("messages", [])
-        emails = []
-
-        for msg in messages:
-            email = self.get_email(msg["id"])
-            if email:
-                emails.append(email)
-
-        return emails
+        return self.get_emails([msg["id"] for msg in messages])
 
     def get_email(self, message_id: str) -> EmailMessage | None:
         """
@@ -124,12 +178,70 @@ class GmailService:
             EmailMessage object or None if not found.
         """
         try:
-            msg = self.service.users().messages().get(userId="me", id=message_id, format="full").execute()
+            msg = (
+                self.service.users()
+                .messages()
+                .get(userId="me", id=message_id, format="full", fields=_MESSAGE_FIELDS)
+                .execute()
+            )
             return self._parse_message(msg)
         except Exception:
             logger.exception("Failed to fetch email")
             return None
 
+    def get_emails(self, message_ids: list[str]) -> list[EmailMessage]:
+        """
+        Get several emails by ID using batched API requests.
+
+        Messages in a batch that cannot be executed are fetched individually on a thread pool.
+
+        Args:
+            message_ids: Gmail message IDs.
+
+        Returns:
+            EmailMessage objects in the order of the IDs, skipping any that failed.
+        """
+        responses: dict[str, dict[str, Any]] = {}
+
+        def collect(request_id: str, response: dict[str, Any], exception: Exception | None) -> None:
+            if exception is not None:
+                logger.error("Batched message request %s failed: %s", request_id, exception)
+                return
+            responses[request_id] = response
+
+        messages = self.service.users().messages()
+        unbatched: list[int] = []
+        for start in range(0, len(message_ids), _BATCH_MAX_REQUESTS):
+            indexes = range(start, min(start + _BATCH_MAX_REQUESTS, len(message_ids)))
+            batch = self.service.new_batch_http_request(callback=collect)
+            for index in indexes:
+                batch.add(
+                    messages.get(userId="me", id=message_ids[index], format="full", fields=_MESSAGE_FIELDS),
+                    request_id=str(index),
+                )
+            try:
+                batch.execute()
+            except Exception:
+                logger.exception("Failed to execute message batch, fetching its messages individually")
+                unbatched.extend(index for index in indexes if str(index) not in responses)
+
+        fetched: dict[int, EmailMessage | None] = {}
+        if unbatched:
+            with ThreadPoolExecutor(max_workers=_FALLBACK_MAX_WORKERS) as executor:
+                results = executor.map(self.get_email, [message_ids[index] for index in unbatched])
+                fetched = dict(zip(unbatched, results, strict=True))
+
+        emails = []
+        for index in range(len(message_ids)):
+            if index in fetched:
+                email = fetched[index]
+            else:
+                msg = responses.get(str(index))
+                email = self._parse_message(msg) if msg else None
+            if email:
+                emails.append(email)
+        return emails
+
     def get_thread(self, thread_id: str) -> list[EmailMessage]:
         """
         Get all messages in a thread.
@@ -141,7 +253,12 @@ class GmailService:
             List of EmailMessage objects in the thread.
         """
         try:
-            thread = self.service.users().threads().get(userId="me", id=thread_id).execute()
+            thread = (
+                self.service.users()
+                .threads()
+                .get(userId="me", id=thread_id, fields=f"messages({_MESSAGE_FIELDS})")
+                .execute()
+            )
             messages = []
             for msg in thread.get("messages", []):
                 email = self._parse_message(msg)
@@ -176,7 +293,7 @@ class GmailService:
         if isinstance(to, str):
             to = [to]
 
-        message = MIMEText(body)
+        message = MIMEText(body, policy=policy.default)
         message["to"] = ", ".join(to)
         message["subject"] = subject
 
@@ -184,8 +301,7 @@ class GmailService:
             message["In-Reply-To"] = in_reply_to
             message["References"] = in_reply_to
 
-        raw = base64.urlsafe_b64encode(message.as_bytes()).decode()
-        body_data: dict[str, Any] = {"raw": raw}
+        body_data: dict[str, Any] = {"raw": _encode_raw_message(message)}
         if thread_id:
             body_data["threadId"] = thread_id
 
@@ -200,6 +316,27 @@ class GmailService:
         """Mark an email as read."""
         return self._modify_labels(message_id, remove_labels=["UNREAD"])
 
+    def mark_many_as_read(self, message_ids: list[str]) -> bool:
+        """
+        Mark several emails as read with batchModify calls.
+
+        Args:
+            message_ids: IDs of the emails to mark as read.
+
+        Returns:
+            True if every call succeeded, False otherwise.
+        """
+        try:
+            for start in range(0, len(message_ids), _BATCH_MODIFY_MAX_IDS):
+                self.service.users().messages().batchModify(
+                    userId="me",
+                    body={"ids": message_ids[start : start + _BATCH_MODIFY_MAX_IDS], "removeLabelIds": ["UNREAD"]},
+                ).execute()
+            return True
+        except Exception:
+            logger.exception("Failed to mark emails as read")
+            return False
+
     def mark_as_unread(self, message_id: str) -> bool:
         """Mark an email as unread."""
         return self._modify_labels(message_id, add_labels=["UNREAD"])
@@ -244,7 +381,8 @@ class GmailService:
     def _parse_message(self, msg: dict[str, Any]) -> EmailMessage | None:
         """Parse a Gmail API message into an EmailMessage object."""
         try:
-            headers = {h["name"].lower(): h["value"] for h in msg.get("payload", {}).get("headers", [])}
+            payload = msg.get("payload", {})
+            headers = self._parse_headers(payload.get("headers", []))
 
             sender = headers.get("from", "")
             sender_email = self._extract_email(sender)
@@ -256,9 +394,9 @@ class GmailService:
             date_str = headers.get("date", "")
             date = self._parse_date(date_str)
 
-            body = self._extract_body(msg.get("payload", {}))
+            body = self._extract_body(payload)
             labels = msg.get("labelIds", [])
-            attachments = self._extract_attachments(msg.get("payload", {}))
+            attachments = self._extract_attachments(payload)
 
             return EmailMessage(
                 id=msg["id"],
@@ -279,75 +417,86 @@ class GmailService:
             logger.exception("Failed to parse message")
             return None
 
+    def _parse_headers(self, raw_headers: list[dict[str, str]]) -> dict[str, str]:
+        """Collect the headers _parse_message reads, stopping once all of them are found."""
+        headers: dict[str, str] = {}
+        for header in raw_headers:
+            name = header["name"].lower()
+            if name in _PARSED_HEADERS and name not in headers:
+                headers[name] = header["value"]
+                if len(headers) == len(_PARSED_HEADERS):
+                    break
+        return headers
+
     def _extract_email(self, sender: str) -> str:
         """Extract email address from sender string."""
-        match = re.search(r"<([^>]+)>", sender)
-        if match:
-            return match.group(1)
+        start = sender.find("<")
+        if start != -1:
+            end = sender.find(">", start + 1)
+            if end > start + 1:
+                return sender[start + 1 : end]
         if "@" in sender:
             return sender.strip()
         return sender
 
     def _extract_name(self, sender: str) -> str:
         """Extract name from sender string."""
-        match = re.search(r"^([^<]+)<", sender)
-        if match:
-            return match.group(1).strip().strip('"')
+        end = sender.find("<")
+        if end > 0:
+            return sender[:end].strip().strip('"')
         return ""
 
     def _parse_date(self, date_str: str) -> datetime:
         """Parse email date string."""
-        formats = [
-            "%a, %d %b %Y %H:%M:%S %z",
-            "%d %b %Y %H:%M:%S %z",
-            "%a, %d %b %Y %H:%M:%S %Z",
-        ]
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        return datetime.now()
+        try:
+            return parsedate_to_datetime(date_str)
+        except (TypeError, ValueError):
+            return datetime.now()
 
     def _extract_body(self, payload: dict[str, Any]) -> str:
-        """Extract email body from payload."""
+        """Extract email body from payload, preferring the first text/plain part over HTML."""
         if "body" in payload and payload["body"].get("data"):
             return self._decode_body(payload["body"]["data"], payload.get("mimeType", ""))
 
-        if "parts" in payload:
-            for part in payload["parts"]:
-                mime_type = part.get("mimeType", "")
-                if mime_type == "text/plain" or mime_type == "text/html":
-                    if part.get("body", {}).get("data"):
-                        return self._decode_body(part["body"]["data"], mime_type)
-                elif mime_type.startswith("multipart/"):
-                    nested = self._extract_body(part)
-                    if nested:
-                        return nested
+        html_data = None
+        queue = deque(payload.get("parts", []))
+        while queue:
+            part = queue.popleft()
+            mime_type = part.get("mimeType", "")
+            if mime_type.startswith("multipart/"):
+                queue.extend(part.get("parts", []))
+                continue
+            data = part.get("body", {}).get("data")
+            if not data:
+                continue
+            if mime_type == "text/plain":
+                return self._decode_body(data, mime_type)
+            if mime_type == "text/html" and html_data is None:
+                html_data = data
 
+        if html_data is not None:
+            return self._decode_body(html_data, "text/html")
         return ""
 
     def _decode_body(self, data: str, mime_type: str) -> str:
         """Decode base64 email body."""
         try:
-            decoded = base64.urlsafe_b64decode(data).decode("utf-8")
+            decoded = _decode_base64url(data).decode("utf-8")
             if mime_type == "text/html":
-                parser = HTMLTextExtractor()
-                parser.feed(decoded)
-                return parser.get_text()
+                return _html_to_text(decoded)
             return decoded
         except Exception:
             logger.exception("Failed to decode body")
             return ""
 
     def _extract_attachments(self, payload: dict[str, Any]) -> list[str]:
-        """Extract attachment filenames from payload."""
+        """Extract attachment filenames from payload, in document order."""
         attachments = []
-        if "parts" in payload:
-            for part in payload["parts"]:
-                filename = part.get("filename")
-                if filename:
-                    attachments.append(filename)
-                if "parts" in part:
-                    attachments.extend(self._extract_attachments(part))
+        stack = list(reversed(payload.get("parts", [])))
+        while stack:
+            part = stack.pop()
+            filename = part.get("filename")
+            if filename:
+                attachments.append(filename)
+            stack.extend(reversed(part.get("parts", [])))
         return attachments
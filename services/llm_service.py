@@ -3,16 +3,66 @@
 import json
 import logging
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from typing import Any
 
-from huggingface_hub import InferenceClient
+import anyio
+from huggingface_hub import AsyncInferenceClient, InferenceClient
 
 import config
+from agent.cache import LRUCache, content_key
 
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# Email text beyond this many characters is left out of prompts.
+_PROMPT_CONTENT_MAX_CHARS = 2000
+
+# Results of recent calls keyed on model, task and content, so repeated emails skip the inference request.
+_RESULT_CACHE_MAX_SIZE = 2048
+_result_cache: LRUCache[bytes, Any] = LRUCache(_RESULT_CACHE_MAX_SIZE)
+
+# First JSON object in a completion, for endpoints that ignore the grammar and wrap JSON in prose.
+_JSON_RE = re.compile(r"\{[^}]+\}")
+_JSON_DOTALL_RE = re.compile(r"\{[^}]*\}", re.DOTALL)
+
+# Subject and "Re:" lines a model sometimes writes at the top of a reply, with their line breaks.
+_REPLY_HEADER_RE = re.compile(r"^[^\S\n]*(?:subject:|re:).*\n?", re.IGNORECASE | re.MULTILINE)
+
+_VALID_CATEGORIES = frozenset(
+    {
+        config.EmailCategory.NEEDS_REPLY,
+        config.EmailCategory.FYI_ONLY,
+        config.EmailCategory.MEETING_REQUEST,
+        config.EmailCategory.TASK_ACTION,
+    }
+)
+
+# JSON schemas passed as a text-generation grammar so the model emits only matching JSON.
+_CLASSIFICATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "category": {"type": "string", "enum": sorted(_VALID_CATEGORIES)},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "reasoning": {"type": "string"},
+    },
+    "required": ["category", "confidence", "reasoning"],
+}
+_MEETING_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "has_meeting_request": {"type": "boolean"},
+        "title": {"type": "string"},
+        "proposed_times": {"type": "array", "items": {"type": "string"}},
+        "duration_minutes": {"type": "integer"},
+        "attendees": {"type": "array", "items": {"type": "string"}},
+        "location": {"type": "string"},
+        "notes": {"type": "string"},
+    },
+    "required": ["has_meeting_request", "title", "proposed_times", "duration_minutes", "attendees"],
+}
+
+
+@dataclass(slots=True, frozen=True)
 class ClassificationResult:
     """Result of email classification."""
 
@@ -21,7 +71,7 @@ class ClassificationResult:
     reasoning: str
 
 
-@dataclass
+@dataclass(slots=True)
 class MeetingExtraction:
     """Extracted meeting details from email."""
 
@@ -34,6 +84,11 @@ class MeetingExtraction:
     notes: str
 
 
+def _copy_extraction(extraction: MeetingExtraction) -> MeetingExtraction:
+    """Copy an extraction so callers can change its lists without touching the cached one."""
+    return replace(extraction, proposed_times=list(extraction.proposed_times), attendees=list(extraction.attendees))
+
+
 class LLMService:
     """Service for LLM operations using HuggingFace Inference API."""
 
@@ -57,7 +112,8 @@ class LLMService:
     def client(self) -> InferenceClient:
         """Get or create inference client."""
         if self._client is None:
-            self._client = InferenceClient(model=self.model_id, token=self.api_key)
+            # Requests go through huggingface_hub's shared HTTP client, so connections are already reused.
+            self._client = InferenceClient(model=self.model_id, token=self.api_key, timeout=config.LLM_TIMEOUT_SECONDS)
         return self._client
 
     def classify_email(self, email_content: str, sender: str, subject: str) -> ClassificationResult:
@@ -72,7 +128,82 @@ class LLMService:
         Returns:
             ClassificationResult with category, confidence, and reasoning.
         """
-        prompt = f"""Classify the following email into ONE of these categories:
+        content = email_content[:_PROMPT_CONTENT_MAX_CHARS]
+        key = self._cache_key("classify", content, sender, subject)
+        cached = _result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            response = self.client.text_generation(
+                self._classification_prompt(content, sender, subject),
+                max_new_tokens=200,
+                do_sample=False,
+                grammar={"type": "json", "value": _CLASSIFICATION_SCHEMA},
+            )
+            result = self._parse_classification(response)
+            _result_cache.put(key, result)
+            return result
+        except Exception:
+            logger.exception("Failed to classify email")
+            return self._failed_classification()
+
+    async def aclassify_many(self, items: list[tuple[str, str, str]]) -> list[ClassificationResult]:
+        """
+        Classify several emails concurrently.
+
+        Args:
+            items: (email_content, sender, subject) tuples, one per email.
+
+        Returns:
+            ClassificationResult objects in input order; failed calls default to FYI_ONLY.
+        """
+        results: dict[int, ClassificationResult] = {}
+        pending: list[tuple[int, bytes, tuple[str, str, str]]] = []
+        for index, (email_content, sender, subject) in enumerate(items):
+            item = (email_content[:_PROMPT_CONTENT_MAX_CHARS], sender, subject)
+            key = self._cache_key("classify", *item)
+            cached = _result_cache.get(key)
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.append((index, key, item))
+        if not pending:
+            return [results[index] for index in range(len(items))]
+
+        limiter = anyio.CapacityLimiter(config.LLM_MAX_CONCURRENCY)
+        async with AsyncInferenceClient(
+            model=self.model_id, token=self.api_key, timeout=config.LLM_TIMEOUT_SECONDS
+        ) as client:
+
+            async def classify_one(index: int, key: bytes, item: tuple[str, str, str]) -> None:
+                async with limiter:
+                    try:
+                        response = await client.text_generation(
+                            self._classification_prompt(*item),
+                            max_new_tokens=200,
+                            do_sample=False,
+                            grammar={"type": "json", "value": _CLASSIFICATION_SCHEMA},
+                        )
+                        results[index] = self._parse_classification(response)
+                        _result_cache.put(key, results[index])
+                    except Exception:
+                        logger.exception("Failed to classify email")
+                        results[index] = self._failed_classification()
+
+            async with anyio.create_task_group() as task_group:
+                for index, key, item in pending:
+                    task_group.start_soon(classify_one, index, key, item)
+
+        return [results[index] for index in range(len(items))]
+
+    def _cache_key(self, task: str, *parts: str) -> bytes:
+        """Build the result cache key for a task on the truncated prompt inputs."""
+        return content_key(self.model_id, task, *parts)
+
+    def _classification_prompt(self, content: str, sender: str, subject: str) -> str:
+        """Build the classification prompt from already truncated email content."""
+        return f"""Classify the following email into ONE of these categories:
 - NEEDS_REPLY: Email requires a response from the recipient
 - FYI_ONLY: Informational email, no action needed
 - MEETING_REQUEST: Email contains a meeting request or scheduling discussion
@@ -81,28 +212,20 @@ class LLMService:
 Email details:
 From: {sender}
 Subject: {subject}
-Content: {email_content[:2000]}
+Content: {content}
 
 Respond in this exact JSON format:
 {{"category": "CATEGORY_NAME", "confidence": 0.0-1.0, "reasoning": "brief explanation"}}
 
 JSON response:"""
 
-        try:
-            response = self.client.text_generation(
-                prompt,
-                max_new_tokens=200,
-                temperature=0.1,
-                do_sample=True,
-            )
-            return self._parse_classification(response)
-        except Exception:
-            logger.exception("Failed to classify email")
-            return ClassificationResult(
-                category="FYI_ONLY",
-                confidence=0.5,
-                reasoning="Classification failed, defaulting to FYI_ONLY",
-            )
+    def _failed_classification(self) -> ClassificationResult:
+        """Get the default classification used when the LLM call fails."""
+        return ClassificationResult(
+            category="FYI_ONLY",
+            confidence=0.5,
+            reasoning="Classification failed, defaulting to FYI_ONLY",
+        )
 
     def draft_reply(
         self,
@@ -125,13 +248,14 @@ JSON response:"""
         Returns:
             Draft reply text.
         """
+        content = email_content[:_PROMPT_CONTENT_MAX_CHARS]
         prompt = f"""Write a {tone} email reply to the following email.
 Keep it concise and helpful. Do not include a subject line.
 
 Original email:
 From: {sender}
 Subject: {subject}
-Content: {email_content[:2000]}
+Content: {content}
 
 {f"Additional context: {context}" if context else ""}
 
@@ -160,11 +284,17 @@ Reply (do not include subject line, start with greeting):"""
         Returns:
             MeetingExtraction with parsed meeting details.
         """
+        content = email_content[:_PROMPT_CONTENT_MAX_CHARS]
+        key = self._cache_key("meeting", content, subject)
+        cached = _result_cache.get(key)
+        if cached is not None:
+            return _copy_extraction(cached)
+
         prompt = f"""Extract meeting details from this email. If no meeting is requested, set has_meeting_request to false.
 
 Email:
 Subject: {subject}
-Content: {email_content[:2000]}
+Content: {content}
 
 Respond in this exact JSON format:
 {{
@@ -183,10 +313,12 @@ JSON response:"""
             response = self.client.text_generation(
                 prompt,
                 max_new_tokens=300,
-                temperature=0.1,
-                do_sample=True,
+                do_sample=False,
+                grammar={"type": "json", "value": _MEETING_SCHEMA},
             )
-            return self._parse_meeting_extraction(response)
+            extraction = self._parse_meeting_extraction(response)
+            _result_cache.put(key, extraction)
+            return _copy_extraction(extraction)
         except Exception:
             logger.exception("Failed to extract meeting details")
             return MeetingExtraction(
@@ -210,9 +342,15 @@ JSON response:"""
         Returns:
             Email summary.
         """
+        content = email_content[:_PROMPT_CONTENT_MAX_CHARS]
+        key = self._cache_key("summary", content, str(max_words))
+        cached = _result_cache.get(key)
+        if cached is not None:
+            return cached
+
         prompt = f"""Summarize this email in {max_words} words or less:
 
-{email_content[:2000]}
+{content}
 
 Summary:"""
 
@@ -223,7 +361,9 @@ Summary:"""
                 temperature=0.3,
                 do_sample=True,
             )
-            return response.strip()
+            summary = response.strip()
+            _result_cache.put(key, summary)
+            return summary
         except Exception:
             logger.exception("Failed to summarize email")
             return ""
@@ -231,12 +371,10 @@ Summary:"""
     def _parse_classification(self, response: str) -> ClassificationResult:
         """Parse classification response from LLM."""
         try:
-            json_match = re.search(r"\{[^}]+\}", response)
-            if json_match:
-                data = json.loads(json_match.group())
+            data = self._load_json_object(response, _JSON_RE)
+            if data is not None:
                 category = data.get("category", "FYI_ONLY").upper()
-                valid_categories = ["NEEDS_REPLY", "FYI_ONLY", "MEETING_REQUEST", "TASK_ACTION"]
-                if category not in valid_categories:
+                if category not in _VALID_CATEGORIES:
                     category = "FYI_ONLY"
                 return ClassificationResult(
                     category=category,
@@ -255,9 +393,8 @@ Summary:"""
     def _parse_meeting_extraction(self, response: str) -> MeetingExtraction:
         """Parse meeting extraction response from LLM."""
         try:
-            json_match = re.search(r"\{[^}]*\}", response, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
+            data = self._load_json_object(response, _JSON_DOTALL_RE)
+            if data is not None:
                 return MeetingExtraction(
                     has_meeting_request=bool(data.get("has_meeting_request", False)),
                     title=str(data.get("title", "")),
@@ -280,16 +417,20 @@ Summary:"""
             notes="",
         )
 
+    def _load_json_object(self, response: str, fallback_pattern: re.Pattern[str]) -> dict[str, Any] | None:
+        """Load a grammar-constrained JSON response, searching for an embedded object if it is not pure JSON."""
+        try:
+            data = json.loads(response)
+        except json.JSONDecodeError:
+            match = fallback_pattern.search(response)
+            if match is None:
+                return None
+            data = json.loads(match.group())
+        return data if isinstance(data, dict) else None
+
     def _clean_reply(self, response: str) -> str:
         """Clean up generated reply text."""
-        lines = response.strip().split("\n")
-        cleaned_lines = []
-        for line in lines:
-            lower = line.lower().strip()
-            if lower.startswith("subject:") or lower.startswith("re:"):
-                continue
-            cleaned_lines.append(line)
-        return "\n".join(cleaned_lines).strip()
+        return _REPLY_HEADER_RE.sub("", response).strip()
 
     def generate(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7) -> str:
         """
@@ -1,12 +1,31 @@
 """Tests for the approval checker."""
 
+from dataclasses import replace
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
+
+import pytest
 
 from agent.approval import ApprovalCheck, ApprovalChecker
 from agent.classifier import ClassificationResult
 from services.gmail_service import EmailMessage
 
+_BASE_EMAIL = EmailMessage(
+    id="test123",
+    thread_id="thread123",
+    subject="Test Subject",
+    sender="Test Sender",
+    sender_email="test@example.com",
+    recipients=["recipient@example.com"],
+    date=datetime(2024, 1, 1, 9, 0),
+    snippet="Test body content",
+    body="Test body content",
+    labels=["INBOX"],
+    is_unread=True,
+    has_attachments=False,
+    attachment_names=[],
+)
+
 
 def create_test_email(
     subject: str = "Test Subject",
@@ -14,24 +33,20 @@ def create_test_email(
     sender: str = "Test Sender",
     sender_email: str = "test@example.com",
 ) -> EmailMessage:
-    """Create a test email message."""
-    return EmailMessage(
-        id="test123",
-        thread_id="thread123",
-        subject=subject,
-        sender=sender,
-        sender_email=sender_email,
-        recipients=["recipient@example.com"],
-        date=datetime.now(),
-        snippet=body[:100],
-        body=body,
-        labels=["INBOX"],
-        is_unread=True,
-        has_attachments=False,
-        attachment_names=[],
+    """Create a test email message from the shared base email."""
+    return replace(
+        _BASE_EMAIL, subject=subject, sender=sender, sender_email=sender_email, snippet=body[:100], body=body
     )
 
 
+@pytest.fixture
+def mock_db() -> MagicMock:
+    """Provide a fake database where every sender is known unless a test says otherwise."""
+    db = MagicMock()
+    db.is_known_sender.return_value = True
+    return db
+
+
 def test_approval_check_dataclass() -> None:
     """Test ApprovalCheck dataclass."""
     check = ApprovalCheck(
@@ -64,12 +79,9 @@ def test_checker_initialization() -> None:
     assert checker.sensitive_keywords == ["urgent", "payment"]
 
 
-@patch("agent.approval.Database")
-def test_check_email_unknown_sender(mock_db_class: MagicMock) -> None:
+def test_check_email_unknown_sender(mock_db: MagicMock) -> None:
     """Test checking email from unknown sender."""
-    mock_db = MagicMock()
     mock_db.is_known_sender.return_value = False
-    mock_db_class.return_value = mock_db
 
     checker = ApprovalChecker(db=mock_db)
     email = create_test_email(sender_email="unknown@example.com")
@@ -81,13 +93,8 @@ def test_check_email_unknown_sender(mock_db_class: MagicMock) -> None:
     assert result.risk_level == "medium"
 
 
-@patch("agent.approval.Database")
-def test_check_email_known_sender(mock_db_class: MagicMock) -> None:
+def test_check_email_known_sender(mock_db: MagicMock) -> None:
     """Test checking email from known sender."""
-    mock_db = MagicMock()
-    mock_db.is_known_sender.return_value = True
-    mock_db_class.return_value = mock_db
-
     checker = ApprovalChecker(db=mock_db)
     email = create_test_email(sender_email="known@example.com")
 
@@ -96,13 +103,8 @@ def test_check_email_known_sender(mock_db_class: MagicMock) -> None:
     assert "unknown_sender" not in result.reasons
 
 
-@patch("agent.approval.Database")
-def test_check_email_sensitive_keywords(mock_db_class: MagicMock) -> None:
+def test_check_email_sensitive_keywords(mock_db: MagicMock) -> None:
     """Test checking email with sensitive keywords."""
-    mock_db = MagicMock()
-    mock_db.is_known_sender.return_value = True
-    mock_db_class.return_value = mock_db
-
     checker = ApprovalChecker(db=mock_db, sensitive_keywords=["urgent", "payment", "$"])
     email = create_test_email(
         subject="URGENT: Payment required",
@@ -116,13 +118,8 @@ def test_check_email_sensitive_keywords(mock_db_class: MagicMock) -> None:
     assert result.risk_level == "high"
 
 
-@patch("agent.approval.Database")
-def test_check_email_low_confidence(mock_db_class: MagicMock) -> None:
+def test_check_email_low_confidence(mock_db: MagicMock) -> None:
     """Test checking email with low classification confidence."""
-    mock_db = MagicMock()
-    mock_db.is_known_sender.return_value = True
-    mock_db_class.return_value = mock_db
-
     checker = ApprovalChecker(db=mock_db, confidence_threshold=0.7)
     email = create_test_email()
     classification = ClassificationResult(
@@ -137,13 +134,26 @@ def test_check_email_low_confidence(mock_db_class: MagicMock) -> None:
     assert "low_confidence" in result.reasons
 
 
-@patch("agent.approval.Database")
-def test_check_draft_commitments(mock_db_class: MagicMock) -> None:
-    """Test checking draft with commitment language."""
-    mock_db = MagicMock()
-    mock_db.is_known_sender.return_value = True
-    mock_db_class.return_value = mock_db
+def test_check_emails_looks_up_senders_once(mock_db: MagicMock) -> None:
+    """Test batched checks fetch every sender in one query and keep input order."""
+    mock_db.are_known_senders.return_value = {"known@example.com": True, "new@example.com": False}
+    checker = ApprovalChecker(db=mock_db, confidence_threshold=0.7)
+    pairs = [
+        (create_test_email(sender_email="Known@example.com"), ClassificationResult("FYI_ONLY", 0.9, "News")),
+        (create_test_email(sender_email="new@example.com"), None),
+        (create_test_email(sender_email="known@example.com"), ClassificationResult("FYI_ONLY", 0.5, "Unsure")),
+    ]
+
+    results = checker.check_emails(pairs)
 
+    assert [result.requires_approval for result in results] == [False, True, True]
+    assert results[2].reasons == ["low_confidence"]
+    mock_db.are_known_senders.assert_called_once()
+    mock_db.is_known_sender.assert_not_called()
+
+
+def test_check_draft_commitments(mock_db: MagicMock) -> None:
+    """Test checking draft with commitment language."""
     checker = ApprovalChecker(db=mock_db)
     email = create_test_email()
     draft = "I will deliver the project by Friday. I guarantee this will work."
@@ -155,13 +165,20 @@ def test_check_draft_commitments(mock_db_class: MagicMock) -> None:
     assert result.risk_level == "high"
 
 
-@patch("agent.approval.Database")
-def test_check_draft_sensitive_keywords(mock_db_class: MagicMock) -> None:
-    """Test checking draft with sensitive keywords."""
+def test_check_draft_unknown_sender_keeps_high_risk() -> None:
+    """Test a lower-risk rule never downgrades an already high risk level."""
     mock_db = MagicMock()
-    mock_db.is_known_sender.return_value = True
-    mock_db_class.return_value = mock_db
+    mock_db.is_known_sender.return_value = False
 
+    checker = ApprovalChecker(db=mock_db)
+    result = checker.check_draft("I guarantee delivery by Friday.", create_test_email())
+
+    assert "replying_to_unknown_sender" in result.reasons
+    assert result.risk_level == "high"
+
+
+def test_check_draft_sensitive_keywords(mock_db: MagicMock) -> None:
+    """Test checking draft with sensitive keywords."""
     checker = ApprovalChecker(db=mock_db, sensitive_keywords=["payment", "invoice"])
     email = create_test_email()
     draft = "Please send the payment for the invoice attached."
@@ -172,12 +189,9 @@ def test_check_draft_sensitive_keywords(mock_db_class: MagicMock) -> None:
     assert "draft_contains_sensitive_keywords" in result.reasons
 
 
-@patch("agent.approval.Database")
-def test_check_calendar_action_external_attendees(mock_db_class: MagicMock) -> None:
+def test_check_calendar_action_external_attendees(mock_db: MagicMock) -> None:
     """Test checking calendar action with external attendees."""
-    mock_db = MagicMock()
     mock_db.is_known_sender.return_value = False
-    mock_db_class.return_value = mock_db
 
     checker = ApprovalChecker(db=mock_db)
 
@@ -191,13 +205,8 @@ def test_check_calendar_action_external_attendees(mock_db_class: MagicMock) -> N
     assert "external_attendees" in result.reasons
 
 
-@patch("agent.approval.Database")
-def test_should_auto_approve_fyi(mock_db_class: MagicMock) -> None:
+def test_should_auto_approve_fyi(mock_db: MagicMock) -> None:
     """Test auto-approval for FYI emails."""
-    mock_db = MagicMock()
-    mock_db.is_known_sender.return_value = True
-    mock_db_class.return_value = mock_db
-
     checker = ApprovalChecker(db=mock_db)
     email = create_test_email(
         subject="Newsletter",
@@ -214,13 +223,8 @@ def test_should_auto_approve_fyi(mock_db_class: MagicMock) -> None:
     assert result is True
 
 
-@patch("agent.approval.Database")
-def test_should_not_auto_approve_low_confidence(mock_db_class: MagicMock) -> None:
+def test_should_not_auto_approve_low_confidence(mock_db: MagicMock) -> None:
     """Test no auto-approval for low confidence."""
-    mock_db = MagicMock()
-    mock_db.is_known_sender.return_value = True
-    mock_db_class.return_value = mock_db
-
     checker = ApprovalChecker(db=mock_db, confidence_threshold=0.7)
     email = create_test_email()
     classification = ClassificationResult(
@@ -234,6 +238,41 @@ def test_should_not_auto_approve_low_confidence(mock_db_class: MagicMock) -> Non
     assert result is False
 
 
+def test_check_draft_fast_stops_at_high_risk() -> None:
+    """Test fast mode skips the sender lookup once the draft is high risk."""
+    mock_db = MagicMock()
+
+    checker = ApprovalChecker(db=mock_db)
+    result = checker.check_draft("I guarantee delivery by Friday.", create_test_email(), fast=True)
+
+    assert result.requires_approval is True
+    assert result.risk_level == "high"
+    mock_db.is_known_sender.assert_not_called()
+
+
+def test_should_auto_approve_low_confidence_skips_lookups() -> None:
+    """Test auto-approval rejects low confidence before any sender lookup."""
+    mock_db = MagicMock()
+
+    checker = ApprovalChecker(db=mock_db, confidence_threshold=0.7)
+    classification = ClassificationResult(category="FYI_ONLY", confidence=0.5, reasoning="Unsure")
+
+    assert checker.should_auto_approve(create_test_email(), classification) is False
+    mock_db.is_known_sender.assert_not_called()
+
+
+def test_should_auto_approve_rejects_sensitive_content() -> None:
+    """Test auto-approval is refused when a sensitive keyword is present."""
+    mock_db = MagicMock()
+    mock_db.is_known_sender.return_value = True
+
+    checker = ApprovalChecker(db=mock_db, sensitive_keywords=["invoice"])
+    email = create_test_email(subject="Your Invoice", body="See attached.")
+    classification = ClassificationResult(category="FYI_ONLY", confidence=0.95, reasoning="Receipt")
+
+    assert checker.should_auto_approve(email, classification) is False
+
+
 def test_contains_commitments() -> None:
     """Test commitment language detection."""
     checker = ApprovalChecker()
@@ -245,6 +284,15 @@ def test_contains_commitments() -> None:
     assert checker._contains_commitments("Thank you for your email") is False
 
 
+def test_contains_commitments_case_insensitive() -> None:
+    """Test commitment detection ignores case and handles confirmations."""
+    checker = ApprovalChecker()
+
+    assert checker._contains_commitments("WE WILL be there") is True
+    assert checker._contains_commitments("Confirmed: the delivery is on track") is True
+    assert checker._contains_commitments("Please confirm receipt") is False
+
+
 def test_find_sensitive_keywords() -> None:
     """Test sensitive keyword detection."""
     checker = ApprovalChecker(sensitive_keywords=["urgent", "payment", "deadline"])
@@ -255,6 +303,41 @@ def test_find_sensitive_keywords() -> None:
     assert "deadline" not in found
 
 
+def test_find_sensitive_keywords_overlapping() -> None:
+    """Test overlapping keywords are all reported in configured order."""
+    checker = ApprovalChecker(sensitive_keywords=["payment", "pay", "$"])
+
+    assert checker._find_sensitive_keywords("Please PAY the $500 payment") == ["payment", "pay", "$"]
+    assert checker._find_sensitive_keywords("Nothing to see here") == []
+
+
+def test_find_sensitive_keywords_mixed_case_config() -> None:
+    """Test configured keywords are matched case-insensitively and reported as configured."""
+    checker = ApprovalChecker(sensitive_keywords=["ASAP", "Invoice"])
+
+    assert checker._find_sensitive_keywords("please send the invoice asap") == ["ASAP", "Invoice"]
+
+
+def test_sensitive_keywords_setter_rebuilds_matcher() -> None:
+    """Test replacing sensitive keywords updates detection."""
+    checker = ApprovalChecker(sensitive_keywords=["urgent"])
+
+    checker.sensitive_keywords = ["invoice"]
+
+    assert checker._find_sensitive_keywords("Urgent invoice attached") == ["invoice"]
+
+
+def test_empty_sensitive_keywords_match_nothing() -> None:
+    """Test an empty keyword list leaves emails and drafts unflagged for sensitive content."""
+    checker = ApprovalChecker(db=MagicMock())
+    checker.db.is_known_sender.return_value = True
+    checker.sensitive_keywords = []
+
+    assert checker._find_sensitive_keywords("Urgent invoice attached") == []
+    assert checker.check_email(create_test_email(subject="Urgent invoice")).requires_approval is False
+    assert checker.check_draft("Invoice attached.", create_test_email()).requires_approval is False
+
+
 def test_get_risk_summary() -> None:
     """Test risk summary generation."""
     checker = ApprovalChecker()
@@ -280,3 +363,45 @@ def test_get_risk_summary_no_approval() -> None:
     summary = checker.get_risk_summary(check)
 
     assert summary == "No approval required"
+
+
+def test_is_known_sender_memoized() -> None:
+    """Test repeated sender lookups hit the database once per address."""
+    mock_db = MagicMock()
+    mock_db.is_known_sender.return_value = False
+
+    checker = ApprovalChecker(db=mock_db)
+    for address in ["a@example.com", "A@example.com", "a@example.com"]:
+        assert checker._is_known_sender(address) is False
+
+    mock_db.is_known_sender.assert_called_once_with("a@example.com")
+
+
+def test_check_calendar_action_prefetches_attendees() -> None:
+    """Test attendee status is fetched in one batched query."""
+    mock_db = MagicMock()
+    mock_db.are_known_senders.return_value = {"known@example.com": True, "new@example.com": False}
+
+    checker = ApprovalChecker(db=mock_db)
+    result = checker.check_calendar_action(
+        summary="Sync",
+        attendees=["Known@example.com", "new@example.com"],
+    )
+
+    mock_db.are_known_senders.assert_called_once()
+    mock_db.is_known_sender.assert_not_called()
+    assert "attendee:new@example.com" in result.reasons
+    assert "attendee:Known@example.com" not in result.reasons
+
+
+def test_add_known_sender_invalidates_cache() -> None:
+    """Test adding a sender refreshes its cached lookup."""
+    mock_db = MagicMock()
+    mock_db.is_known_sender.return_value = False
+
+    checker = ApprovalChecker(db=mock_db)
+    assert checker._is_known_sender("new@example.com") is False
+
+    mock_db.is_known_sender.return_value = True
+    assert checker.add_known_sender("new@example.com") is True
+    assert checker._is_known_sender("new@example.com") is True
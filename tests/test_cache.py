@@ -0,0 +1,37 @@
+"""Tests for the in-process LLM result caches."""
+
+from pathlib import Path
+
+from agent.cache import LRUCache, SQLiteCache, content_key
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    """Test the oldest untouched entry is evicted first."""
+    cache: LRUCache[str, int] = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_content_key_separates_parts() -> None:
+    """Test part boundaries are part of the key."""
+    assert content_key("ab", "c") == content_key("ab", "c")
+    assert content_key("ab", "c") != content_key("a", "bc")
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path: Path) -> None:
+    """Test values written by one cache instance are read by another."""
+    path = tmp_path / "llm_cache.db"
+    SQLiteCache(path).put(b"key", {"category": "FYI_ONLY"})
+
+    cache = SQLiteCache(path)
+
+    assert cache.get(b"key") == {"category": "FYI_ONLY"}
+    assert cache.get(b"missing") is None
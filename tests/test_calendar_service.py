@@ -1,10 +1,60 @@
 """Tests for the Calendar service."""
 
+from collections.abc import Callable
 from datetime import datetime, timedelta
+from typing import Any
 from unittest.mock import MagicMock, patch
 from zoneinfo import ZoneInfo
 
-from services.calendar_service import CalendarEvent, CalendarService, MeetingDetails, TimeSlot
+import pytest
+
+from services.calendar_service import CalendarEvent, CalendarService, MeetingDetails, TimeSlot, _busy_snapshots
+
+
+@pytest.fixture(autouse=True)
+def clear_busy_snapshots() -> None:
+    """Start every test without cached busy times."""
+    _busy_snapshots.clear()
+
+
+class FakeRequest:
+    """Stand-in for an API request that returns a canned response."""
+
+    def __init__(self, response: Any) -> None:
+        self.response = response
+
+    def execute(self) -> Any:
+        return self.response
+
+
+class FakeCalendarAPI:
+    """Stand-in for the events and freebusy resources that records each call's arguments."""
+
+    def __init__(self, **responses: Any) -> None:
+        self.responses = responses
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    def events(self) -> "FakeCalendarAPI":
+        return self
+
+    def freebusy(self) -> "FakeCalendarAPI":
+        return self
+
+    def _request(self, method: str, kwargs: dict[str, Any]) -> FakeRequest:
+        self.calls.append((method, kwargs))
+        return FakeRequest(self.responses.get(method))
+
+    def list(self, **kwargs: Any) -> FakeRequest:
+        return self._request("list", kwargs)
+
+    def insert(self, **kwargs: Any) -> FakeRequest:
+        return self._request("insert", kwargs)
+
+    def delete(self, **kwargs: Any) -> FakeRequest:
+        return self._request("delete", kwargs)
+
+    def query(self, **kwargs: Any) -> FakeRequest:
+        return self._request("query", kwargs)
 
 
 def test_calendar_event_dataclass() -> None:
@@ -99,32 +149,30 @@ def test_parse_event_all_day() -> None:
     assert event.is_all_day is True
 
 
-@patch("services.calendar_service.get_calendar_service")
-def test_list_events(mock_get_service: MagicMock) -> None:
+def test_list_events() -> None:
     """Test listing calendar events."""
-    mock_service = MagicMock()
-    mock_get_service.return_value = mock_service
-
-    mock_service.events().list().execute.return_value = {
-        "items": [
-            {
-                "id": "event1",
-                "summary": "Meeting 1",
-                "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
-                "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
-                "status": "confirmed",
-            },
-            {
-                "id": "event2",
-                "summary": "Meeting 2",
-                "start": {"dateTime": "2024-01-15T14:00:00+00:00"},
-                "end": {"dateTime": "2024-01-15T15:00:00+00:00"},
-                "status": "confirmed",
-            },
-        ]
-    }
+    api = FakeCalendarAPI(
+        list={
+            "items": [
+                {
+                    "id": "event1",
+                    "summary": "Meeting 1",
+                    "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
+                    "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
+                    "status": "confirmed",
+                },
+                {
+                    "id": "event2",
+                    "summary": "Meeting 2",
+                    "start": {"dateTime": "2024-01-15T14:00:00+00:00"},
+                    "end": {"dateTime": "2024-01-15T15:00:00+00:00"},
+                    "status": "confirmed",
+                },
+            ]
+        }
+    )
 
-    calendar = CalendarService(service=mock_service)
+    calendar = CalendarService(service=api)
     events = calendar.list_events()
 
     assert len(events) == 2
@@ -132,21 +180,19 @@ def test_list_events(mock_get_service: MagicMock) -> None:
     assert events[1].summary == "Meeting 2"
 
 
-@patch("services.calendar_service.get_calendar_service")
-def test_create_event(mock_get_service: MagicMock) -> None:
+def test_create_event() -> None:
     """Test creating a calendar event."""
-    mock_service = MagicMock()
-    mock_get_service.return_value = mock_service
-
-    mock_service.events().insert().execute.return_value = {
-        "id": "new_event",
-        "summary": "New Meeting",
-        "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
-        "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
-        "status": "confirmed",
-    }
+    api = FakeCalendarAPI(
+        insert={
+            "id": "new_event",
+            "summary": "New Meeting",
+            "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
+            "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
+            "status": "confirmed",
+        }
+    )
 
-    calendar = CalendarService(service=mock_service)
+    calendar = CalendarService(service=api)
     meeting = MeetingDetails(
         summary="New Meeting",
         start=datetime(2024, 1, 15, 10, 0, tzinfo=ZoneInfo("UTC")),
@@ -160,22 +206,20 @@ def test_create_event(mock_get_service: MagicMock) -> None:
     assert event.summary == "New Meeting"
 
 
-@patch("services.calendar_service.get_calendar_service")
-def test_create_event_with_attendees(mock_get_service: MagicMock) -> None:
+def test_create_event_with_attendees() -> None:
     """Test creating event with attendees."""
-    mock_service = MagicMock()
-    mock_get_service.return_value = mock_service
-
-    mock_service.events().insert().execute.return_value = {
-        "id": "event_with_attendees",
-        "summary": "Team Meeting",
-        "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
-        "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
-        "attendees": [{"email": "john@example.com"}, {"email": "jane@example.com"}],
-        "status": "confirmed",
-    }
+    api = FakeCalendarAPI(
+        insert={
+            "id": "event_with_attendees",
+            "summary": "Team Meeting",
+            "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
+            "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
+            "attendees": [{"email": "john@example.com"}, {"email": "jane@example.com"}],
+            "status": "confirmed",
+        }
+    )
 
-    calendar = CalendarService(service=mock_service)
+    calendar = CalendarService(service=api)
     meeting = MeetingDetails(
         summary="Team Meeting",
         start=datetime(2024, 1, 15, 10, 0, tzinfo=ZoneInfo("UTC")),
@@ -201,34 +245,22 @@ def test_create_event_no_start_time() -> None:
     assert event is None
 
 
-@patch("services.calendar_service.get_calendar_service")
-def test_delete_event(mock_get_service: MagicMock) -> None:
+def test_delete_event() -> None:
     """Test deleting a calendar event."""
-    mock_service = MagicMock()
-    mock_get_service.return_value = mock_service
-
-    mock_service.events().delete().execute.return_value = None
+    api = FakeCalendarAPI()
 
-    calendar = CalendarService(service=mock_service)
+    calendar = CalendarService(service=api)
     result = calendar.delete_event("event123")
 
     assert result is True
-    mock_service.events().delete.assert_called_with(
-        calendarId="primary",
-        eventId="event123",
-        sendNotifications=True,
-    )
+    assert api.calls == [("delete", {"calendarId": "primary", "eventId": "event123", "sendNotifications": True})]
 
 
-@patch("services.calendar_service.get_calendar_service")
-def test_check_availability_free(mock_get_service: MagicMock) -> None:
+def test_check_availability_free() -> None:
     """Test checking availability when time is free."""
-    mock_service = MagicMock()
-    mock_get_service.return_value = mock_service
-
-    mock_service.events().list().execute.return_value = {"items": []}
+    api = FakeCalendarAPI(query={"calendars": {"primary": {"busy": []}}})
 
-    calendar = CalendarService(service=mock_service)
+    calendar = CalendarService(service=api)
     start = datetime(2024, 1, 15, 10, 0, tzinfo=ZoneInfo("UTC"))
     end = datetime(2024, 1, 15, 11, 0, tzinfo=ZoneInfo("UTC"))
 
@@ -237,25 +269,13 @@ def test_check_availability_free(mock_get_service: MagicMock) -> None:
     assert is_available is True
 
 
-@patch("services.calendar_service.get_calendar_service")
-def test_check_availability_busy(mock_get_service: MagicMock) -> None:
+def test_check_availability_busy() -> None:
     """Test checking availability when time is busy."""
-    mock_service = MagicMock()
-    mock_get_service.return_value = mock_service
-
-    mock_service.events().list().execute.return_value = {
-        "items": [
-            {
-                "id": "blocking_event",
-                "summary": "Existing Meeting",
-                "start": {"dateTime": "2024-01-15T09:30:00+00:00"},
-                "end": {"dateTime": "2024-01-15T10:30:00+00:00"},
-                "status": "confirmed",
-            }
-        ]
-    }
+    api = FakeCalendarAPI(
+        query={"calendars": {"primary": {"busy": [{"start": "2024-01-15T09:30:00Z", "end": "2024-01-15T10:30:00Z"}]}}}
+    )
 
-    calendar = CalendarService(service=mock_service)
+    calendar = CalendarService(service=api)
     start = datetime(2024, 1, 15, 10, 0, tzinfo=ZoneInfo("UTC"))
     end = datetime(2024, 1, 15, 11, 0, tzinfo=ZoneInfo("UTC"))
 
@@ -264,9 +284,38 @@ def test_check_availability_busy(mock_get_service: MagicMock) -> None:
     assert is_available is False
 
 
+def test_check_availability_batch_single_query() -> None:
+    """Test several intervals are checked against one free/busy response."""
+    mock_service = MagicMock()
+    mock_service.freebusy().query().execute.return_value = {
+        "calendars": {
+            "primary": {
+                "busy": [
+                    {"start": "2024-01-15T09:30:00Z", "end": "2024-01-15T10:30:00Z"},
+                    {"start": "2024-01-15T14:00:00Z", "end": "2024-01-15T15:00:00Z"},
+                ]
+            }
+        }
+    }
+    mock_service.freebusy().query.reset_mock()
+    calendar = CalendarService(service=mock_service)
+    utc = ZoneInfo("UTC")
+
+    available = calendar.check_availability_batch(
+        [
+            (datetime(2024, 1, 15, 10, 0, tzinfo=utc), datetime(2024, 1, 15, 11, 0, tzinfo=utc)),
+            (datetime(2024, 1, 15, 11, 0, tzinfo=utc), datetime(2024, 1, 15, 14, 0, tzinfo=utc)),
+            (datetime(2024, 1, 15, 14, 30, tzinfo=utc), datetime(2024, 1, 15, 16, 0, tzinfo=utc)),
+        ]
+    )
+
+    assert available == [False, True, False]
+    mock_service.freebusy().query.assert_called_once()
+
+
 def test_find_free_slots_empty_calendar() -> None:
     """Test finding free slots with empty calendar."""
-    with patch.object(CalendarService, "list_events", return_value=[]):
+    with patch.object(CalendarService, "_query_busy", return_value=[]):
         calendar = CalendarService(timezone="UTC")
         now = datetime.now(ZoneInfo("UTC")).replace(hour=10, minute=0, second=0, microsecond=0)
 
@@ -284,7 +333,7 @@ def test_find_free_slots_empty_calendar() -> None:
 
 def test_find_free_slots_respects_working_hours() -> None:
     """Test that free slots respect working hours."""
-    with patch.object(CalendarService, "list_events", return_value=[]):
+    with patch.object(CalendarService, "_query_busy", return_value=[]):
         calendar = CalendarService(timezone="UTC")
         now = datetime.now(ZoneInfo("UTC")).replace(hour=9, minute=0, second=0, microsecond=0)
 
@@ -298,3 +347,199 @@ def test_find_free_slots_respects_working_hours() -> None:
         for slot in slots:
             assert slot.start.hour >= 9
             assert slot.end.hour <= 17
+
+
+def test_find_free_slots_stops_at_max_results() -> None:
+    """Test slot search stops once max_results slots are found."""
+    with patch.object(CalendarService, "_query_busy", return_value=[]):
+        calendar = CalendarService(timezone="UTC")
+        start = datetime(2024, 1, 15, 9, 0, tzinfo=ZoneInfo("UTC"))
+
+        slots = calendar.find_free_slots(start_date=start, end_date=start + timedelta(days=7), max_results=3)
+
+        assert [slot.start.hour for slot in slots] == [9, 9, 10]
+
+
+def test_find_free_slots_reuses_busy_snapshot_until_event_created() -> None:
+    """Test repeated slot searches share one event fetch until the calendar changes."""
+    mock_service = MagicMock()
+    mock_service.events().insert().execute.return_value = {
+        "id": "new",
+        "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
+        "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
+    }
+    calendar = CalendarService(service=mock_service, timezone="UTC")
+    start = datetime(2024, 1, 15, 9, 0, tzinfo=ZoneInfo("UTC"))
+
+    with patch.object(CalendarService, "_query_busy", return_value=[]) as mock_query:
+        calendar.find_free_slots(start_date=start, end_date=start + timedelta(days=14))
+        calendar.find_free_slots(start_date=start + timedelta(hours=1), end_date=start + timedelta(days=14))
+        assert mock_query.call_count == 1
+
+        calendar.create_event(MeetingDetails(summary="Sync", start=start + timedelta(hours=1)))
+        calendar.find_free_slots(start_date=start, end_date=start + timedelta(days=14))
+        assert mock_query.call_count == 2
+
+
+def test_failed_busy_query_offers_no_slots_and_is_not_cached() -> None:
+    """Test a free/busy failure yields no free slots, marks slots unavailable and is retried next time."""
+    mock_service = MagicMock()
+    mock_service.freebusy().query().execute.side_effect = [
+        Exception("backend error"),
+        {"calendars": {"primary": {"errors": [{"reason": "backendError"}]}}},
+        {"calendars": {"primary": {"busy": []}}},
+    ]
+    calendar = CalendarService(service=mock_service, timezone="UTC")
+    start = datetime(2024, 1, 15, 9, 0, tzinfo=ZoneInfo("UTC"))
+
+    assert calendar.find_free_slots(start_date=start, end_date=start + timedelta(days=1)) == []
+    assert calendar.check_availability_batch([(start, start + timedelta(hours=1))]) == [False]
+    assert calendar.find_free_slots(start_date=start, end_date=start + timedelta(days=1), max_results=1) != []
+
+
+def test_timezone_setter_refreshes_zoneinfo() -> None:
+    """Test changing the calendar timezone updates the cached ZoneInfo."""
+    calendar = CalendarService(timezone="UTC")
+    calendar.timezone = "Europe/London"
+
+    assert calendar.timezone == "Europe/London"
+    assert calendar._tz == ZoneInfo("Europe/London")
+
+
+def test_find_free_slots_resumes_after_overlapping_busy_times() -> None:
+    """Test slots skip over overlapping busy intervals and resume at the end of the merged block."""
+    utc = ZoneInfo("UTC")
+    start = datetime(2024, 1, 15, 9, 0, tzinfo=utc)
+    calendar = CalendarService(timezone="UTC")
+    busy = [
+        (datetime(2024, 1, 15, 9, 30, tzinfo=utc), datetime(2024, 1, 15, 11, 0, tzinfo=utc)),
+        (datetime(2024, 1, 15, 10, 30, tzinfo=utc), datetime(2024, 1, 15, 11, 15, tzinfo=utc)),
+    ]
+
+    with patch.object(CalendarService, "_get_busy_times", return_value=busy):
+        slots = calendar.find_free_slots(start_date=start, end_date=start + timedelta(hours=4), duration_minutes=30)
+
+    assert [slot.start.strftime("%H:%M") for slot in slots] == ["09:00", "11:15", "11:45", "12:15"]
+
+
+class FakeBatch:
+    """Minimal stand-in for BatchHttpRequest that answers each request from a callable."""
+
+    def __init__(self, callback: Callable[..., None], respond: Callable[[Any], tuple[Any, Any]]) -> None:
+        self.callback = callback
+        self.respond = respond
+        self.requests: list[tuple[str, object]] = []
+
+    def add(self, request: object, request_id: str) -> None:
+        self.requests.append((request_id, request))
+
+    def execute(self) -> None:
+        for request_id, request in self.requests:
+            response, exception = self.respond(request)
+            self.callback(request_id, response, exception)
+
+
+def test_create_events_batches_requests() -> None:
+    """Test several events are created in one batch and failures map to None."""
+    mock_service = MagicMock()
+    batches: list[FakeBatch] = []
+
+    def new_batch(callback: Callable[..., None]) -> FakeBatch:
+        batch = FakeBatch(callback, lambda request: request)
+        batches.append(batch)
+        return batch
+
+    def insert(calendarId: str, body: dict, sendNotifications: bool, fields: str) -> tuple:
+        if body["summary"] == "Broken":
+            return None, Exception("quota")
+        event = {"id": body["summary"], "summary": body["summary"], "start": body["start"], "end": body["end"]}
+        return event, None
+
+    mock_service.new_batch_http_request.side_effect = new_batch
+    mock_service.events().insert.side_effect = insert
+    calendar = CalendarService(service=mock_service)
+    start = datetime(2024, 1, 15, 10, 0, tzinfo=ZoneInfo("UTC"))
+
+    events = calendar.create_events(
+        [
+            MeetingDetails(summary="Sync", start=start),
+            MeetingDetails(summary="Broken", start=start),
+            MeetingDetails(summary="No start"),
+        ]
+    )
+
+    assert events[0] is not None
+    assert events[0].id == "Sync"
+    assert events[1] is None
+    assert events[2] is None
+    assert len(batches) == 1
+
+
+def test_delete_events_splits_large_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test deletes are split into batches of the maximum batch size."""
+    monkeypatch.setattr("services.calendar_service._BATCH_MAX_REQUESTS", 2)
+    mock_service = MagicMock()
+    batches: list[FakeBatch] = []
+
+    def new_batch(callback: Callable[..., None]) -> FakeBatch:
+        batch = FakeBatch(callback, lambda request: ("", None))
+        batches.append(batch)
+        return batch
+
+    mock_service.new_batch_http_request.side_effect = new_batch
+    calendar = CalendarService(service=mock_service)
+
+    assert calendar.delete_events(["a", "b", "c"]) == [True, True, True]
+    assert [len(batch.requests) for batch in batches] == [2, 1]
+
+
+def test_update_event_sends_only_changes() -> None:
+    """Test updates are sent as one PATCH containing only the changed fields."""
+    mock_service = MagicMock()
+    mock_service.events().patch().execute.return_value = {
+        "id": "event123",
+        "summary": "Moved",
+        "start": {"dateTime": "2024-01-16T10:00:00+00:00"},
+        "end": {"dateTime": "2024-01-16T11:00:00+00:00"},
+    }
+    mock_service.events().patch.reset_mock()
+    calendar = CalendarService(service=mock_service, timezone="UTC")
+
+    event = calendar.update_event(
+        "event123",
+        {"summary": "Moved", "start": datetime(2024, 1, 16, 10, 0, tzinfo=ZoneInfo("UTC"))},
+    )
+
+    assert event is not None
+    assert event.summary == "Moved"
+    body = mock_service.events().patch.call_args.kwargs["body"]
+    assert body == {"summary": "Moved", "start": {"dateTime": "2024-01-16T10:00:00+00:00", "timeZone": "UTC"}}
+    mock_service.events().get.assert_not_called()
+
+
+def test_calendar_dataclasses_use_slots() -> None:
+    """Test calendar value objects are slotted and carry no per-instance __dict__."""
+    event = CalendarService()._parse_event(
+        {
+            "id": "event123",
+            "start": {"dateTime": "2024-01-15T10:00:00+00:00"},
+            "end": {"dateTime": "2024-01-15T11:00:00+00:00"},
+        }
+    )
+
+    for value in (event, TimeSlot(event.start, event.end, 60), MeetingDetails(summary="Sync")):
+        assert not hasattr(value, "__dict__")
+
+
+def test_list_events_requests_only_parsed_fields() -> None:
+    """Test events.list asks Google for just the fields _parse_event reads."""
+    mock_service = MagicMock()
+    mock_service.events().list().execute.return_value = {"items": []}
+    mock_service.events().list.reset_mock()
+    calendar = CalendarService(service=mock_service)
+
+    calendar.list_events(datetime(2024, 1, 15, tzinfo=ZoneInfo("UTC")))
+
+    fields = mock_service.events().list.call_args.kwargs["fields"]
+    assert fields.startswith("items(id,summary,")
+    assert "attendees/email" in fields
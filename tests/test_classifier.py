@@ -1,33 +1,50 @@
 """Tests for the email classifier agent."""
 
+from dataclasses import FrozenInstanceError, replace
 from datetime import datetime
-from unittest.mock import MagicMock, patch
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
-from agent.classifier import ClassificationResult, EmailClassifier
+import pytest
+
+from agent.cache import SQLiteCache
+from agent.classifier import ClassificationResult, EmailClassifier, _classification_cache
 from services.gmail_service import EmailMessage
 
 
+@pytest.fixture(autouse=True)
+def clear_classification_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every test with empty in-memory and persistent classification caches."""
+    _classification_cache.clear()
+    monkeypatch.setattr("agent.classifier.response_cache", SQLiteCache(tmp_path / "llm_cache.db"))
+
+
+_BASE_EMAIL = EmailMessage(
+    id="test123",
+    thread_id="thread123",
+    subject="Test Subject",
+    sender="Test Sender",
+    sender_email="test@example.com",
+    recipients=["recipient@example.com"],
+    date=datetime(2024, 1, 1, 9, 0),
+    snippet="Test body content",
+    body="Test body content",
+    labels=["INBOX"],
+    is_unread=True,
+    has_attachments=False,
+    attachment_names=[],
+)
+
+
 def create_test_email(
     subject: str = "Test Subject",
     body: str = "Test body content",
     sender: str = "Test Sender",
     sender_email: str = "test@example.com",
 ) -> EmailMessage:
-    """Create a test email message."""
-    return EmailMessage(
-        id="test123",
-        thread_id="thread123",
-        subject=subject,
-        sender=sender,
-        sender_email=sender_email,
-        recipients=["recipient@example.com"],
-        date=datetime.now(),
-        snippet=body[:100],
-        body=body,
-        labels=["INBOX"],
-        is_unread=True,
-        has_attachments=False,
-        attachment_names=[],
+    """Create a test email message from the shared base email."""
+    return replace(
+        _BASE_EMAIL, subject=subject, sender=sender, sender_email=sender_email, snippet=body[:100], body=body
     )
 
 
@@ -43,6 +60,16 @@ def test_classification_result_dataclass() -> None:
     assert result.reasoning == "Contains a question"
 
 
+def test_classification_result_is_frozen_and_slotted() -> None:
+    """Test cached classification results cannot be mutated by one of the callers sharing them."""
+    result = ClassificationResult(category="FYI_ONLY", confidence=0.9, reasoning="Newsletter")
+
+    with pytest.raises(FrozenInstanceError):
+        result.category = "NEEDS_REPLY"  # type: ignore[misc]
+    assert not hasattr(result, "__dict__")
+    assert not hasattr(create_test_email(), "__dict__")
+
+
 def test_classifier_initialization() -> None:
     """Test EmailClassifier initialization."""
     classifier = EmailClassifier(
@@ -92,6 +119,19 @@ def test_classifier_fallback_task_action() -> None:
     assert result.confidence == 0.6
 
 
+def test_classifier_fallback_uses_rule_priority() -> None:
+    """Test the highest-priority rule wins regardless of keyword position."""
+    classifier = EmailClassifier()
+    email = create_test_email(
+        subject="Todo: please review",
+        body="Action needed before the deadline, then let's set up a call.",
+    )
+
+    result = classifier._fallback_classification(email)
+    assert result.category == "MEETING_REQUEST"
+    assert result.reasoning == "Contains meeting-related keywords"
+
+
 def test_classifier_fallback_fyi() -> None:
     """Test fallback classification for FYI emails."""
     classifier = EmailClassifier()
@@ -196,26 +236,153 @@ def test_classify_handles_chain_error(mock_chain: MagicMock) -> None:
     assert result.confidence == 0.6
 
 
+def test_classify_caches_identical_content() -> None:
+    """Test identical emails reuse the cached classification."""
+    classifier = EmailClassifier()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {"category": "NEEDS_REPLY", "confidence": 0.9, "reasoning": "Question"}
+    classifier._chain = mock_chain
+
+    first = classifier.classify(create_test_email(subject="Question"))
+    second = classifier.classify(create_test_email(subject="Question"))
+
+    mock_chain.invoke.assert_called_once()
+    assert first == second
+
+
+def test_classify_reads_persistent_cache() -> None:
+    """Test a classification stored by an earlier run skips the chain."""
+    classifier = EmailClassifier()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {"category": "TASK_ACTION", "confidence": 0.8, "reasoning": "Todo"}
+    classifier._chain = mock_chain
+    email = create_test_email(subject="Todo")
+
+    first = classifier.classify(email)
+    _classification_cache.clear()
+    second = classifier.classify(email)
+
+    mock_chain.invoke.assert_called_once()
+    assert first == second
+
+
+def test_classify_does_not_cache_fallback() -> None:
+    """Test a failed chain call is retried on the next classify."""
+    classifier = EmailClassifier()
+    mock_chain = MagicMock()
+    mock_chain.invoke.side_effect = [
+        Exception("API error"),
+        {"category": "NEEDS_REPLY", "confidence": 0.9, "reasoning": "Question"},
+    ]
+    classifier._chain = mock_chain
+    email = create_test_email(subject="Question")
+
+    assert classifier.classify(email).confidence == 0.5
+    assert classifier.classify(email).category == "NEEDS_REPLY"
+    assert mock_chain.invoke.call_count == 2
+
+
+def test_classify_batch_skips_cached_emails() -> None:
+    """Test batch classification only sends uncached emails to the chain."""
+    classifier = EmailClassifier()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {"category": "FYI_ONLY", "confidence": 0.9, "reasoning": "Newsletter"}
+    mock_chain.batch.return_value = [{"category": "NEEDS_REPLY", "confidence": 0.8, "reasoning": "Question"}]
+    classifier._chain = mock_chain
+
+    cached_email = create_test_email(subject="Newsletter")
+    classifier.classify(cached_email)
+    results = classifier.classify_batch([cached_email, create_test_email(subject="Question")])
+
+    assert len(mock_chain.batch.call_args.args[0]) == 1
+    assert [r.category for r in results] == ["FYI_ONLY", "NEEDS_REPLY"]
+
+
 def test_classify_batch() -> None:
-    """Test batch classification."""
+    """Test batch classification issues a single chain batch call."""
     classifier = EmailClassifier()
+    mock_chain = MagicMock()
+    mock_chain.batch.return_value = [
+        {"category": "MEETING_REQUEST", "confidence": 0.9, "reasoning": "test"},
+        {"category": "NEEDS_REPLY", "confidence": 0.8, "reasoning": "test"},
+    ]
+    classifier._chain = mock_chain
 
     emails = [
         create_test_email(subject="Meeting", body="Let's schedule a call"),
         create_test_email(subject="Question", body="Could you help me?"),
     ]
 
-    with patch.object(classifier, "classify") as mock_classify:
-        mock_classify.side_effect = [
-            ClassificationResult("MEETING_REQUEST", 0.9, "test"),
-            ClassificationResult("NEEDS_REPLY", 0.8, "test"),
-        ]
+    results = classifier.classify_batch(emails)
+
+    mock_chain.batch.assert_called_once()
+    mock_chain.invoke.assert_not_called()
+    assert len(results) == 2
+    assert results[0].category == "MEETING_REQUEST"
+    assert results[1].category == "NEEDS_REPLY"
+
+
+def test_classify_batch_falls_back_per_email() -> None:
+    """Test batch classification falls back only for failed emails."""
+    classifier = EmailClassifier()
+    mock_chain = MagicMock()
+    mock_chain.batch.return_value = [
+        Exception("API error"),
+        {"category": "NEEDS_REPLY", "confidence": 0.8, "reasoning": "test"},
+    ]
+    classifier._chain = mock_chain
+
+    emails = [
+        create_test_email(subject="Meeting", body="Let's schedule a call"),
+        create_test_email(subject="Question", body="Could you help me?"),
+    ]
 
-        results = classifier.classify_batch(emails)
+    results = classifier.classify_batch(emails)
+
+    assert results[0].category == "MEETING_REQUEST"
+    assert results[0].confidence == 0.6
+    assert results[1].category == "NEEDS_REPLY"
+    assert results[1].confidence == 0.8
+
+
+@pytest.mark.anyio
+async def test_aclassify_uses_chain() -> None:
+    """Test aclassify awaits the chain's async invoke."""
+    classifier = EmailClassifier()
+    mock_chain = MagicMock()
+    mock_chain.ainvoke = AsyncMock(
+        return_value={"category": "TASK_ACTION", "confidence": 0.8, "reasoning": "Action items"},
+    )
+    classifier._chain = mock_chain
+
+    result = await classifier.aclassify(create_test_email(subject="Todo"))
+
+    mock_chain.ainvoke.assert_awaited_once()
+    assert result.category == "TASK_ACTION"
+
+
+@pytest.mark.anyio
+async def test_aclassify_batch_preserves_order_and_falls_back() -> None:
+    """Test aclassify_batch returns results in input order with per-email fallback."""
+    classifier = EmailClassifier()
+    mock_chain = MagicMock()
+
+    async def fake_ainvoke(inputs: dict[str, str]) -> dict[str, object]:
+        if inputs["subject"] == "Question":
+            return {"category": "NEEDS_REPLY", "confidence": 0.9, "reasoning": "Question"}
+        raise Exception("API error")
+
+    mock_chain.ainvoke = AsyncMock(side_effect=fake_ainvoke)
+    classifier._chain = mock_chain
+
+    results = await classifier.aclassify_batch(
+        [
+            create_test_email(subject="Question", body="Could you help me?"),
+            create_test_email(subject="Can we meet?", body="Let's schedule a call."),
+        ]
+    )
 
-        assert len(results) == 2
-        assert results[0].category == "MEETING_REQUEST"
-        assert results[1].category == "NEEDS_REPLY"
+    assert [r.category for r in results] == ["NEEDS_REPLY", "MEETING_REQUEST"]
 
 
 def test_set_model() -> None:
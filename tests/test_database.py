@@ -0,0 +1,295 @@
+"""Tests for database operations."""
+
+from collections.abc import Generator
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from db.database import Database, get_engine
+from db.models import Base
+from services.gmail_service import EmailMessage
+
+
+@pytest.fixture
+def db() -> Generator[Database, None, None]:
+    """Provide a Database bound to a fresh in-memory SQLite session."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session: Session = sessionmaker(bind=engine, expire_on_commit=False)()
+    try:
+        yield Database(session=session)
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def test_is_known_sender(db: Database) -> None:
+    """Test known sender lookup is case-insensitive."""
+    db.add_known_sender("Alice@Example.com", "Alice")
+
+    assert db.is_known_sender("alice@example.com") is True
+    assert db.is_known_sender("ALICE@example.com") is True
+    assert db.is_known_sender("bob@example.com") is False
+
+
+def test_are_known_senders(db: Database) -> None:
+    """Test batched known sender lookup."""
+    db.add_known_sender("alice@example.com")
+
+    result = db.are_known_senders(["Alice@example.com", "bob@example.com", ""])
+
+    assert result == {"alice@example.com": True, "bob@example.com": False}
+    assert db.are_known_senders([]) == {}
+
+
+def create_test_email(email_id: str = "msg1", subject: str = "Test Subject") -> EmailMessage:
+    """Create a test email message."""
+    return EmailMessage(
+        id=email_id,
+        thread_id="thread123",
+        subject=subject,
+        sender="Test Sender",
+        sender_email="test@example.com",
+        recipients=["recipient@example.com"],
+        date=datetime(2024, 1, 15, 10, 0),
+        snippet="Test snippet",
+        body="Test body content",
+        labels=["INBOX"],
+        is_unread=True,
+        has_attachments=False,
+        attachment_names=[],
+    )
+
+
+def test_save_emails_upserts_by_gmail_id(db: Database) -> None:
+    """Test saving emails inserts new rows and updates existing ones in place."""
+    first = db.save_email(create_test_email("a", subject="Original"))
+
+    saved = db.save_emails([create_test_email("b"), create_test_email("a", subject="Updated")])
+
+    assert [email.gmail_id for email in saved] == ["b", "a"]
+    assert saved[1].id == first.id
+    assert saved[1].subject == "Updated"
+    stored = db.get_email("a")
+    assert stored is not None
+    assert stored.subject == "Updated"
+    assert saved[0].labels == ["INBOX"]
+
+
+def test_save_emails_chunks_large_batches(db: Database, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test batches larger than one upsert statement are all stored."""
+    monkeypatch.setattr("db.database._UPSERT_CHUNK_SIZE", 2)
+
+    saved = db.save_emails([create_test_email(f"msg{i}") for i in range(5)])
+
+    assert len({email.id for email in saved}) == 5
+    assert len(db.get_emails(limit=10)) == 5
+
+
+def test_save_emails_repeated_message_in_one_batch(db: Database) -> None:
+    """Test a message listed twice in one batch keeps its last version."""
+    saved = db.save_emails([create_test_email("a", subject="First"), create_test_email("a", subject="Second")])
+
+    assert saved[0] is saved[1]
+    assert saved[0].subject == "Second"
+
+
+def test_engine_uses_wal_and_connection_pool(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the shared engine keeps a connection pool and enables WAL on its connections."""
+    monkeypatch.setattr("config.DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr("db.database._engine", None)
+
+    engine = get_engine()
+    try:
+        with engine.connect() as connection:
+            assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert isinstance(engine.pool, QueuePool)
+    finally:
+        engine.dispose()
+
+
+def test_pending_rows_load_parent_emails(db: Database) -> None:
+    """Test pending approvals and calendar actions carry their email after the session closes."""
+    email = db.save_email(create_test_email("a", subject="Invoice"))
+    db.save_classification(email.id, "URGENT", 0.4, requires_approval=True)
+    db.save_calendar_action("create", "Sync", email_id=email.id)
+
+    approvals = db.get_pending_approvals()
+    actions = db.get_pending_calendar_actions()
+    assert db._session is not None
+    db._session.close()
+
+    assert approvals[0].email.subject == "Invoice"
+    assert actions[0].email.subject == "Invoice"
+
+
+def test_get_latest_classifications_by_gmail_id(db: Database) -> None:
+    """Test the newest classification is returned per Gmail ID and unclassified emails are absent."""
+    first, second, _ = db.save_emails([create_test_email("a"), create_test_email("b"), create_test_email("c")])
+    db.save_classification(first.id, "FYI_ONLY", 0.5)
+    db.save_classification(first.id, "NEEDS_REPLY", 0.9)
+    db.save_classification(second.id, "TASK_ACTION", 0.7)
+
+    latest = db.get_latest_classifications(["a", "b", "c"])
+
+    assert {gmail_id: row.category for gmail_id, row in latest.items()} == {
+        "a": "NEEDS_REPLY",
+        "b": "TASK_ACTION",
+    }
+    assert db.get_latest_classifications([]) == {}
+
+
+def test_get_email_headers_skips_body(db: Database) -> None:
+    """Test header rows carry the listing columns but not the body."""
+    db.save_emails([create_test_email("a", subject="Older"), create_test_email("b", subject="Newer")])
+
+    headers = db.get_email_headers(limit=1)
+
+    assert len(headers) == 1
+    assert headers[0].gmail_id in {"a", "b"}
+    assert "body" not in headers[0]._fields
+
+
+def test_pending_drafts_are_rows_with_reply_headers(db: Database) -> None:
+    """Test pending drafts come back as plain rows with the email fields needed to reply."""
+    email = db.save_email(create_test_email("a", subject="Invoice"))
+    db.save_draft(email.id, "Re: Invoice", "Thanks!")
+    rejected = db.save_draft(email.id, "Re: Invoice", "Rejected")
+    db.reject_draft(rejected.id)
+
+    drafts = db.get_pending_drafts()
+
+    assert len(drafts) == 1
+    assert (drafts[0].body, drafts[0].email_subject, drafts[0].thread_id) == ("Thanks!", "Invoice", "thread123")
+    assert drafts[0].sender_email == "test@example.com"
+    assert "email" not in drafts[0]._fields
+
+
+def test_engine_adds_pending_indexes_to_existing_tables(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test indexes introduced after a database was created are added on startup."""
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    existing = create_engine(url)
+    Base.metadata.create_all(existing)
+    with existing.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_drafts_pending")
+    existing.dispose()
+    monkeypatch.setattr("config.DATABASE_URL", url)
+    monkeypatch.setattr("db.database._engine", None)
+
+    engine = get_engine()
+    try:
+        with engine.connect() as connection:
+            plan = connection.exec_driver_sql(
+                "EXPLAIN QUERY PLAN SELECT id FROM drafts WHERE status = 'pending' AND is_approved IS 0 "
+                "ORDER BY created_at DESC"
+            ).all()
+        assert "ix_drafts_pending" in plan[0][-1]
+    finally:
+        engine.dispose()
+
+
+def test_json_columns_read_rows_written_as_text(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test JSON columns round-trip lists and still read values stored as JSON text."""
+    monkeypatch.setattr("config.DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr("db.database._engine", None)
+    monkeypatch.setattr("db.database._SessionLocal", None)
+
+    engine = get_engine()
+    try:
+        db = Database()
+        db.save_calendar_action("create", "Sync", attendees=["a@example.com"])
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "INSERT INTO calendar_actions (action_type, summary, attendees, status, is_approved) "
+                """VALUES ('create', 'Legacy', '["b@example.com"]', 'pending', 0)"""
+            )
+
+        attendees = {action.summary: action.attendees for action in db.get_pending_calendar_actions()}
+        assert attendees == {"Sync": ["a@example.com"], "Legacy": ["b@example.com"]}
+    finally:
+        engine.dispose()
+
+
+def test_draft_state_changes(db: Database) -> None:
+    """Test draft updates report whether the draft exists and persist their fields."""
+    email = db.save_email(create_test_email("a"))
+    draft = db.save_draft(email.id, "Re: Test", "Draft body")
+
+    assert db.update_draft(draft.id, "Edited body") is True
+    assert db.approve_draft(draft.id) is True
+    assert db.mark_draft_sent(draft.id, "sent123") is True
+    assert db.reject_draft(draft.id + 1) is False
+
+    stored = db.get_draft(draft.id)
+    assert stored is not None
+    assert (stored.body, stored.status, stored.sent_message_id) == ("Edited body", "sent", "sent123")
+    assert stored.is_approved is True
+
+
+def test_calendar_action_state_changes(db: Database) -> None:
+    """Test approving a calendar action records the event and removes it from pending."""
+    action = db.save_calendar_action("create", "Sync")
+
+    assert db.approve_calendar_action(action.id, "event123") is True
+    assert db.reject_calendar_action(action.id + 1) is False
+    assert db.get_pending_calendar_actions() == []
+
+
+def test_transaction_commits_operations_together(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test operations in one transaction are committed together or not at all."""
+    monkeypatch.setattr("config.DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr("db.database._engine", None)
+    monkeypatch.setattr("db.database._SessionLocal", None)
+
+    engine = get_engine()
+    try:
+        db = Database()
+        with db.transaction() as txn:
+            email = txn.save_email(create_test_email("a"))
+            txn.save_draft(email.id, "Re: Test", "Draft body")
+
+        with pytest.raises(RuntimeError), db.transaction() as txn:
+            txn.save_email(create_test_email("b"))
+            raise RuntimeError("boom")
+
+        assert [draft.body for draft in db.get_pending_drafts()] == ["Draft body"]
+        assert db.get_email("b") is None
+    finally:
+        engine.dispose()
+
+
+def test_add_known_sender_keeps_existing(db: Database) -> None:
+    """Test adding a known address again returns the stored sender unchanged."""
+    first = db.add_known_sender("Alice@Example.com", "Alice")
+
+    again = db.add_known_sender("alice@example.com", "Someone Else")
+
+    assert again.id == first.id
+    assert again.name == "Alice"
+    assert [sender.email for sender in db.get_known_senders()] == ["alice@example.com"]
+
+
+def test_remove_known_sender(db: Database) -> None:
+    """Test removing a known sender deletes only that row and reports missing IDs."""
+    alice = db.add_known_sender("alice@example.com", "Alice")
+    db.add_known_sender("bob@example.com", "Bob")
+
+    assert db.remove_known_sender(alice.id) is True
+    assert db.remove_known_sender(alice.id) is False
+    assert [sender.email for sender in db.get_known_senders()] == ["bob@example.com"]
+
+
+def test_get_known_senders_returns_display_columns(db: Database) -> None:
+    """Test known senders come back as lightweight rows ordered by name."""
+    db.add_known_sender("zed@example.com", "Zed", trust_level="high")
+    db.add_known_sender("amy@example.com", "Amy")
+
+    senders = db.get_known_senders()
+
+    assert [tuple(sender) for sender in senders] == [(2, "amy@example.com", "Amy"), (1, "zed@example.com", "Zed")]
+    assert senders[0]._fields == ("id", "email", "name")
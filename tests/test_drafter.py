@@ -0,0 +1,140 @@
+"""Tests for the reply drafter agent."""
+
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from agent.drafter import ReplyDrafter
+from services.gmail_service import EmailMessage
+
+
+def create_test_email(
+    subject: str = "Test Subject",
+    body: str = "Test body content",
+    sender: str = "Test Sender",
+    sender_email: str = "test@example.com",
+) -> EmailMessage:
+    """Create a test email message."""
+    return EmailMessage(
+        id="test123",
+        thread_id="thread123",
+        subject=subject,
+        sender=sender,
+        sender_email=sender_email,
+        recipients=["recipient@example.com"],
+        date=datetime.now(),
+        snippet=body[:100],
+        body=body,
+        labels=["INBOX"],
+        is_unread=True,
+        has_attachments=False,
+        attachment_names=[],
+    )
+
+
+def test_draft_reply_uses_chain() -> None:
+    """Test draft_reply invokes the chain and cleans the output."""
+    drafter = ReplyDrafter()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = MagicMock(content="Subject: Re: Test\nHi Test,\n\nThanks!")
+    drafter._chain = mock_chain
+
+    draft = drafter.draft_reply(create_test_email(), context="Be brief")
+
+    inputs = mock_chain.invoke.call_args.args[0]
+    assert inputs["context_section"] == "Additional context: Be brief\n"
+    assert draft == "Hi Test,\n\nThanks!"
+
+
+@pytest.mark.anyio
+async def test_adraft_reply_uses_chain() -> None:
+    """Test adraft_reply awaits the chain's async invoke."""
+    drafter = ReplyDrafter()
+    mock_chain = MagicMock()
+    mock_chain.ainvoke = AsyncMock(return_value=MagicMock(content="Hi Test,\n\nSounds good."))
+    drafter._chain = mock_chain
+
+    draft = await drafter.adraft_reply(create_test_email())
+
+    mock_chain.ainvoke.assert_awaited_once()
+    assert draft == "Hi Test,\n\nSounds good."
+
+
+@pytest.mark.anyio
+async def test_adraft_reply_falls_back_on_error() -> None:
+    """Test adraft_reply returns the template fallback when the chain fails."""
+    drafter = ReplyDrafter()
+    mock_chain = MagicMock()
+    mock_chain.ainvoke = AsyncMock(side_effect=Exception("API error"))
+    drafter._chain = mock_chain
+
+    draft = await drafter.adraft_reply(create_test_email(subject="Project update"))
+
+    assert 'regarding "Project update"' in draft
+
+
+def test_improve_draft_reuses_chain() -> None:
+    """Test improve_draft builds its chain once and reuses it."""
+    drafter = ReplyDrafter()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = MagicMock(content="Improved draft:\nHi there,\n\nThanks!")
+    drafter._improve_chain = mock_chain
+
+    first = drafter.improve_draft("Hi", "Be warmer")
+    drafter.improve_draft("Hi", "Be shorter")
+
+    assert first == "Hi there,\n\nThanks!"
+    assert mock_chain.invoke.call_count == 2
+    assert mock_chain.invoke.call_args.args[0] == {"draft": "Hi", "feedback": "Be shorter"}
+
+
+def test_set_model_resets_improve_chain() -> None:
+    """Test changing the model drops the cached improvement chain."""
+    drafter = ReplyDrafter(model_id="original-model")
+    drafter._improve_chain = MagicMock()
+
+    drafter.set_model("new-model")
+
+    assert drafter._improve_chain is None
+
+
+def test_draft_with_template_caches_chain_per_template() -> None:
+    """Test a repeated template reuses its compiled chain."""
+    drafter = ReplyDrafter()
+    drafter._llm = MagicMock()
+
+    with patch("agent.drafter.ChatPromptTemplate.from_template") as mock_from_template:
+        mock_chain = mock_from_template.return_value.__or__.return_value
+        mock_chain.invoke.return_value = MagicMock(content="Hi Test,\n\nThanks!")
+        template = "Reply to {sender} about {subject}: {body}"
+
+        drafter.draft_with_template(create_test_email(), template)
+        draft = drafter.draft_with_template(create_test_email(subject="Other"), template)
+
+    mock_from_template.assert_called_once_with(template)
+    assert mock_chain.invoke.call_count == 2
+    assert draft == "Hi Test,\n\nThanks!"
+
+
+def test_clean_draft_strips_preamble_lines() -> None:
+    """Test subject and label lines are removed wherever they appear."""
+    drafter = ReplyDrafter()
+    draft = "Draft reply:\n  SUBJECT: Re: Budget\nHi Ana,\nRe: your note\n\nSure.\nImproved draft:\nBest"
+
+    assert drafter._clean_draft(draft) == "Hi Ana,\n\nSure.\nBest"
+    assert drafter._clean_draft("") == ""
+
+
+def test_format_thread_history_uses_last_three_messages() -> None:
+    """Test thread history keeps the three most recent messages with formatted dates."""
+    drafter = ReplyDrafter()
+    thread = [create_test_email(sender=f"Sender {i}", body=f"Message {i}") for i in range(4)]
+    for i, msg in enumerate(thread):
+        msg.date = datetime(2024, 3, 1 + i, 9, 5)
+
+    history = drafter._format_thread_history(thread)
+
+    assert "Sender 0" not in history
+    assert history.startswith("---\nFrom: Sender 1\nDate: 2024-03-02 09:05\nMessage 1")
+    assert history.count("---") == 3
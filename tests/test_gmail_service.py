@@ -1,10 +1,15 @@
 """Tests for the Gmail service."""
 
 import base64
-from datetime import datetime
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from email import message_from_bytes, policy
+from typing import Any
 from unittest.mock import MagicMock, patch
 
-from services.gmail_service import EmailMessage, GmailService, HTMLTextExtractor
+import pytest
+
+from services.gmail_service import EmailMessage, GmailService, HTMLTextExtractor, _html_to_text
 
 
 def test_email_message_dataclass() -> None:
@@ -53,6 +58,37 @@ def test_html_text_extractor() -> None:
     assert "color:red" not in text
 
 
+def test_html_to_text_matches_extractor() -> None:
+    """Test the regex HTML stripper gives the same text as the HTML parser."""
+    html = (
+        "<html><head><title>Title</title><style>p{color:red}</style></head><body>"
+        "<!-- a > b --><p>Hello &amp; World</p><div>This is a <b>test</b></div>"
+        "<ul><li>one</li><li>two</li></ul><script>if (a < b) alert('x')</script>end</body></html>"
+    )
+    extractor = HTMLTextExtractor()
+    extractor.feed(html)
+
+    assert _html_to_text(html) == extractor.get_text() == "Hello & World\nThis is a test\none\ntwo\nend"
+
+
+def test_html_to_text_keeps_bare_less_than() -> None:
+    """Test a "<" that does not start a tag stays in the text."""
+    html = "<p>if a < b then</p><p>x</p>"
+    extractor = HTMLTextExtractor()
+    extractor.feed(html)
+
+    assert _html_to_text(html) == extractor.get_text() == "if a < b then\nx"
+
+
+def test_html_to_text_skips_quoted_attribute_values() -> None:
+    """Test a ">" inside a quoted attribute value does not end the tag."""
+    html = "<a title='x>y'>link</a> <script type=\"a>b\">bad()</script>ok"
+    extractor = HTMLTextExtractor()
+    extractor.feed(html)
+
+    assert _html_to_text(html) == extractor.get_text() == "link ok"
+
+
 def test_extract_email_from_sender() -> None:
     """Test extracting email from sender string."""
     service = GmailService()
@@ -83,6 +119,9 @@ def test_parse_date() -> None:
     date2 = service._parse_date("15 Jan 2024 10:30:00 +0000")
     assert date2.year == 2024
 
+    date3 = service._parse_date("Mon, 15 Jan 2024 10:30:00 +0100 (CET)")
+    assert (date3.hour, date3.utcoffset()) == (10, timedelta(hours=1))
+
 
 def test_decode_body_plain_text() -> None:
     """Test decoding plain text body."""
@@ -95,6 +134,14 @@ def test_decode_body_plain_text() -> None:
     assert decoded == original
 
 
+def test_decode_body_unpadded() -> None:
+    """Test decoding body data that omits base64 padding."""
+    service = GmailService()
+    encoded = base64.urlsafe_b64encode("Caf\u00e9?>".encode()).decode().rstrip("=")
+
+    assert service._decode_body(encoded, "text/plain") == "Caf\u00e9?>"
+
+
 def test_decode_body_html() -> None:
     """Test decoding HTML body."""
     service = GmailService()
@@ -106,22 +153,28 @@ def test_decode_body_html() -> None:
     assert "Hello" in decoded
 
 
-@patch("services.gmail_service.get_gmail_service")
-def test_fetch_emails(mock_get_service: MagicMock) -> None:
-    """Test fetching emails."""
-    mock_service = MagicMock()
-    mock_get_service.return_value = mock_service
+class FakeBatch:
+    """Minimal stand-in for BatchHttpRequest that answers each request from a callable."""
 
-    mock_service.users().messages().list().execute.return_value = {
-        "messages": [
-            {"id": "msg1", "threadId": "thread1"},
-            {"id": "msg2", "threadId": "thread2"},
-        ]
-    }
+    def __init__(self, callback: Callable[..., None], respond: Callable[[Any], tuple[Any, Any]]) -> None:
+        self.callback = callback
+        self.respond = respond
+        self.requests: list[tuple[str, object]] = []
 
-    mock_msg = {
-        "id": "msg1",
-        "threadId": "thread1",
+    def add(self, request: object, request_id: str) -> None:
+        self.requests.append((request_id, request))
+
+    def execute(self) -> None:
+        for request_id, request in self.requests:
+            response, exception = self.respond(request)
+            self.callback(request_id, response, exception)
+
+
+def create_api_message(message_id: str) -> dict[str, Any]:
+    """Create a Gmail API message resource."""
+    return {
+        "id": message_id,
+        "threadId": f"thread-{message_id}",
         "snippet": "Test snippet",
         "labelIds": ["INBOX", "UNREAD"],
         "payload": {
@@ -138,13 +191,53 @@ def test_fetch_emails(mock_get_service: MagicMock) -> None:
         },
     }
 
-    mock_service.users().messages().get().execute.return_value = mock_msg
+
+def test_fetch_emails() -> None:
+    """Test fetching emails gets every listed message in one batch, in list order."""
+    mock_service = MagicMock()
+    batches: list[FakeBatch] = []
+
+    def new_batch(callback: Callable[..., None]) -> FakeBatch:
+        batch = FakeBatch(callback, lambda request: request)
+        batches.append(batch)
+        return batch
+
+    def get(userId: str, id: str, format: str, fields: str) -> tuple:
+        if id == "broken":
+            return None, Exception("not found")
+        return create_api_message(id), None
+
+    mock_service.users().messages().list().execute.return_value = {
+        "messages": [{"id": "msg2"}, {"id": "broken"}, {"id": "msg1"}]
+    }
+    mock_service.new_batch_http_request.side_effect = new_batch
+    mock_service.users().messages().get.side_effect = get
 
     gmail = GmailService(service=mock_service)
-    emails = gmail.fetch_emails(max_results=2)
+    emails = gmail.fetch_emails(max_results=3)
+
+    assert [email.id for email in emails] == ["msg2", "msg1"]
+    assert len(batches) == 1
+
+
+def test_get_emails_splits_large_batches(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test message fetches are split into batches of the maximum size."""
+    monkeypatch.setattr("services.gmail_service._BATCH_MAX_REQUESTS", 2)
+    mock_service = MagicMock()
+    batches: list[FakeBatch] = []
+
+    def new_batch(callback: Callable[..., None]) -> FakeBatch:
+        batch = FakeBatch(callback, lambda request: (request, None))
+        batches.append(batch)
+        return batch
+
+    mock_service.new_batch_http_request.side_effect = new_batch
+    mock_service.users().messages().get.side_effect = lambda userId, id, format, fields: create_api_message(id)
 
-    assert len(emails) == 2
-    mock_service.users().messages().list.assert_called()
+    emails = GmailService(service=mock_service).get_emails(["a", "b", "c"])
+
+    assert [email.id for email in emails] == ["a", "b", "c"]
+    assert [len(batch.requests) for batch in batches] == [2, 1]
 
 
 @patch("services.gmail_service.get_gmail_service")
@@ -166,6 +259,23 @@ def test_send_email(mock_get_service: MagicMock) -> None:
     mock_service.users().messages().send.assert_called()
 
 
+def test_send_email_encodes_raw_message() -> None:
+    """Test the raw message decodes back to the headers and non-ASCII body that were sent."""
+    mock_service = MagicMock()
+    mock_service.users().messages().send().execute.return_value = {"id": "sent123"}
+
+    GmailService(service=mock_service).send_email(
+        to=["a@example.com", "b@example.com"], subject="Caf\u00e9", body="Voil\u00e0", in_reply_to="<id@example.com>"
+    )
+
+    raw = mock_service.users().messages().send.call_args.kwargs["body"]["raw"]
+    message = message_from_bytes(base64.urlsafe_b64decode(raw), policy=policy.default)
+    assert message["to"] == "a@example.com, b@example.com"
+    assert message["subject"] == "Caf\u00e9"
+    assert message["In-Reply-To"] == "<id@example.com>"
+    assert message.get_content() == "Voil\u00e0"
+
+
 @patch("services.gmail_service.get_gmail_service")
 def test_mark_as_read(mock_get_service: MagicMock) -> None:
     """Test marking email as read."""
@@ -185,6 +295,20 @@ def test_mark_as_read(mock_get_service: MagicMock) -> None:
     )
 
 
+def test_mark_many_as_read_chunks_ids(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test several emails are marked read with one batchModify call per chunk of IDs."""
+    monkeypatch.setattr("services.gmail_service._BATCH_MODIFY_MAX_IDS", 2)
+    mock_service = MagicMock()
+    mock_service.users().messages().batchModify.reset_mock()
+
+    result = GmailService(service=mock_service).mark_many_as_read(["a", "b", "c"])
+
+    assert result is True
+    calls = mock_service.users().messages().batchModify.call_args_list
+    assert [call.kwargs["body"]["ids"] for call in calls] == [["a", "b"], ["c"]]
+    assert calls[0].kwargs["body"]["removeLabelIds"] == ["UNREAD"]
+
+
 def test_extract_attachments() -> None:
     """Test extracting attachment names."""
     service = GmailService()
@@ -209,6 +333,46 @@ def test_extract_attachments() -> None:
     assert "image.jpg" in attachments
     assert "nested.docx" in attachments
     assert "" not in attachments
+    assert attachments == ["document.pdf", "image.jpg", "nested.docx"]
+
+
+def test_extract_body_prefers_plain_text() -> None:
+    """Test a nested text/plain part is preferred over an earlier HTML part."""
+    service = GmailService()
+
+    def encode(text: str) -> str:
+        return base64.urlsafe_b64encode(text.encode()).decode()
+
+    payload = {
+        "mimeType": "multipart/mixed",
+        "parts": [
+            {"mimeType": "text/html", "body": {"data": encode("<p>HTML body</p>")}},
+            {
+                "mimeType": "multipart/alternative",
+                "parts": [{"mimeType": "text/plain", "body": {"data": encode("Plain body")}}],
+            },
+        ],
+    }
+
+    assert service._extract_body(payload) == "Plain body"
+    assert service._extract_body({"parts": payload["parts"][:1]}) == "HTML body"
+
+
+def test_extract_body_skips_html_parsing_when_plain_text_exists() -> None:
+    """Test an HTML alternative is never stripped when a text/plain part is present."""
+    service = GmailService()
+    payload = {
+        "mimeType": "multipart/alternative",
+        "parts": [
+            {"mimeType": "text/html", "body": {"data": base64.urlsafe_b64encode(b"<p>HTML</p>").decode()}},
+            {"mimeType": "text/plain", "body": {"data": base64.urlsafe_b64encode(b"Plain").decode()}},
+        ],
+    }
+
+    with patch("services.gmail_service._html_to_text") as html_to_text:
+        assert service._extract_body(payload) == "Plain"
+
+    html_to_text.assert_not_called()
 
 
 def test_parse_message() -> None:
@@ -243,3 +407,28 @@ def test_parse_message() -> None:
     assert email.subject == "Test Email"
     assert email.is_unread is True
     assert "jane@example.com" in email.recipients
+
+
+def test_get_emails_falls_back_when_batch_fails() -> None:
+    """Test messages are fetched individually when their batch cannot be executed."""
+    mock_service = MagicMock()
+    mock_service.new_batch_http_request.return_value.execute.side_effect = Exception("batch endpoint down")
+    mock_service.users().messages().get.side_effect = lambda userId, id, format, fields: MagicMock(
+        execute=MagicMock(return_value=create_api_message(id))
+    )
+
+    emails = GmailService(service=mock_service).get_emails(["a", "b", "c"])
+
+    assert [email.id for email in emails] == ["a", "b", "c"]
+
+
+def test_parse_headers_keeps_only_read_headers() -> None:
+    """Test header parsing keeps the first value of each header the parser reads."""
+    raw_headers = [
+        {"name": "Received", "value": "from mx.example.com"},
+        {"name": "FROM", "value": "a@example.com"},
+        {"name": "From", "value": "b@example.com"},
+        {"name": "Subject", "value": "Hi"},
+    ]
+
+    assert GmailService()._parse_headers(raw_headers) == {"from": "a@example.com", "subject": "Hi"}
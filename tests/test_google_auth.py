@@ -0,0 +1,102 @@
+"""Tests for Google OAuth helpers."""
+
+import os
+import threading
+from collections.abc import Generator
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from auth import google_auth
+
+
+@pytest.fixture(autouse=True)
+def isolated_token(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[Path, None, None]:
+    """Point token.json at a temporary path and reset cached services."""
+    token_path = tmp_path / "token.json"
+    monkeypatch.setattr("config.TOKEN_PATH", token_path)
+    monkeypatch.setattr(google_auth, "_token_cache", None)
+    google_auth._build_service.cache_clear()
+    yield token_path
+    google_auth._build_service.cache_clear()
+
+
+@patch("auth.google_auth.get_credentials")
+@patch("auth.google_auth.build")
+def test_services_reused_until_token_changes(
+    mock_build: MagicMock,
+    mock_get_credentials: MagicMock,
+    isolated_token: Path,
+) -> None:
+    """Test API services are built once per token file version."""
+    mock_build.side_effect = lambda *args, **kwargs: MagicMock()
+    isolated_token.write_text("{}")
+
+    first = google_auth.get_gmail_service()
+    assert google_auth.get_gmail_service() is first
+    google_auth.get_calendar_service()
+    assert mock_build.call_count == 2
+
+    isolated_token.write_text('{"refreshed": true}')
+    stat = isolated_token.stat()
+    os.utime(isolated_token, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert google_auth.get_gmail_service() is not first
+
+
+@patch("auth.google_auth.Credentials.from_authorized_user_file")
+def test_token_parsed_once_until_file_changes(mock_from_file: MagicMock, isolated_token: Path) -> None:
+    """Test is_authenticated reuses parsed credentials until token.json changes."""
+    mock_from_file.return_value = MagicMock(valid=True)
+    assert google_auth.is_authenticated() is False
+
+    isolated_token.write_text("{}")
+    assert google_auth.is_authenticated() is True
+    assert google_auth.is_authenticated() is True
+    assert mock_from_file.call_count == 1
+
+    stat = isolated_token.stat()
+    os.utime(isolated_token, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    google_auth.is_authenticated()
+    assert mock_from_file.call_count == 2
+
+
+def test_save_credentials_invalidates_token_cache(isolated_token: Path) -> None:
+    """Test saving credentials drops the cached parse of the old token."""
+    creds = MagicMock()
+    creds.to_json.return_value = "{}"
+    google_auth._token_cache = (1, MagicMock())
+
+    google_auth._save_credentials(creds)
+
+    assert google_auth._token_cache is None
+    assert isolated_token.read_text() == "{}"
+
+
+def test_build_request_uses_one_connection_per_thread() -> None:
+    """Test API requests reuse a connection within a thread but never share it across threads."""
+    shared_http = MagicMock()
+    google_auth._thread_http.__dict__.clear()
+
+    first = google_auth._build_request(shared_http, MagicMock(), "https://example.com/a")
+    second = google_auth._build_request(shared_http, MagicMock(), "https://example.com/b")
+    other: list = []
+    thread = threading.Thread(
+        target=lambda: other.append(google_auth._build_request(shared_http, MagicMock(), "https://example.com/c"))
+    )
+    thread.start()
+    thread.join()
+
+    assert first.http is second.http
+    assert other[0].http is not first.http
+    assert first.http.credentials is shared_http.credentials
+
+
+def test_orjson_model_parses_responses() -> None:
+    """Test API responses are parsed as JSON and non-JSON bodies are returned as text."""
+    model = google_auth._OrjsonModel()
+
+    assert model.deserialize(b'{"items": [{"id": "event1"}]}') == {"items": [{"id": "event1"}]}
+    assert model.deserialize(b"Not Found") == "Not Found"
+    assert google_auth._OrjsonModel(data_wrapper=True).deserialize('{"data": {"id": "a"}}') == {"id": "a"}
@@ -0,0 +1,62 @@
+"""Tests for the inbox view."""
+
+from dataclasses import replace
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from streamlit.testing.v1 import AppTest
+
+from agent.approval import ApprovalChecker
+from services.gmail_service import EmailMessage
+
+_BASE_EMAIL = EmailMessage(
+    id="msg1",
+    thread_id="thread1",
+    subject="Test Subject",
+    sender="Test Sender",
+    sender_email="test@example.com",
+    recipients=["recipient@example.com"],
+    date=datetime(2024, 1, 1, 9, 0),
+    snippet="Same body",
+    body="Same body",
+    labels=["INBOX"],
+    is_unread=True,
+    has_attachments=False,
+    attachment_names=[],
+)
+
+_INBOX_SCRIPT = """
+from ui.inbox_view import render_inbox
+
+render_inbox()
+"""
+
+
+def test_render_inbox_opens_cards_on_demand() -> None:
+    """Test the inbox renders closed cards and builds details only for the card that is opened."""
+    emails = [replace(_BASE_EMAIL, id="msg1", subject="First"), replace(_BASE_EMAIL, id="msg2", subject="Second")]
+    db = MagicMock()
+    db.get_latest_classifications.return_value = {}
+    db.are_known_senders.return_value = {"test@example.com": True}
+    app = AppTest.from_string(_INBOX_SCRIPT)
+
+    with (
+        patch("ui.inbox_view.GmailService") as gmail_class,
+        patch("ui.inbox_view.Database", return_value=db),
+        patch("ui.inbox_view.ApprovalChecker", side_effect=lambda: ApprovalChecker(db=db)),
+    ):
+        gmail_class.return_value.fetch_emails.return_value = emails
+        app.run()
+
+        assert not app.exception
+        assert [button.label for button in app.button][:3] == ["Refresh", "Classify 2 unclassified", "Mark 2 read"]
+        assert len(app.text_area) == 0
+
+        app.button(key="toggle_msg2").click().run()
+        assert [area.key for area in app.text_area] == ["body_msg2"]
+
+        app.button(key="toggle_msg1").click().run()
+        assert [area.value for area in app.text_area] == ["Same body", "Same body"]
+
+        app.button(key="toggle_msg2").click().run()
+        assert [area.key for area in app.text_area] == ["body_msg1"]
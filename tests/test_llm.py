@@ -0,0 +1,61 @@
+"""Tests for shared LLM construction."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.exceptions import OutputParserException
+
+from agent.classifier import EmailClassifier
+from agent.drafter import ReplyDrafter
+from agent.llm import FastJsonOutputParser, get_chat_model
+from agent.scheduler import MeetingScheduler
+
+
+@patch("agent.llm.ChatHuggingFace")
+@patch("agent.llm.HuggingFaceEndpoint")
+def test_agents_with_same_settings_share_chat_model(mock_endpoint: MagicMock, mock_chat: MagicMock) -> None:
+    """Test one endpoint is built per distinct model and generation settings."""
+    mock_chat.side_effect = lambda llm: MagicMock()
+    get_chat_model.cache_clear()
+    try:
+        classifier = EmailClassifier(model_id="test-model", api_key="test-key")
+        scheduler = MeetingScheduler(model_id="test-model", api_key="test-key")
+        drafter = ReplyDrafter(model_id="test-model", api_key="test-key")
+
+        assert classifier.llm is scheduler.llm
+        assert drafter.llm is not classifier.llm
+        assert mock_endpoint.call_count == 2
+    finally:
+        get_chat_model.cache_clear()
+
+
+@patch("agent.llm.ChatHuggingFace")
+@patch("agent.llm.HuggingFaceEndpoint")
+def test_chat_model_uses_configured_timeout(
+    mock_endpoint: MagicMock,
+    mock_chat: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test the endpoint request timeout follows LLM_TIMEOUT_SECONDS."""
+    monkeypatch.setattr("config.LLM_TIMEOUT_SECONDS", 12.5)
+    get_chat_model.cache_clear()
+    try:
+        get_chat_model("test-model", "test-key", max_new_tokens=256, temperature=0.1)
+    finally:
+        get_chat_model.cache_clear()
+
+    assert mock_endpoint.call_args.kwargs["timeout"] == 13
+
+
+def test_fast_json_parser_handles_bare_and_fenced_json() -> None:
+    """Test bare JSON and markdown-fenced JSON both parse."""
+    parser = FastJsonOutputParser()
+
+    assert parser.parse(' {"category": "URGENT"} ') == {"category": "URGENT"}
+    assert parser.parse('```json\n{"category": "URGENT"}\n```') == {"category": "URGENT"}
+
+
+def test_fast_json_parser_rejects_non_json() -> None:
+    """Test text without JSON raises the usual LangChain parser error."""
+    with pytest.raises(OutputParserException):
+        FastJsonOutputParser().parse("no json here")
@@ -0,0 +1,118 @@
+"""Tests for the HuggingFace LLM service."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from services.llm_service import LLMService, _result_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache() -> None:
+    """Start every test with an empty result cache."""
+    _result_cache.clear()
+
+
+@pytest.mark.anyio
+async def test_aclassify_many_preserves_order_and_falls_back() -> None:
+    """Test concurrent classification returns results in input order with per-email fallback."""
+
+    async def text_generation(prompt: str, **kwargs: object) -> str:
+        if "Subject: Broken" in prompt:
+            raise Exception("API error")
+        if "Subject: Question" in prompt:
+            return '{"category": "NEEDS_REPLY", "confidence": 0.9, "reasoning": "Question"}'
+        return '{"category": "MEETING_REQUEST", "confidence": 0.8, "reasoning": "Meeting"}'
+
+    client = MagicMock()
+    client.text_generation = AsyncMock(side_effect=text_generation)
+    with patch("services.llm_service.AsyncInferenceClient") as client_class:
+        client_class.return_value.__aenter__.return_value = client
+        results = await LLMService(api_key="test").aclassify_many(
+            [
+                ("Could you help?", "a@example.com", "Question"),
+                ("Hello", "b@example.com", "Broken"),
+                ("Let's meet", "c@example.com", "Sync"),
+            ]
+        )
+
+    assert [result.category for result in results] == ["NEEDS_REPLY", "FYI_ONLY", "MEETING_REQUEST"]
+    assert client.text_generation.await_count == 3
+
+
+@pytest.mark.anyio
+async def test_aclassify_many_falls_back_on_malformed_json() -> None:
+    """Test a valid JSON response with a bad field falls back for that email without failing the batch."""
+
+    async def text_generation(prompt: str, **kwargs: object) -> str:
+        if "Subject: Odd" in prompt:
+            return '{"category": null, "confidence": 0.9, "reasoning": "Odd"}'
+        return '{"category": "NEEDS_REPLY", "confidence": 0.9, "reasoning": "Question"}'
+
+    client = MagicMock()
+    client.text_generation = AsyncMock(side_effect=text_generation)
+    with patch("services.llm_service.AsyncInferenceClient") as client_class:
+        client_class.return_value.__aenter__.return_value = client
+        results = await LLMService(api_key="test").aclassify_many(
+            [("Hmm", "a@example.com", "Odd"), ("Could you help?", "b@example.com", "Question")]
+        )
+
+    assert [result.category for result in results] == ["FYI_ONLY", "NEEDS_REPLY"]
+
+
+def test_classify_email_constrains_output_to_schema() -> None:
+    """Test classification requests a JSON grammar and parses the raw JSON response."""
+    service = LLMService(api_key="test")
+    service._client = MagicMock()
+    service._client.text_generation.return_value = '{"category": "task_action", "confidence": 0.7, "reasoning": "Todo"}'
+
+    result = service.classify_email("Please send the report", "a@example.com", "Report")
+
+    grammar = service._client.text_generation.call_args.kwargs["grammar"]
+    assert grammar["type"] == "json"
+    assert (result.category, result.confidence) == ("TASK_ACTION", 0.7)
+
+
+def test_parse_meeting_extraction_finds_json_in_prose() -> None:
+    """Test meeting extraction still reads a JSON object wrapped in prose."""
+    response = 'Sure:\n{"has_meeting_request": true, "title": "Sync", "proposed_times": ["Monday 2pm"]}\nDone.'
+
+    extraction = LLMService(api_key="test")._parse_meeting_extraction(response)
+
+    assert extraction.has_meeting_request is True
+    assert extraction.proposed_times == ["Monday 2pm"]
+
+
+def test_repeated_calls_reuse_cached_results() -> None:
+    """Test repeating a call on the same email skips the inference request."""
+    service = LLMService(api_key="test")
+    service._client = MagicMock()
+    service._client.text_generation.return_value = '{"category": "FYI_ONLY", "confidence": 0.9, "reasoning": "News"}'
+
+    first = service.classify_email("Weekly digest", "news@example.com", "Digest")
+    second = service.classify_email("Weekly digest", "news@example.com", "Digest")
+    service.classify_email("Weekly digest", "news@example.com", "Other digest")
+
+    assert second is first
+    assert service._client.text_generation.call_count == 2
+
+
+def test_clean_reply_drops_subject_lines() -> None:
+    """Test subject and Re: lines are removed while blank lines between paragraphs stay."""
+    response = "Subject: Project\n  RE: Project\nHi Anna,\n\nThanks, see you there.\n"
+
+    assert LLMService(api_key="test")._clean_reply(response) == "Hi Anna,\n\nThanks, see you there."
+
+
+def test_cached_meeting_extraction_is_not_shared() -> None:
+    """Test changing a returned extraction does not change the cached result."""
+    service = LLMService(api_key="test")
+    service._client = MagicMock()
+    service._client.text_generation.return_value = '{"has_meeting_request": true, "proposed_times": ["Monday 2pm"]}'
+
+    first = service.extract_meeting_details("Can we meet?", "Sync")
+    first.proposed_times.append("Tuesday 3pm")
+    second = service.extract_meeting_details("Can we meet?", "Sync")
+
+    assert second.proposed_times == ["Monday 2pm"]
+    assert service._client.text_generation.call_count == 1
@@ -0,0 +1,375 @@
+"""Tests for the meeting scheduler agent."""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from agent.cache import SQLiteCache
+from agent.scheduler import MeetingExtraction, MeetingScheduler, _extraction_cache
+from services.calendar_service import TimeSlot
+from services.gmail_service import EmailMessage
+
+
+@pytest.fixture(autouse=True)
+def clear_extraction_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Start every test with empty in-memory and persistent extraction caches."""
+    _extraction_cache.clear()
+    monkeypatch.setattr("agent.scheduler.response_cache", SQLiteCache(tmp_path / "llm_cache.db"))
+
+
+def create_test_email(
+    email_id: str = "test123",
+    subject: str = "Test Subject",
+    body: str = "Can we schedule a call to go over this?",
+    sender: str = "Test Sender",
+    sender_email: str = "test@example.com",
+) -> EmailMessage:
+    """Create a test email message."""
+    return EmailMessage(
+        id=email_id,
+        thread_id="thread123",
+        subject=subject,
+        sender=sender,
+        sender_email=sender_email,
+        recipients=["recipient@example.com"],
+        date=datetime.now(),
+        snippet=body[:100],
+        body=body,
+        labels=["INBOX"],
+        is_unread=True,
+        has_attachments=False,
+        attachment_names=[],
+    )
+
+
+def test_extract_meeting_details_batch_single_call_per_batch() -> None:
+    """Test batched extraction packs emails into one call and maps results by id."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = [
+        {"id": "b", "has_meeting_request": False, "title": "Newsletter"},
+        {"id": "a", "has_meeting_request": True, "title": "Sync", "duration_minutes": 30},
+    ]
+    scheduler._batch_extraction_chain = mock_chain
+
+    results = scheduler.extract_meeting_details_batch(
+        [create_test_email(email_id="a", subject="Sync?"), create_test_email(email_id="b", subject="News")]
+    )
+
+    mock_chain.invoke.assert_called_once()
+    assert [r.title for r in results] == ["Sync", "Newsletter"]
+    assert results[0].has_meeting_request is True
+    assert results[0].duration_minutes == 30
+
+
+def test_extract_meeting_details_batch_falls_back_for_missing_ids() -> None:
+    """Test emails absent from the model response use the heuristic fallback."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = [{"id": "a", "has_meeting_request": False, "title": "FYI"}]
+    scheduler._batch_extraction_chain = mock_chain
+
+    results = scheduler.extract_meeting_details_batch(
+        [
+            create_test_email(email_id="a"),
+            create_test_email(email_id="b", subject="Quick call", body="Can we schedule a 30 min sync?"),
+        ]
+    )
+
+    assert results[0].has_meeting_request is False
+    assert results[1].has_meeting_request is True
+    assert results[1].duration_minutes == 30
+
+
+def test_extract_meeting_details_batch_chunks_emails() -> None:
+    """Test emails are split into batches of batch_size."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+    mock_chain.invoke.side_effect = Exception("API error")
+    scheduler._batch_extraction_chain = mock_chain
+
+    results = scheduler.extract_meeting_details_batch(
+        [create_test_email(email_id=str(i)) for i in range(5)],
+        batch_size=2,
+    )
+
+    assert mock_chain.invoke.call_count == 3
+    assert len(results) == 5
+
+
+@pytest.mark.anyio
+async def test_aextract_many_preserves_order_and_falls_back() -> None:
+    """Test concurrent extraction returns results in input order with per-email fallback."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+
+    async def fake_ainvoke(inputs: dict[str, str]) -> dict[str, object]:
+        if inputs["subject"] == "Planning":
+            return {"has_meeting_request": True, "title": "Planning", "duration_minutes": 45}
+        raise Exception("API error")
+
+    mock_chain.ainvoke = AsyncMock(side_effect=fake_ainvoke)
+    scheduler._extraction_chain = mock_chain
+
+    results = await scheduler.aextract_many(
+        [
+            create_test_email(subject="Planning"),
+            create_test_email(subject="Lunch", body="Are you available for a 2 hour catch up?"),
+        ],
+        max_concurrent=1,
+    )
+
+    assert results[0].duration_minutes == 45
+    assert results[1].has_meeting_request is True
+    assert results[1].duration_minutes == 120
+
+
+def test_parse_time_string_handles_common_formats() -> None:
+    """Test time strings with clock times, weekdays and ISO dates are parsed in the scheduler timezone."""
+    scheduler = MeetingScheduler(timezone="Europe/London")
+
+    afternoon = scheduler._parse_time_string("3pm")
+    assert afternoon is not None
+    start, end = afternoon
+    assert (start.hour, start.minute) == (15, 0)
+    assert end - start == timedelta(hours=1)
+    assert start > datetime.now(start.tzinfo)
+
+    monday = scheduler._parse_time_string("Monday at 14:30")
+    assert monday is not None
+    assert monday[0].weekday() == 0
+    assert (monday[0].hour, monday[0].minute) == (14, 30)
+
+    iso = scheduler._parse_time_string("2030-03-05 10:00")
+    assert iso is not None
+    assert iso[0] == datetime(2030, 3, 5, 10, 0, tzinfo=ZoneInfo("Europe/London"))
+
+
+def test_parse_time_string_tomorrow() -> None:
+    """Test 'tomorrow' moves the parsed time to the next day."""
+    scheduler = MeetingScheduler(timezone="UTC")
+
+    parsed = scheduler._parse_time_string("tomorrow at 11am")
+
+    assert parsed is not None
+    assert parsed[0].date() == (datetime.now(ZoneInfo("UTC")) + timedelta(days=1)).date()
+    assert parsed[0].hour == 11
+
+
+def test_parse_time_string_rejects_text_without_time() -> None:
+    """Test strings without any date or time return None."""
+    scheduler = MeetingScheduler()
+
+    assert scheduler._parse_time_string("sometime next week") is None
+
+
+def test_fallback_extraction_duration_priority() -> None:
+    """Test duration hints keep their priority order regardless of position."""
+    scheduler = MeetingScheduler()
+
+    result = scheduler._fallback_extraction(create_test_email(subject="Sync", body="15 min or 2 hours?"))
+    assert result.has_meeting_request is True
+    assert result.duration_minutes == 120
+
+    plain = scheduler._fallback_extraction(create_test_email(subject="Newsletter", body="Weekly digest"))
+    assert plain.has_meeting_request is False
+    assert plain.duration_minutes == 60
+
+
+def test_timezone_setter_refreshes_zoneinfo() -> None:
+    """Test changing the timezone updates the cached ZoneInfo."""
+    scheduler = MeetingScheduler(timezone="UTC")
+
+    scheduler.timezone = "America/New_York"
+
+    assert scheduler._tz == ZoneInfo("America/New_York")
+    assert scheduler.timezone == "America/New_York"
+
+
+def test_extract_meeting_details_cached_by_content() -> None:
+    """Test repeated extraction of the same email reuses the first LLM result."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {"has_meeting_request": True, "title": "Sync", "duration_minutes": 30}
+    scheduler._extraction_chain = mock_chain
+    email = create_test_email(subject="Sync")
+
+    first = scheduler.extract_meeting_details(email)
+    second = scheduler.extract_meeting_details(email)
+
+    assert second == first
+    mock_chain.invoke.assert_called_once()
+
+
+def test_extract_meeting_details_cache_hits_are_copies() -> None:
+    """Test changing a returned extraction does not change what later cache hits return."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {"has_meeting_request": True, "title": "Sync", "attendees": ["a@example.com"]}
+    scheduler._extraction_chain = mock_chain
+    email = create_test_email(subject="Sync")
+
+    first = scheduler.extract_meeting_details(email)
+    first.attendees.append("b@example.com")
+    second = scheduler.extract_meeting_details(email)
+    second.proposed_times.append("Friday")
+
+    assert scheduler.extract_meeting_details(email).attendees == ["a@example.com"]
+    assert scheduler.extract_meeting_details(email).proposed_times == []
+    mock_chain.invoke.assert_called_once()
+
+
+def test_extract_meeting_details_batch_skips_cached_emails() -> None:
+    """Test batched extraction only sends emails that are not already cached."""
+    scheduler = MeetingScheduler()
+    single_chain = MagicMock()
+    single_chain.invoke.return_value = {"has_meeting_request": True, "title": "Sync"}
+    scheduler._extraction_chain = single_chain
+    cached_email = create_test_email(email_id="a", subject="Sync")
+    scheduler.extract_meeting_details(cached_email)
+
+    batch_chain = MagicMock()
+    batch_chain.invoke.return_value = [{"id": "b", "has_meeting_request": False, "title": "FYI"}]
+    scheduler._batch_extraction_chain = batch_chain
+
+    results = scheduler.extract_meeting_details_batch([cached_email, create_test_email(email_id="b")])
+
+    assert [r.title for r in results] == ["Sync", "FYI"]
+    sent = batch_chain.invoke.call_args.args[0]["emails_json"]
+    assert '"id": "a"' not in sent
+
+
+def test_generate_scheduling_reply_lists_conflicts_and_slots() -> None:
+    """Test the conflict reply lists conflicts and at most three alternative slots."""
+    scheduler = MeetingScheduler()
+    extraction = MeetingExtraction(True, "Sync", [], 60, [], "", "")
+    slots = [TimeSlot(datetime(2024, 5, day, 9, 30), datetime(2024, 5, day, 10, 30), 60) for day in (1, 2, 3, 4)]
+
+    reply = scheduler._generate_scheduling_reply(extraction, slots, ["Friday 3pm - conflict detected"])
+
+    assert reply.startswith("Thank you for reaching out about scheduling a meeting.\n\nUnfortunately")
+    assert "- Friday 3pm - conflict detected\n" in reply
+    assert "- Wednesday, May 01 at 09:30 AM\n" in reply
+    assert "May 04" not in reply
+    assert reply.endswith("Best regards")
+
+
+def test_check_proposed_times_single_availability_lookup() -> None:
+    """Test proposed times are checked with one batched availability call."""
+    calendar = MagicMock()
+    calendar.check_availability_batch.return_value = [True, False]
+    scheduler = MeetingScheduler(calendar_service=calendar)
+
+    conflicts = scheduler._check_proposed_times(["tomorrow at 2pm", "no time given", "tomorrow at 4pm"])
+
+    assert conflicts == ["tomorrow at 4pm - conflict detected"]
+    calendar.check_availability_batch.assert_called_once()
+    assert len(calendar.check_availability_batch.call_args.args[0]) == 2
+
+
+def test_parse_time_string_relative_to_given_now() -> None:
+    """Test a supplied reference time is used instead of the clock."""
+    scheduler = MeetingScheduler(timezone="UTC")
+    now = datetime(2024, 5, 1, 12, 0, tzinfo=ZoneInfo("UTC"))
+
+    start, _ = scheduler._parse_time_string("tomorrow at 3pm", now=now)
+
+    assert start == datetime(2024, 5, 2, 15, 0, tzinfo=ZoneInfo("UTC"))
+
+
+def _parsed_start(scheduler: MeetingScheduler, time_str: str, now: datetime) -> datetime:
+    """Parse a time string relative to now and return its start, failing if it does not parse."""
+    parsed = scheduler._parse_time_string(time_str, now=now)
+    assert parsed is not None
+    return parsed[0]
+
+
+def test_parse_time_string_keeps_explicit_dates() -> None:
+    """Test only bare times roll to tomorrow, bare weekdays roll a week and explicit dates stay as written."""
+    scheduler = MeetingScheduler(timezone="UTC")
+    utc = ZoneInfo("UTC")
+    now = datetime(2026, 10, 5, 16, 0, tzinfo=utc)
+
+    assert _parsed_start(scheduler, "2pm", now) == datetime(2026, 10, 6, 14, 0, tzinfo=utc)
+    assert _parsed_start(scheduler, "Monday at 14:30", now) == datetime(2026, 10, 12, 14, 30, tzinfo=utc)
+    assert _parsed_start(scheduler, "Monday at 17:00", now) == datetime(2026, 10, 5, 17, 0, tzinfo=utc)
+    assert _parsed_start(scheduler, "2026-10-05 10:00", now) == datetime(2026, 10, 5, 10, 0, tzinfo=utc)
+
+
+def test_parse_time_string_ignores_stray_numbers() -> None:
+    """Test a number without a month is not read as the day of the month."""
+    scheduler = MeetingScheduler(timezone="UTC")
+    utc = ZoneInfo("UTC")
+    now = datetime(2026, 10, 5, 12, 0, tzinfo=utc)
+
+    assert _parsed_start(scheduler, "room 12 at 3pm", now) == datetime(2026, 10, 5, 15, 0, tzinfo=utc)
+    assert _parsed_start(scheduler, "room 12 on Friday at 3pm", now) == datetime(2026, 10, 9, 15, 0, tzinfo=utc)
+
+
+def test_parse_time_string_keeps_ordinal_days() -> None:
+    """Test ordinal days and month names set the date instead of being treated as stray numbers."""
+    scheduler = MeetingScheduler(timezone="UTC")
+    utc = ZoneInfo("UTC")
+    now = datetime(2026, 10, 15, 12, 0, tzinfo=utc)
+
+    assert _parsed_start(scheduler, "the 20th at 2pm", now) == datetime(2026, 10, 20, 14, 0, tzinfo=utc)
+    assert _parsed_start(scheduler, "October 22nd at 10am", now) == datetime(2026, 10, 22, 10, 0, tzinfo=utc)
+    assert _parsed_start(scheduler, "room 3 on 3rd November at 9:30", now) == datetime(2026, 11, 3, 9, 30, tzinfo=utc)
+
+
+def test_extract_meeting_details_skips_llm_without_meeting_signal() -> None:
+    """Test emails with no meeting keyword or clock time never reach the LLM."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+    scheduler._extraction_chain = mock_chain
+
+    result = scheduler.extract_meeting_details(create_test_email(subject="Your receipt", body="Thanks for your order."))
+
+    assert result.has_meeting_request is False
+    mock_chain.invoke.assert_not_called()
+
+
+def test_extract_meeting_details_sends_clock_times_to_llm() -> None:
+    """Test a clock time alone is enough to ask the LLM."""
+    scheduler = MeetingScheduler()
+    mock_chain = MagicMock()
+    mock_chain.invoke.return_value = {"has_meeting_request": True, "title": "Lunch"}
+    scheduler._extraction_chain = mock_chain
+
+    result = scheduler.extract_meeting_details(create_test_email(subject="Lunch", body="How about 12:30 on Friday?"))
+
+    assert result.has_meeting_request is True
+    mock_chain.invoke.assert_called_once()
+
+
+def test_create_scheduling_proposal_skips_calendar_without_meeting_request() -> None:
+    """Test no calendar lookups are made when the email is not a meeting request."""
+    calendar = MagicMock()
+    scheduler = MeetingScheduler(calendar_service=calendar)
+    extraction = MeetingExtraction(False, "Receipt", [], 60, [], "", "")
+
+    proposal = scheduler.create_scheduling_proposal(extraction, create_test_email())
+
+    assert proposal.available_slots == []
+    assert proposal.suggested_reply == ""
+    assert proposal.meeting.attendees == ["test@example.com"]
+    calendar.find_free_slots.assert_not_called()
+
+
+def test_create_scheduling_proposal_collects_slots_and_conflicts() -> None:
+    """Test free slots and proposed-time conflicts both reach the proposal."""
+    calendar = MagicMock()
+    slot = TimeSlot(datetime(2024, 5, 1, 9, 0), datetime(2024, 5, 1, 10, 0), 60)
+    calendar.find_free_slots.return_value = [slot]
+    calendar.check_availability_batch.return_value = [False]
+    scheduler = MeetingScheduler(calendar_service=calendar)
+    extraction = MeetingExtraction(True, "Sync", ["tomorrow at 2pm"], 60, [], "", "")
+
+    proposal = scheduler.create_scheduling_proposal(extraction, create_test_email())
+
+    assert proposal.available_slots == [slot]
+    assert proposal.conflicts == ["tomorrow at 2pm - conflict detected"]
+    assert calendar.find_free_slots.call_args.kwargs["max_results"] == 10
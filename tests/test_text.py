@@ -0,0 +1,65 @@
+"""Tests for the shared agent text helpers."""
+
+from datetime import datetime
+
+from agent.text import clean_body, prompt_body
+from services.gmail_service import EmailMessage
+
+
+def create_test_email(body: str = "Test body content", snippet: str = "Test snippet") -> EmailMessage:
+    """Create a test email message."""
+    return EmailMessage(
+        id="test123",
+        thread_id="thread123",
+        subject="Test Subject",
+        sender="Test Sender",
+        sender_email="test@example.com",
+        recipients=["recipient@example.com"],
+        date=datetime.now(),
+        snippet=snippet,
+        body=body,
+        labels=["INBOX"],
+        is_unread=True,
+        has_attachments=False,
+        attachment_names=[],
+    )
+
+
+def test_prompt_body_returns_short_body_unchanged() -> None:
+    """Test a body within the limit is returned without copying."""
+    email = create_test_email(body="Short body")
+
+    assert prompt_body(email, max_chars=20) is email.body
+
+
+def test_prompt_body_truncates_long_body() -> None:
+    """Test a body over the limit is cut to max_chars."""
+    email = create_test_email(body="x" * 50)
+
+    assert prompt_body(email, max_chars=20) == "x" * 20
+
+
+def test_prompt_body_falls_back_to_snippet() -> None:
+    """Test an empty body falls back to the snippet."""
+    email = create_test_email(body="", snippet="Preview text")
+
+    assert prompt_body(email) == "Preview text"
+
+
+def test_clean_body_drops_quoted_reply() -> None:
+    """Test quoted reply lines and their header are removed."""
+    body = "Sounds good.\n\nOn Mon, 1 Jan 2024, Alice <a@example.com> wrote:\n> Can we meet?\n>\n> Thanks"
+
+    assert clean_body(body) == "Sounds good."
+
+
+def test_clean_body_collapses_whitespace() -> None:
+    """Test runs of spaces and blank lines are collapsed."""
+    assert clean_body("Hello    there\n\n\n\nBye  ") == "Hello there\n\nBye"
+
+
+def test_prompt_body_cleans_before_truncating() -> None:
+    """Test the character budget is spent on the reply rather than quoted text."""
+    email = create_test_email(body="> " + "q" * 50 + "\nReply text")
+
+    assert prompt_body(email, max_chars=20) == "Reply text"
@@ -1,8 +1,26 @@
 """UI module for Streamlit components."""
 
-from ui.calendar_view import render_calendar
-from ui.draft_view import render_drafts
-from ui.inbox_view import render_inbox
-from ui.settings_view import render_settings
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from ui.calendar_view import render_calendar
+    from ui.draft_view import render_drafts
+    from ui.inbox_view import render_inbox
+    from ui.settings_view import render_settings
+
+_EXPORTS = {
+    "render_inbox": "ui.inbox_view",
+    "render_drafts": "ui.draft_view",
+    "render_calendar": "ui.calendar_view",
+    "render_settings": "ui.settings_view",
+}
 
 __all__ = ["render_inbox", "render_drafts", "render_calendar", "render_settings"]
+
+
+def __getattr__(name: str) -> Any:
+    """Import view modules on first access so importing one view does not load the others."""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name]), name)
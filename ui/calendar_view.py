@@ -1,6 +1,7 @@
 """Calendar view component for Streamlit UI."""
 
 import logging
+import re
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
@@ -12,6 +13,21 @@ from services.calendar_service import CalendarEvent, CalendarService, MeetingDet
 
 logger = logging.getLogger(__name__)
 
+# Separators accepted between addresses in the attendees field.
+_ATTENDEE_SEPARATOR_RE = re.compile(r"[,;\s]+")
+
+STATUS_COLORS = {
+    "confirmed": "green",
+    "tentative": "orange",
+    "cancelled": "red",
+}
+
+_BADGE_HTML = "<span style='background-color:{color};color:white;padding:2px 8px;border-radius:4px;'>{status}</span>"
+
+STATUS_BADGES = {
+    status: _BADGE_HTML.format(color=color, status=status.upper()) for status, color in STATUS_COLORS.items()
+}
+
 
 def _clear_calendar_events_cache() -> None:
     """Clear all calendar events cache entries."""
@@ -103,17 +119,8 @@ def _render_event_card(event: CalendarEvent) -> None:
                     st.caption(f"... and {len(event.attendees) - 5} more")
 
         with col2:
-            status_colors = {
-                "confirmed": "green",
-                "tentative": "orange",
-                "cancelled": "red",
-            }
-            color = status_colors.get(event.status, "gray")
-            st.markdown(
-                f"<span style='background-color:{color};color:white;padding:2px 8px;border-radius:4px;'>"
-                f"{event.status.upper()}</span>",
-                unsafe_allow_html=True,
-            )
+            badge = STATUS_BADGES.get(event.status) or _BADGE_HTML.format(color="gray", status=event.status.upper())
+            st.markdown(badge, unsafe_allow_html=True)
 
         if event.description:
             st.divider()
@@ -172,10 +179,8 @@ def _approve_calendar_action(action: CalendarAction) -> None:
     """Approve and create a calendar event."""
     with st.spinner("Creating event..."):
         try:
-            import json
-
             calendar = CalendarService()
-            attendees = json.loads(action.attendees) if action.attendees else []
+            attendees = action.attendees or []
 
             meeting = MeetingDetails(
                 summary=action.summary,
@@ -275,7 +280,7 @@ def _create_event(
             start = datetime.combine(date, start_time, tzinfo=tz)
             end = start + timedelta(minutes=duration)
 
-            attendee_list = [a.strip() for a in attendees.split(",") if a.strip()]
+            attendee_list = [a for a in _ATTENDEE_SEPARATOR_RE.split(attendees) if a]
 
             meeting = MeetingDetails(
                 summary=summary,
@@ -3,13 +3,17 @@
 import logging
 
 import streamlit as st
+from sqlalchemy import Row
 
+from agent.drafter import ReplyDrafter
 from db.database import Database
-from db.models import Draft
 from services.gmail_service import GmailService
 
 logger = logging.getLogger(__name__)
 
+# Draft cards rendered per page; each card holds a tall text area.
+_DRAFTS_PER_PAGE = 10
+
 
 def render_drafts() -> None:
     """Render the drafts review view."""
@@ -27,11 +31,19 @@ def render_drafts() -> None:
         st.info("No pending drafts. Drafts will appear here when you create them from the Inbox.")
         return
 
-    for draft in drafts:
+    page_count = -(-len(drafts) // _DRAFTS_PER_PAGE)
+    page = 1
+    if page_count > 1:
+        with col1:
+            page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+        st.caption(f"{len(drafts)} pending drafts, page {page} of {page_count}")
+
+    start = (page - 1) * _DRAFTS_PER_PAGE
+    for draft in drafts[start : start + _DRAFTS_PER_PAGE]:
         _render_draft_card(draft)
 
 
-def _fetch_pending_drafts() -> list[Draft]:
+def _fetch_pending_drafts() -> list[Row]:
     """Fetch pending drafts from database."""
     if "pending_drafts" not in st.session_state:
         try:
@@ -44,8 +56,9 @@ def _fetch_pending_drafts() -> list[Draft]:
     return st.session_state["pending_drafts"]
 
 
-def _render_draft_card(draft: Draft) -> None:
-    """Render a single draft card."""
+@st.fragment
+def _render_draft_card(draft: Row) -> None:
+    """Render a single draft card; widgets inside it rerun only this card."""
     with st.expander(
         f" **{draft.subject}** - Created {draft.created_at.strftime('%Y-%m-%d %H:%M')}",
         expanded=True,
@@ -53,13 +66,11 @@ def _render_draft_card(draft: Draft) -> None:
         _render_draft_details(draft)
 
 
-def _render_draft_details(draft: Draft) -> None:
+def _render_draft_details(draft: Row) -> None:
     """Render draft details inside the expander."""
-    email = draft.email
-    if email:
-        st.markdown(f"**Original from:** {email.sender} <{email.sender_email}>")
-        st.markdown(f"**Original subject:** {email.subject}")
-        st.divider()
+    st.markdown(f"**Original from:** {draft.sender} <{draft.sender_email}>")
+    st.markdown(f"**Original subject:** {draft.email_subject}")
+    st.divider()
 
     st.markdown("**Draft Reply:**")
 
@@ -116,11 +127,10 @@ def _save_draft_changes(draft_id: int, new_body: str) -> None:
         st.error("Failed to save draft")
 
 
-def _approve_and_send(draft: Draft, body: str) -> None:
+def _approve_and_send(draft: Row, body: str) -> None:
     """Approve and send a draft reply."""
-    email = draft.email
-    if not email:
-        st.error("Original email not found")
+    if not draft.sender_email:
+        st.error("Original sender not found")
         return
 
     with st.spinner("Sending email..."):
@@ -128,16 +138,16 @@ def _approve_and_send(draft: Draft, body: str) -> None:
             gmail = GmailService()
 
             message_id = gmail.send_email(
-                to=email.sender_email,
+                to=draft.sender_email,
                 subject=draft.subject,
                 body=body,
-                thread_id=email.thread_id,
+                thread_id=draft.thread_id,
             )
 
             if message_id:
-                db = Database()
-                db.approve_draft(draft.id)
-                db.mark_draft_sent(draft.id, message_id)
+                with Database().transaction() as db:
+                    db.approve_draft(draft.id)
+                    db.mark_draft_sent(draft.id, message_id)
 
                 st.success("Email sent successfully!")
                 st.session_state.pop("pending_drafts", None)
@@ -179,7 +189,7 @@ def _save_feedback(draft_id: int, rating: str, original: str, edited: str) -> No
         logger.exception("Failed to save feedback")
 
 
-def _improve_draft(draft: Draft, current_body: str) -> None:
+def _improve_draft(draft: Row, current_body: str) -> None:
     """Improve a draft using LLM."""
     feedback = st.text_input(
         "What should be improved?",
@@ -190,8 +200,6 @@ def _improve_draft(draft: Draft, current_body: str) -> None:
     if feedback:
         with st.spinner("Improving draft..."):
             try:
-                from agent.drafter import ReplyDrafter
-
                 drafter = ReplyDrafter()
                 improved = drafter.improve_draft(current_body, feedback)
 
@@ -6,7 +6,7 @@ from datetime import datetime
 
 import streamlit as st
 
-from agent.approval import ApprovalChecker
+from agent.approval import ApprovalCheck, ApprovalChecker
 from agent.classifier import ClassificationResult, EmailClassifier
 from agent.drafter import ReplyDrafter
 from agent.scheduler import MeetingScheduler
@@ -22,6 +22,12 @@ CATEGORY_COLORS = {
     "TASK_ACTION": "orange",
 }
 
+_BADGE_HTML = "<span style='background-color:{color};color:white;padding:2px 8px;border-radius:4px;'>{category}</span>"
+
+CATEGORY_BADGES = {
+    category: _BADGE_HTML.format(color=color, category=category) for category, color in CATEGORY_COLORS.items()
+}
+
 CATEGORY_ICONS = {
     "NEEDS_REPLY": "",
     "FYI_ONLY": "",
@@ -30,6 +36,13 @@ CATEGORY_ICONS = {
 }
 
 
+def _clear_emails_cache() -> None:
+    """Clear all fetched email list cache entries."""
+    keys_to_remove = [k for k in st.session_state if k.startswith("emails_")]
+    for key in keys_to_remove:
+        st.session_state.pop(key, None)
+
+
 def render_inbox() -> None:
     """Render the inbox view."""
     st.header("Inbox")
@@ -39,7 +52,8 @@ def render_inbox() -> None:
         max_emails = st.selectbox("Show", [10, 20, 50], index=1)
     with col2:
         if st.button("Refresh", type="primary"):
-            st.session_state.pop("emails", None)
+            _clear_emails_cache()
+            _approval_checker().invalidate_known_sender()
             st.rerun()
 
     emails = _fetch_emails(max_emails)
@@ -48,8 +62,25 @@ def render_inbox() -> None:
         st.info("No emails found. Check your authentication or filters.")
         return
 
-    for email in emails:
-        _render_email_card(email)
+    _hydrate_classifications(emails)
+
+    classifications = [_get_classification(email) for email in emails]
+    unclassified = [
+        email for email, classification in zip(emails, classifications, strict=True) if classification is None
+    ]
+    unread = [email for email in emails if email.is_unread]
+    action_col1, action_col2 = st.columns([1, 1])
+    with action_col1:
+        if unclassified and st.button(f"Classify {len(unclassified)} unclassified", key="classify_all"):
+            _classify_emails(unclassified)
+    with action_col2:
+        if unread and st.button(f"Mark {len(unread)} read", key="read_all"):
+            _mark_many_as_read(unread)
+
+    approval_checks = _approval_checker().check_emails(list(zip(emails, classifications, strict=True)))
+    now = datetime.now().astimezone()
+    for email, classification, approval_check in zip(emails, classifications, approval_checks, strict=True):
+        _render_email_card(email, classification, approval_check, now)
 
 
 def _fetch_emails(max_results: int) -> list[EmailMessage]:
@@ -69,25 +100,41 @@ def _fetch_emails(max_results: int) -> list[EmailMessage]:
     return st.session_state[cache_key]
 
 
-def _render_email_card(email: EmailMessage) -> None:
-    """Render a single email card."""
-    classification = _get_classification(email)
-    approval_check = _get_approval_check(email, classification)
-
-    with st.expander(
-        _format_email_header(email, classification, approval_check.requires_approval),
-        expanded=False,
-    ):
-        _render_email_details(email, classification, approval_check)
+def _render_email_card(
+    email: EmailMessage,
+    classification: ClassificationResult | None,
+    approval_check: ApprovalCheck,
+    now: datetime,
+) -> None:
+    """Render a single email card, dating it relative to now."""
+    # Details, badges and action buttons are only built for cards the user has opened
+    expanded = st.session_state.get(f"expanded_{email.id}", False)
+    with st.container(border=True):
+        st.button(
+            _format_email_header(email, classification, approval_check.requires_approval, now),
+            key=f"toggle_{email.id}",
+            on_click=_toggle_expanded,
+            args=(email.id,),
+            icon=":material/expand_less:" if expanded else ":material/expand_more:",
+        )
+        if expanded:
+            _render_email_details(email, classification, approval_check)
+
+
+def _toggle_expanded(email_id: str) -> None:
+    """Open or close an email card."""
+    key = f"expanded_{email_id}"
+    st.session_state[key] = not st.session_state.get(key, False)
 
 
 def _format_email_header(
     email: EmailMessage,
     classification: ClassificationResult | None,
     needs_approval: bool,
+    now: datetime | None = None,
 ) -> str:
-    """Format the email header for the expander."""
-    date_str = _format_date(email.date)
+    """Format the email header shown on the card's toggle button."""
+    date_str = _format_date(email.date, now)
     unread_marker = "" if email.is_unread else ""
 
     category = classification.category if classification else "PENDING"
@@ -102,7 +149,7 @@ def _render_email_details(
     classification: ClassificationResult | None,
     approval_check,
 ) -> None:
-    """Render email details inside the expander."""
+    """Render email details inside an open card."""
     col1, col2 = st.columns([3, 1])
 
     with col1:
@@ -112,12 +159,10 @@ def _render_email_details(
 
     with col2:
         if classification:
-            color = CATEGORY_COLORS.get(classification.category, "gray")
-            st.markdown(
-                f"<span style='background-color:{color};color:white;padding:2px 8px;border-radius:4px;'>"
-                f"{classification.category}</span>",
-                unsafe_allow_html=True,
+            badge = CATEGORY_BADGES.get(classification.category) or _BADGE_HTML.format(
+                color="gray", category=classification.category
             )
+            st.markdown(badge, unsafe_allow_html=True)
             st.caption(f"Confidence: {classification.confidence:.0%}")
 
     if approval_check.requires_approval:
@@ -130,7 +175,14 @@ def _render_email_details(
 
     st.markdown("**Content:**")
     content = email.body if email.body else email.snippet
-    st.text_area("Email body", value=content, height=200, disabled=True, label_visibility="collapsed")
+    st.text_area(
+        "Email body",
+        value=content,
+        height=200,
+        disabled=True,
+        label_visibility="collapsed",
+        key=f"body_{email.id}",
+    )
 
     if email.has_attachments:
         st.caption(f" Attachments: {', '.join(email.attachment_names)}")
@@ -172,10 +224,34 @@ def _get_classification(email: EmailMessage) -> ClassificationResult | None:
     return st.session_state.get(cache_key)
 
 
+def _hydrate_classifications(emails: list[EmailMessage]) -> None:
+    """Seed the session cache with stored classifications for emails not yet cached."""
+    missing = [email.id for email in emails if f"classification_{email.id}" not in st.session_state]
+    if not missing:
+        return
+    try:
+        stored = Database().get_latest_classifications(missing)
+    except Exception:
+        logger.exception("Failed to load stored classifications")
+        return
+    for gmail_id, row in stored.items():
+        st.session_state[f"classification_{gmail_id}"] = ClassificationResult(
+            category=row.category,
+            confidence=row.confidence,
+            reasoning=row.reasoning or "",
+        )
+
+
+def _approval_checker() -> ApprovalChecker:
+    """Get the session's approval checker so known-sender lookups are shared by all cards."""
+    if "approval_checker" not in st.session_state:
+        st.session_state["approval_checker"] = ApprovalChecker()
+    return st.session_state["approval_checker"]
+
+
 def _get_approval_check(email: EmailMessage, classification: ClassificationResult | None):
     """Get approval check for an email."""
-    checker = ApprovalChecker()
-    return checker.check_email(email, classification)
+    return _approval_checker().check_email(email, classification)
 
 
 def _classify_email(email: EmailMessage) -> None:
@@ -184,10 +260,38 @@ def _classify_email(email: EmailMessage) -> None:
         try:
             classifier = EmailClassifier()
             result = classifier.classify(email)
-            st.session_state[f"classification_{email.id}"] = result
+            _store_classifications([email], [result])
+
+            st.success(f"Classified as {result.category} ({result.confidence:.0%})")
+            st.rerun()
+        except Exception:
+            logger.exception("Classification failed")
+            st.error("Failed to classify email")
+
 
-            db = Database()
-            db_email = db.save_email(email)
+def _classify_emails(emails: list[EmailMessage]) -> None:
+    """Classify several emails with one batched chain call and cache the results."""
+    with st.spinner(f"Classifying {len(emails)} emails..."):
+        try:
+            classifier = EmailClassifier()
+            results = classifier.classify_batch(emails)
+            _store_classifications(emails, results)
+
+            st.success(f"Classified {len(results)} emails")
+            st.rerun()
+        except Exception:
+            logger.exception("Batch classification failed")
+            st.error("Failed to classify emails")
+
+
+def _store_classifications(emails: list[EmailMessage], results: list[ClassificationResult]) -> None:
+    """Cache classifications in the session and save them with their emails in one transaction."""
+    for email, result in zip(emails, results, strict=True):
+        st.session_state[f"classification_{email.id}"] = result
+
+    with Database().transaction() as db:
+        db_emails = db.save_emails(emails)
+        for email, db_email, result in zip(emails, db_emails, results, strict=True):
             approval = _get_approval_check(email, result)
             db.save_classification(
                 email_id=db_email.id,
@@ -198,12 +302,6 @@ def _classify_email(email: EmailMessage) -> None:
                 approval_reasons=approval.reasons,
             )
 
-            st.success(f"Classified as {result.category} ({result.confidence:.0%})")
-            st.rerun()
-        except Exception:
-            logger.exception("Classification failed")
-            st.error("Failed to classify email")
-
 
 def _draft_reply(email: EmailMessage) -> None:
     """Draft a reply to an email."""
@@ -214,13 +312,16 @@ def _draft_reply(email: EmailMessage) -> None:
 
             st.session_state[f"draft_content_{email.id}"] = draft
 
-            db = Database()
-            db_email = db.save_email(email)
-            db.save_draft(
-                email_id=db_email.id,
-                subject=f"Re: {email.subject}",
-                body=draft,
-            )
+            with Database().transaction() as db:
+                db_email = db.save_email(email)
+                db.save_draft(
+                    email_id=db_email.id,
+                    subject=f"Re: {email.subject}",
+                    body=draft,
+                )
+
+            # Invalidate pending drafts cache so the new draft shows up
+            st.session_state.pop("pending_drafts", None)
 
             st.success("Draft created! Check the Drafts page.")
         except Exception:
@@ -259,16 +360,16 @@ def _schedule_meeting(email: EmailMessage) -> None:
             # Filter out invalid email addresses from attendees
             valid_attendees = [a for a in (proposal.meeting.attendees or []) if _is_valid_email(a)]
 
-            db = Database()
-            db_email = db.save_email(email)
-            db.save_calendar_action(
-                action_type="create_meeting",
-                summary=proposal.meeting.summary,
-                start_time=start_time,
-                end_time=end_time,
-                attendees=valid_attendees,
-                email_id=db_email.id,
-            )
+            with Database().transaction() as db:
+                db_email = db.save_email(email)
+                db.save_calendar_action(
+                    action_type="create_meeting",
+                    summary=proposal.meeting.summary,
+                    start_time=start_time,
+                    end_time=end_time,
+                    attendees=valid_attendees,
+                    email_id=db_email.id,
+                )
 
             # Invalidate pending calendar actions cache so new action shows up
             st.session_state.pop("pending_calendar_actions", None)
@@ -285,25 +386,41 @@ def _mark_as_read(email: EmailMessage) -> None:
         gmail = GmailService()
         if gmail.mark_as_read(email.id):
             st.success("Marked as read")
-            st.session_state.pop("emails", None)
+            _clear_emails_cache()
             st.rerun()
     except Exception:
         logger.exception("Failed to mark as read")
         st.error("Failed to mark as read")
 
 
+def _mark_many_as_read(emails: list[EmailMessage]) -> None:
+    """Mark several emails as read with batched label changes."""
+    try:
+        gmail = GmailService()
+        if gmail.mark_many_as_read([email.id for email in emails]):
+            st.success(f"Marked {len(emails)} emails as read")
+            _clear_emails_cache()
+            st.rerun()
+        else:
+            st.error("Failed to mark emails as read")
+    except Exception:
+        logger.exception("Failed to mark emails as read")
+        st.error("Failed to mark emails as read")
+
+
 def _add_known_sender(email: EmailMessage) -> None:
     """Add sender to known senders list."""
-    checker = ApprovalChecker()
-    if checker.add_known_sender(email.sender_email, email.sender):
+    if _approval_checker().add_known_sender(email.sender_email, email.sender):
         st.success(f"Added {email.sender_email} to trusted senders")
     else:
         st.error("Failed to add sender")
 
 
-def _format_date(date: datetime) -> str:
-    """Format date for display."""
-    now = datetime.now(date.tzinfo) if date.tzinfo else datetime.now()
+def _format_date(date: datetime, now: datetime | None = None) -> str:
+    """Format date for display relative to now, an aware local time taken once per render."""
+    if now is None:
+        now = datetime.now().astimezone()
+    now = now if date.tzinfo else now.replace(tzinfo=None)
     diff = now - date
 
     if diff.days == 0:
@@ -2,6 +2,8 @@
 
 import logging
 import os
+import re
+from pathlib import Path
 
 import streamlit as st
 
@@ -185,7 +187,7 @@ def _render_known_senders() -> None:
                     st.text(sender.name or "-")
                 with col3:
                     if st.button("Remove", key=f"remove_{sender.id}"):
-                        _remove_known_sender(sender.id)
+                        _remove_known_sender(db, sender.id)
         else:
             st.info("No trusted senders configured.")
 
@@ -201,6 +203,7 @@ def _render_known_senders() -> None:
         if st.button("Add Sender"):
             if new_email:
                 db.add_known_sender(new_email, new_name)
+                st.session_state.pop("approval_checker", None)
                 st.success(f"Added {new_email} to trusted senders")
                 st.rerun()
             else:
@@ -239,16 +242,12 @@ def _save_keywords_setting(keywords: list[str]) -> None:
     st.success("Keywords updated in memory. To persist, update config.py")
 
 
-def _remove_known_sender(sender_id: int) -> None:
+def _remove_known_sender(db: Database, sender_id: int) -> None:
     """Remove a known sender."""
     try:
-        db = Database()
-        with db._get_session() as session:
-            from db.models import KnownSender
-
-            sender = session.query(KnownSender).filter(KnownSender.id == sender_id).first()
-            if sender:
-                session.delete(sender)
+        db.remove_known_sender(sender_id)
+        # The inbox's approval checker memoizes known senders for the session
+        st.session_state.pop("approval_checker", None)
         st.success("Sender removed")
         st.rerun()
     except Exception:
@@ -256,22 +255,13 @@ def _remove_known_sender(sender_id: int) -> None:
         st.error("Failed to remove sender")
 
 
-def _update_env_file(env_path, key: str, value: str) -> None:
+def _update_env_file(env_path: Path, key: str, value: str) -> None:
     """Update or add a key in the .env file."""
-    lines = []
-    found = False
-
-    if env_path.exists():
-        with open(env_path) as f:
-            for line in f:
-                if line.startswith(f"{key}="):
-                    lines.append(f"{key}={value}\n")
-                    found = True
-                else:
-                    lines.append(line)
-
-    if not found:
-        lines.append(f"{key}={value}\n")
-
-    with open(env_path, "w") as f:
-        f.writelines(lines)
+    data = env_path.read_text() if env_path.exists() else ""
+    line = f"{key}={value}"
+    data, count = re.subn(rf"^{re.escape(key)}=.*$", lambda _: line, data, flags=re.MULTILINE)
+    if not count:
+        if data and not data.endswith("\n"):
+            data += "\n"
+        data += f"{line}\n"
+    env_path.write_text(data)